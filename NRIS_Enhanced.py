@@ -19,6 +19,7 @@ import sqlite3
 import json
 import io
 import hashlib
+import hmac
 import secrets
 import re
 import shutil
@@ -26,7 +27,7 @@ import os
 import copy
 import html as html_module
 from datetime import datetime, timedelta
-from typing import Tuple, List, Dict, Any, Optional
+from typing import Tuple, List, Dict, Any, Optional, Union
 from pathlib import Path
 import base64
 
@@ -396,10 +397,10 @@ def create_backup(reason: str = "manual") -> Optional[str]:
         backup_filename = f"nris_backup_{timestamp}_{reason}.db"
         backup_file = backup_path / backup_filename
 
-        # Use SQLite's backup API for safe copying
+        # Use SQLite's backup API for safe copying, whole database in one step
         source_conn = sqlite3.connect(DB_FILE)
         dest_conn = sqlite3.connect(str(backup_file))
-        source_conn.backup(dest_conn)
+        source_conn.backup(dest_conn, pages=-1, sleep=0)
         source_conn.close()
         dest_conn.close()
 
@@ -449,6 +450,20 @@ def list_backups() -> List[Dict[str, Any]]:
     except Exception:
         return []
 
+def _backup_dir_mtime() -> float:
+    """Modification time of the backup directory (changes when backups are added or removed)."""
+    try:
+        return os.stat(BACKUP_DIR).st_mtime
+    except OSError:
+        return 0.0
+
+@st.cache_data(max_entries=1)  # Only the current directory mtime is ever looked up again
+def _cached_list_backups(dir_mtime: float) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """Backup listing plus filename -> path options, cached per backup directory mtime."""
+    backups = list_backups()
+    options = {b['filename']: b['path'] for b in backups}
+    return backups, options
+
 def restore_backup(backup_path: str) -> Tuple[bool, str]:
     """Restore database from a backup file.
 
@@ -465,10 +480,10 @@ def restore_backup(backup_path: str) -> Tuple[bool, str]:
         # First, create a backup of current state
         create_backup("pre_restore")
 
-        # Restore using SQLite backup API
+        # Restore using SQLite backup API, whole database in one step
         source_conn = sqlite3.connect(backup_path)
         dest_conn = sqlite3.connect(DB_FILE)
-        source_conn.backup(dest_conn)
+        source_conn.backup(dest_conn, pages=-1, sleep=0)
         source_conn.close()
         dest_conn.close()
 
@@ -563,7 +578,8 @@ def init_database() -> None:
             CREATE TABLE IF NOT EXISTS users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
+                password_hash BLOB NOT NULL,
+                password_salt BLOB,
                 full_name TEXT,
                 role TEXT DEFAULT 'technician',
                 created_at TEXT,
@@ -643,7 +659,8 @@ def init_database() -> None:
         for col_sql in [
             "ALTER TABLE users ADD COLUMN must_change_password INTEGER DEFAULT 0",
             "ALTER TABLE users ADD COLUMN failed_login_attempts INTEGER DEFAULT 0",
-            "ALTER TABLE users ADD COLUMN locked_until TEXT"
+            "ALTER TABLE users ADD COLUMN locked_until TEXT",
+            "ALTER TABLE users ADD COLUMN password_salt BLOB"
         ]:
             try:
                 c.execute(col_sql)
@@ -687,11 +704,11 @@ def init_database() -> None:
 
         c.execute("SELECT COUNT(*) FROM users")
         if c.fetchone()[0] == 0:
-            admin_hash = hash_password("admin123")
+            admin_salt, admin_hash = hash_password("admin123")
             c.execute("""
-                INSERT INTO users (username, password_hash, full_name, role, created_at, must_change_password)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, ("admin", admin_hash, "System Administrator", "admin", datetime.now().isoformat(), 1))
+                INSERT INTO users (username, password_salt, password_hash, full_name, role, created_at, must_change_password)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, ("admin", admin_salt, admin_hash, "System Administrator", "admin", datetime.now().isoformat(), 1))
 
 def log_audit(action: str, details: str, user_id: Optional[int] = None) -> None:
     """Log user actions for compliance with better error handling."""
@@ -709,20 +726,34 @@ def log_audit(action: str, details: str, user_id: Optional[int] = None) -> None:
         # Silently fail audit logging to not interrupt main operations
         pass
 
-def hash_password(password: str) -> str:
-    """Hash password with salt using SHA256."""
-    salt = secrets.token_hex(16)
-    pwd_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-    return f"{salt}${pwd_hash}"
+def hash_password(password: str) -> Tuple[bytes, bytes]:
+    """Hash password with a random salt using SHA256. Returns raw (salt, digest) bytes."""
+    salt = secrets.token_bytes(16)
+    digest = hashlib.sha256(password.encode() + salt).digest()
+    return salt, digest
 
-def verify_password(password: str, hash_str: str) -> bool:
-    """Verify password against hash."""
+def verify_password(password: str, salt: bytes, digest: bytes) -> bool:
+    """Verify password against a stored raw salt and digest."""
     try:
-        salt, pwd_hash = hash_str.split('$')
-        return hashlib.sha256((password + salt).encode()).hexdigest() == pwd_hash
+        return hmac.compare_digest(hashlib.sha256(password.encode() + salt).digest(), digest)
     except Exception:
         return False
 
+def verify_legacy_password(password: str, stored: str) -> bool:
+    """Verify password against a legacy hex "salt$hash" string (NULL password_salt)."""
+    try:
+        hex_salt, pwd_hash = stored.split('$')
+        candidate = hashlib.sha256((password + hex_salt).encode()).hexdigest()
+        return hmac.compare_digest(candidate, pwd_hash)
+    except Exception:
+        return False
+
+def verify_stored_password(password: str, salt: Optional[bytes], stored: Union[bytes, str]) -> bool:
+    """Verify password against a users row's password_salt and password_hash."""
+    if salt is None:
+        return isinstance(stored, str) and verify_legacy_password(password, stored)
+    return isinstance(stored, bytes) and verify_password(password, salt, stored)
+
 def validate_password_strength(password: str) -> Tuple[bool, str]:
     """Validate password meets complexity requirements.
 
@@ -748,7 +779,7 @@ def authenticate_user(username: str, password: str) -> Optional[Dict]:
         with get_db_connection() as conn:
             c = conn.cursor()
             c.execute("""
-                SELECT id, username, password_hash, full_name, role,
+                SELECT id, username, password_salt, password_hash, full_name, role,
                        must_change_password, failed_login_attempts, locked_until
                 FROM users WHERE username = ?
             """, (username,))
@@ -758,7 +789,7 @@ def authenticate_user(username: str, password: str) -> Optional[Dict]:
                 log_audit("LOGIN_FAILED", f"Unknown username: {username}", None)
                 return None
 
-            user_id, _, pwd_hash, full_name, role, must_change_pwd, failed_attempts, locked_until = row
+            user_id, _, pwd_salt, pwd_hash, full_name, role, must_change_pwd, failed_attempts, locked_until = row
 
             # Check if account is locked
             if locked_until:
@@ -771,12 +802,18 @@ def authenticate_user(username: str, password: str) -> Optional[Dict]:
                     # Lockout expired, reset
                     c.execute("UPDATE users SET failed_login_attempts = 0, locked_until = NULL WHERE id = ?", (user_id,))
 
-            if verify_password(password, pwd_hash):
+            success = verify_stored_password(password, pwd_salt, pwd_hash)
+
+            if success:
                 # Successful login - reset failed attempts
                 c.execute("""
                     UPDATE users SET last_login = ?, failed_login_attempts = 0, locked_until = NULL
                     WHERE id = ?
                 """, (datetime.now().isoformat(), user_id))
+                if pwd_salt is None:
+                    # Upgrade legacy hex "salt$hash" row to raw bytes
+                    c.execute("UPDATE users SET password_salt = ?, password_hash = ? WHERE id = ?",
+                              (*hash_password(password), user_id))
                 conn.commit()
                 log_audit("LOGIN", f"User {username} logged in", user_id)
                 return {
@@ -3821,11 +3858,11 @@ def render_force_password_change():
                     try:
                         with get_db_connection() as conn:
                             c = conn.cursor()
-                            new_hash = hash_password(new_password)
+                            new_salt, new_hash = hash_password(new_password)
                             c.execute("""
-                                UPDATE users SET password_hash = ?, must_change_password = 0
+                                UPDATE users SET password_salt = ?, password_hash = ?, must_change_password = 0
                                 WHERE id = ?
-                            """, (new_hash, st.session_state.user['id']))
+                            """, (new_salt, new_hash, st.session_state.user['id']))
                             conn.commit()
 
                         st.session_state.user['must_change_password'] = False
@@ -5978,14 +6015,14 @@ def main():
                         # Verify current password
                         with get_db_connection() as conn:
                             c = conn.cursor()
-                            c.execute("SELECT password_hash FROM users WHERE id = ?",
+                            c.execute("SELECT password_salt, password_hash FROM users WHERE id = ?",
                                      (st.session_state.user['id'],))
                             row = c.fetchone()
-                            if row and verify_password(current_password, row[0]):
+                            if row and verify_stored_password(current_password, row[0], row[1]):
                                 # Update password
-                                new_hash = hash_password(new_password_1)
-                                c.execute("UPDATE users SET password_hash = ? WHERE id = ?",
-                                         (new_hash, st.session_state.user['id']))
+                                new_salt, new_hash = hash_password(new_password_1)
+                                c.execute("UPDATE users SET password_salt = ?, password_hash = ? WHERE id = ?",
+                                         (new_salt, new_hash, st.session_state.user['id']))
                                 conn.commit()
                                 st.success("✅ Password updated successfully")
                                 log_audit("PASSWORD_CHANGE", "User changed password",
@@ -6016,9 +6053,9 @@ def main():
                                 with get_db_connection() as conn:
                                     c = conn.cursor()
                                     c.execute("""
-                                        INSERT INTO users (username, password_hash, full_name, role, created_at, must_change_password)
-                                        VALUES (?, ?, ?, ?, ?, ?)
-                                    """, (new_username, hash_password(new_password),
+                                        INSERT INTO users (username, password_salt, password_hash, full_name, role, created_at, must_change_password)
+                                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                                    """, (new_username, *hash_password(new_password),
                                          new_fullname, new_role, datetime.now().isoformat(),
                                          1 if require_pwd_change else 0))
                                     conn.commit()
@@ -6107,7 +6144,7 @@ def main():
 
         # List available backups
         st.markdown("**Available Backups**")
-        backups = list_backups()
+        backups, backup_options = _cached_list_backups(_backup_dir_mtime())
 
         if backups:
             backup_df = pd.DataFrame(backups)
@@ -6119,9 +6156,8 @@ def main():
                 st.markdown("**Restore from Backup** (Admin only)")
                 st.warning("Restoring will replace all current data. A backup of the current state will be created first.")
 
-                backup_options = {b['filename']: b['path'] for b in backups}
                 selected_backup = st.selectbox("Select backup to restore",
-                                               options=list(backup_options.keys()))
+                                               options=list(backup_options))
 
                 if st.button("Restore Selected Backup", type="secondary"):
                     if selected_backup:
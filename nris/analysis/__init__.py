@@ -6,7 +6,10 @@ from .trisomy import analyze_trisomy
 from .sca import analyze_sca
 from .cnv import analyze_cnv
 from .rat import analyze_rat
-from .qc import check_qc_metrics, validate_inputs, get_reportable_status
+from .qc import (
+    check_qc_metrics, validate_inputs, validate_inputs_batch, min_reads_batch, get_reportable_status,
+    ResultText, fold_result,
+)
 
 __all__ = [
     'analyze_trisomy',
@@ -15,5 +18,9 @@ __all__ = [
     'analyze_rat',
     'check_qc_metrics',
     'validate_inputs',
+    'validate_inputs_batch',
+    'min_reads_batch',
     'get_reportable_status',
+    'ResultText',
+    'fold_result',
 ]
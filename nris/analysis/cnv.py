@@ -2,8 +2,15 @@
 Copy Number Variation (CNV) analysis functions for NRIS.
 """
 
+from types import MappingProxyType
 from typing import Dict, Tuple, Optional
 
+# Ratio thresholds by CNV size band, used when config has none for the test.
+# Built once instead of as a dict literal on every call.
+_DEFAULT_CNV_THRESHOLDS = MappingProxyType(
+    {'>= 10': 6.0, '> 7': 8.0, '> 3.5': 10.0, '<= 3.5': 12.0}
+)
+
 
 def analyze_cnv(size: float, ratio: float, test_number: int = 1, config: Optional[Dict] = None) -> Tuple[str, float, str]:
     """CNV (Copy Number Variation) analysis.
@@ -20,13 +27,12 @@ def analyze_cnv(size: float, ratio: float, test_number: int = 1, config: Optiona
     # Get test-specific thresholds if available
     if config:
         test_thresholds = config.get('TEST_SPECIFIC_THRESHOLDS', {}).get('CNV', {})
-        cnv_thresholds = test_thresholds.get(test_number, {
-            '>= 10': 6.0, '> 7': 8.0, '> 3.5': 10.0, '<= 3.5': 12.0
-        })
+        cnv_thresholds = test_thresholds.get(test_number, _DEFAULT_CNV_THRESHOLDS)
     else:
-        cnv_thresholds = {'>= 10': 6.0, '> 7': 8.0, '> 3.5': 10.0, '<= 3.5': 12.0}
+        cnv_thresholds = _DEFAULT_CNV_THRESHOLDS
 
-    # Determine threshold based on CNV size
+    # Determine threshold based on CNV size. The bands close on different
+    # sides (>= 10 but > 7 and > 3.5), so keep explicit comparisons
     if size >= 10:
         threshold = cnv_thresholds.get('>= 10', 6.0)
     elif size > 7:
@@ -2,7 +2,18 @@
 Quality Control (QC) analysis functions for NRIS.
 """
 
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Mapping, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Error messages indexed by validation bit (reads, cff, gc, age)
+_INPUT_ERRORS = (
+    "Reads must be 0-100M",
+    "Cff must be 0-50%",
+    "GC must be 0-100%",
+    "Age must be 15-60",
+)
 
 
 def validate_inputs(reads: float, cff: float, gc: float, age: int) -> List[str]:
@@ -17,16 +28,56 @@ def validate_inputs(reads: float, cff: float, gc: float, age: int) -> List[str]:
     Returns:
         List of error messages (empty if valid)
     """
-    errors = []
-    if reads < 0 or reads > 100:
-        errors.append("Reads must be 0-100M")
-    if cff < 0 or cff > 50:
-        errors.append("Cff must be 0-50%")
-    if gc < 0 or gc > 100:
-        errors.append("GC must be 0-100%")
-    if age < 15 or age > 60:
-        errors.append("Age must be 15-60")
-    return errors
+    bits = ((reads < 0 or reads > 100)
+            | (cff < 0 or cff > 50) << 1
+            | (gc < 0 or gc > 100) << 2
+            | (age < 15 or age > 60) << 3)
+    if not bits:
+        return []
+    return [msg for i, msg in enumerate(_INPUT_ERRORS) if bits >> i & 1]
+
+
+def validate_inputs_batch(df: Union[pd.DataFrame, Mapping[str, Any]]) -> np.ndarray:
+    """Validate clinical inputs for many samples at once.
+
+    Args:
+        df: DataFrame (or mapping of arrays) with 'reads', 'cff', 'gc'
+            and 'age' columns
+
+    Returns:
+        Boolean array of shape (n_rows, 4); column i is True where the row
+        fails the check described by the i-th validate_inputs message
+    """
+    reads = np.asarray(df['reads'], dtype=float)
+    cff = np.asarray(df['cff'], dtype=float)
+    gc = np.asarray(df['gc'], dtype=float)
+    age = np.asarray(df['age'], dtype=float)
+    return np.column_stack((
+        (reads < 0) | (reads > 100),
+        (cff < 0) | (cff > 50),
+        (gc < 0) | (gc > 100),
+        (age < 15) | (age > 60),
+    ))
+
+
+def min_reads_batch(config: Dict, panels: Union[Sequence[str], np.ndarray]) -> np.ndarray:
+    """Minimum reads required for each sample's panel.
+
+    Each distinct panel name is looked up in PANEL_READ_LIMITS once and
+    the result broadcast back by index, rather than hashing the name for
+    every row. Unknown panels get the same default as check_qc_metrics.
+
+    Args:
+        config: Configuration dictionary with PANEL_READ_LIMITS
+        panels: Sequence (or Series) of panel type names
+
+    Returns:
+        Float array with one read limit per panel entry
+    """
+    names, inverse = np.unique(np.asarray(panels, dtype=str), return_inverse=True)
+    limits = config['PANEL_READ_LIMITS']
+    per_name = np.array([limits.get(name, 5) for name in names], dtype=float)
+    return per_name[inverse]
 
 
 def check_qc_metrics(config: Dict, panel: str, reads: float, cff: float, gc: float,
@@ -83,16 +134,36 @@ def check_qc_metrics(config: Dict, panel: str, reads: float, cff: float, gc: flo
         issues.append(f"SOFT: ErrorRate {error}% High")
 
     status = "FAIL" if any("HARD" in i for i in issues) else ("WARNING" if issues else "PASS")
-    advice_str = " / ".join(set(advice)) if advice else "None"
+    advice_str = " / ".join(dict.fromkeys(advice)) if advice else "None"
 
     return status, issues, advice_str
 
 
-def get_reportable_status(result_text: str, qc_status: str = "PASS", qc_override: bool = False) -> Tuple[str, str]:
+class ResultText(NamedTuple):
+    """Result text paired with its upper-cased form.
+
+    Lets a result be classified by several predicates (reportable status,
+    clinical recommendation, summary colouring) with a single .upper().
+    """
+    text: str
+    upper: str
+
+
+def fold_result(result_text: Union[str, ResultText]) -> ResultText:
+    """Wrap a result text with its upper-cased form (no-op if already folded)."""
+    if isinstance(result_text, ResultText):
+        return result_text
+    text = str(result_text)
+    return ResultText(text, text.upper())
+
+
+def get_reportable_status(result_text: Union[str, ResultText], qc_status: str = "PASS",
+                          qc_override: bool = False) -> Tuple[str, str]:
     """Determine if a result should be reported to the patient.
 
     Args:
-        result_text: The result text (e.g., "Low Risk", "High Risk -> Re-library", "POSITIVE")
+        result_text: The result text (e.g., "Low Risk", "High Risk -> Re-library", "POSITIVE"),
+            or a ResultText from fold_result() to skip re-folding the case
         qc_status: QC status (PASS, FAIL, WARNING)
         qc_override: Whether QC has been overridden by staff
 
@@ -101,7 +172,10 @@ def get_reportable_status(result_text: str, qc_status: str = "PASS", qc_override
         - "Yes": Result should be reported (positive or negative/low risk)
         - "No": Result requires re-processing (re-library, resample, QC fail)
     """
-    result_upper = str(result_text).upper()
+    if isinstance(result_text, ResultText):
+        result_upper = result_text.upper
+    else:
+        result_upper = str(result_text).upper()
 
     # QC Fail without override -> Not reportable
     if qc_status == "FAIL" and not qc_override:
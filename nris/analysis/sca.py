@@ -2,8 +2,13 @@
 Sex Chromosome Aneuploidy (SCA) analysis functions for NRIS.
 """
 
+import sys
 from typing import Dict, Tuple
 
+# SCA types reported positive without a Z-score check
+_FIRST_TEST_POSITIVE = frozenset({"XXY", "XYY"})
+_REPEAT_TEST_POSITIVE = frozenset({"XYY", "XXY", "XXX+XY"})
+
 
 def analyze_sca(config: Dict, sca_type: str, z_xx: float, z_xy: float, cff: float, test_number: int = 1) -> Tuple[str, str]:
     """Enhanced SCA (Sex Chromosomal Aneuploidies) analysis.
@@ -31,6 +36,10 @@ def analyze_sca(config: Dict, sca_type: str, z_xx: float, z_xy: float, cff: floa
     - Low CFF (<3.5%): Do not refer to first result
     - When CFF >= 3.5%: More stringent interpretation
     """
+    # Interned input lets the == checks below hit the identity fast path
+    if type(sca_type) is str:
+        sca_type = sys.intern(sca_type)
+
     min_cff = config['QC_THRESHOLDS']['MIN_CFF']
 
     # Get test-specific thresholds if available, otherwise use defaults
@@ -61,7 +70,7 @@ def analyze_sca(config: Dict, sca_type: str, z_xx: float, z_xy: float, cff: floa
         if sca_type == "XO+XY":
             return ("POSITIVE (XO+XY)", "POSITIVE") if z_xy >= xy_threshold else ("Ambiguous XO+XY -> Re-library", "HIGH")
 
-        if sca_type in ["XXY", "XYY"]:
+        if sca_type in _FIRST_TEST_POSITIVE:
             return f"POSITIVE ({sca_type})", "POSITIVE"
 
         return "Ambiguous SCA -> Re-library", "HIGH"
@@ -80,7 +89,7 @@ def analyze_sca(config: Dict, sca_type: str, z_xx: float, z_xy: float, cff: floa
             return f"Negative (Male, {test_label})", "LOW"
 
         # Always positive SCAs
-        if sca_type in ["XYY", "XXY", "XXX+XY"]:
+        if sca_type in _REPEAT_TEST_POSITIVE:
             return f"POSITIVE ({sca_type}, {test_label})", "POSITIVE"
 
         # XO: Needs verification based on Z-score consistency
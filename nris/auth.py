@@ -3,10 +3,10 @@ Authentication and security functions for NRIS.
 """
 
 import hashlib
+import hmac
 import secrets
-import re
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from typing import Dict, Optional, Tuple, Union
 
 # Security constants
 MAX_LOGIN_ATTEMPTS = 5
@@ -14,22 +14,50 @@ LOCKOUT_DURATION_MINUTES = 15
 SESSION_TIMEOUT_MINUTES = 60
 
 
-def hash_password(password: str) -> str:
-    """Hash password with salt using SHA256."""
-    salt = secrets.token_hex(16)
-    pwd_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-    return f"{salt}${pwd_hash}"
+def hash_password(password: str) -> Tuple[bytes, bytes]:
+    """Hash password with a random salt using SHA256.
+
+    Returns (salt, digest) as raw bytes, stored in the ``password_salt`` and
+    ``password_hash`` BLOB columns.
+    """
+    salt = secrets.token_bytes(16)
+    digest = hashlib.sha256(password.encode() + salt).digest()
+    return salt, digest
 
 
-def verify_password(password: str, hash_str: str) -> bool:
-    """Verify password against hash."""
+def verify_password(password: str, salt: bytes, digest: bytes) -> bool:
+    """Verify password against a stored raw salt and digest."""
     try:
-        salt, pwd_hash = hash_str.split('$')
-        return hashlib.sha256((password + salt).encode()).hexdigest() == pwd_hash
+        return hmac.compare_digest(hashlib.sha256(password.encode() + salt).digest(), digest)
     except Exception:
         return False
 
 
+def verify_legacy_password(password: str, stored: str) -> bool:
+    """Verify password against a legacy hex ``"salt$hash"`` string.
+
+    Rows written before the BLOB columns existed keep this string in
+    ``password_hash`` with a NULL ``password_salt``.
+    """
+    try:
+        hex_salt, pwd_hash = stored.split('$')
+        candidate = hashlib.sha256((password + hex_salt).encode()).hexdigest()
+        return hmac.compare_digest(candidate, pwd_hash)
+    except Exception:
+        return False
+
+
+def verify_stored_password(password: str, salt: Optional[bytes],
+                           stored: Union[bytes, str]) -> bool:
+    """Verify password against a users row's ``password_salt`` and ``password_hash``.
+
+    A NULL salt marks a legacy row (see verify_legacy_password).
+    """
+    if salt is None:
+        return isinstance(stored, str) and verify_legacy_password(password, stored)
+    return isinstance(stored, bytes) and verify_password(password, salt, stored)
+
+
 def validate_password_strength(password: str) -> Tuple[bool, str]:
     """Validate password meets complexity requirements.
 
@@ -37,11 +65,24 @@ def validate_password_strength(password: str) -> Tuple[bool, str]:
     """
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r'[A-Z]', password):
+
+    # Single pass over the password, recording which character classes appear
+    seen = 0
+    for ch in password:
+        if 'A' <= ch <= 'Z':
+            seen |= 1
+        elif 'a' <= ch <= 'z':
+            seen |= 2
+        elif ch.isdecimal():
+            seen |= 4
+        if seen == 7:
+            break
+
+    if not seen & 1:
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r'[a-z]', password):
+    if not seen & 2:
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r'\d', password):
+    if not seen & 4:
         return False, "Password must contain at least one number"
     return True, ""
 
@@ -62,7 +103,7 @@ def authenticate_user(username: str, password: str, db_connection_func, log_audi
         with db_connection_func() as conn:
             c = conn.cursor()
             c.execute("""
-                SELECT id, username, password_hash, full_name, role,
+                SELECT id, username, password_salt, password_hash, full_name, role,
                        must_change_password, failed_login_attempts, locked_until
                 FROM users WHERE username = ?
             """, (username,))
@@ -72,7 +113,7 @@ def authenticate_user(username: str, password: str, db_connection_func, log_audi
                 log_audit_func("LOGIN_FAILED", f"Unknown username: {username}", None)
                 return None
 
-            user_id, _, pwd_hash, full_name, role, must_change_pwd, failed_attempts, locked_until = row
+            user_id, _, pwd_salt, pwd_hash, full_name, role, must_change_pwd, failed_attempts, locked_until = row
 
             # Check if account is locked
             if locked_until:
@@ -81,17 +122,36 @@ def authenticate_user(username: str, password: str, db_connection_func, log_audi
                     remaining = (lock_time - datetime.now()).seconds // 60
                     log_audit_func("LOGIN_BLOCKED", f"Account locked for user {username}", user_id)
                     return {'error': f'Account locked. Try again in {remaining + 1} minutes.'}
-                else:
-                    # Lockout expired, reset
-                    c.execute("UPDATE users SET failed_login_attempts = 0, locked_until = NULL WHERE id = ?", (user_id,))
-
-            if verify_password(password, pwd_hash):
-                # Successful login - reset failed attempts
-                c.execute("""
-                    UPDATE users SET last_login = ?, failed_login_attempts = 0, locked_until = NULL
-                    WHERE id = ?
-                """, (datetime.now().isoformat(), user_id))
-                conn.commit()
+                # Lockout expired, reset (persisted by the single update below)
+                failed_attempts = 0
+
+            # Compute the new lockout state, then write it in one statement
+            success = verify_stored_password(password, pwd_salt, pwd_hash)
+            new_locked_until: Optional[str] = None
+            new_last_login: Optional[str] = None
+            new_salt: Optional[bytes] = None
+            new_digest: Optional[bytes] = None
+            if success:
+                new_attempts = 0
+                new_last_login = datetime.now().isoformat()
+                if pwd_salt is None:
+                    # Upgrade legacy hex "salt$hash" rows to raw bytes
+                    new_salt, new_digest = hash_password(password)
+            else:
+                new_attempts = (failed_attempts or 0) + 1
+                if new_attempts >= MAX_LOGIN_ATTEMPTS:
+                    new_locked_until = (datetime.now() + timedelta(minutes=LOCKOUT_DURATION_MINUTES)).isoformat()
+
+            c.execute("""
+                UPDATE users SET failed_login_attempts = ?, locked_until = ?,
+                                 last_login = COALESCE(?, last_login),
+                                 password_salt = COALESCE(?, password_salt),
+                                 password_hash = COALESCE(?, password_hash)
+                WHERE id = ?
+            """, (new_attempts, new_locked_until, new_last_login, new_salt, new_digest, user_id))
+            conn.commit()
+
+            if success:
                 log_audit_func("LOGIN", f"User {username} logged in", user_id)
                 return {
                     'id': user_id,
@@ -100,19 +160,10 @@ def authenticate_user(username: str, password: str, db_connection_func, log_audi
                     'role': role,
                     'must_change_password': bool(must_change_pwd)
                 }
+            if new_locked_until:
+                log_audit_func("ACCOUNT_LOCKED", f"Account locked after {MAX_LOGIN_ATTEMPTS} failed attempts", user_id)
             else:
-                # Failed login
-                new_attempts = (failed_attempts or 0) + 1
-                if new_attempts >= MAX_LOGIN_ATTEMPTS:
-                    lock_until = (datetime.now() + timedelta(minutes=LOCKOUT_DURATION_MINUTES)).isoformat()
-                    c.execute("""
-                        UPDATE users SET failed_login_attempts = ?, locked_until = ? WHERE id = ?
-                    """, (new_attempts, lock_until, user_id))
-                    log_audit_func("ACCOUNT_LOCKED", f"Account locked after {MAX_LOGIN_ATTEMPTS} failed attempts", user_id)
-                else:
-                    c.execute("UPDATE users SET failed_login_attempts = ? WHERE id = ?", (new_attempts, user_id))
-                    log_audit_func("LOGIN_FAILED", f"Invalid password for {username} (attempt {new_attempts})", user_id)
-                conn.commit()
+                log_audit_func("LOGIN_FAILED", f"Invalid password for {username} (attempt {new_attempts})", user_id)
     except Exception:
         pass
     return None
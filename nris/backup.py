@@ -13,6 +13,7 @@ Features:
 Dependencies:
     - sqlite3: For database operations
     - pathlib: For path handling
+    - zstandard (optional): Compresses backups to ``.db.zst`` when installed
 
 Example:
     >>> from nris.backup import create_backup, list_backups
@@ -21,18 +22,96 @@ Example:
 """
 
 import os
+import json
+import time
+import shutil
+import mmap
+import queue
+import hashlib
 import sqlite3
 import logging
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore[assignment, unused-ignore]
 
 from .config import DB_FILE, BACKUP_DIR, MAX_BACKUPS
 
+__all__ = [
+    'BackupError',
+    'RestoreError',
+    'BACKUP_CHECKSUM_SUFFIX',
+    'ensure_backup_dir',
+    'create_backup',
+    'create_backup_async',
+    'wait_for_backup',
+    'get_backup_status',
+    'rotate_backups',
+    'list_backups',
+    'restore_backup',
+    'verify_database_integrity',
+    'enable_wal_mode',
+    'startup_data_protection',
+    'get_backup_stats',
+]
+
 # Set up module logger
 logger = logging.getLogger(__name__)
 
 
+_BYTES_PER_MB = 1024 * 1024
+
+# zstd level for compressed backups (fast, typically 3-5x on SQLite files)
+BACKUP_COMPRESSION_LEVEL = 3
+_COMPRESSED_SUFFIX = ".zst"
+
+# Sidecar holding a backup's blake2b checksum, written right after the backup
+BACKUP_CHECKSUM_SUFFIX = ".blake2b"
+
+# ioctl(FICLONE): copy-on-write clone of a whole file (btrfs, XFS)
+_FICLONE = 0x40049409
+
+# Records which backup matches the database's last seen on-disk state
+_BACKUP_STATE_FILE = ".last_backup_state.json"
+
+# Page cache for the backup's source connection (negative = KiB)
+BACKUP_CACHE_SIZE_KIB = 65536
+
+# VACUUM INTO (single C-level pass, compact output) needs SQLite 3.27+
+_HAS_VACUUM_INTO = sqlite3.sqlite_version_info >= (3, 27, 0)
+
+# Deleting more old backups than this at once is spread over a thread pool
+PARALLEL_DELETE_THRESHOLD = 4
+DELETE_WORKERS = 8
+
+# Connections to DB_FILE reused by backup and integrity checks
+POOL_SIZE = 4
+_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=POOL_SIZE)
+_pool_db: Optional[str] = None
+_pool_lock = threading.Lock()
+
+# Single worker so backups are serialized (concurrent copies fight for the disk)
+_BACKUP_THREAD_PREFIX = "nris-backup"
+_backup_executor: Optional[ThreadPoolExecutor] = None
+_backup_executor_lock = threading.Lock()
+
+# list_backups() result, reused while the backup directory is unchanged
+_LIST_CACHE: Dict[str, Any] = {'dir': None, 'dir_mtime_ns': None, 'entries': None}
+
+
 class BackupError(Exception):
     """Exception raised for backup-related errors."""
     pass
@@ -43,6 +122,55 @@ class RestoreError(Exception):
     pass
 
 
+def _close_pooled(conn: sqlite3.Connection) -> None:
+    """Close a pooled connection, letting SQLite refresh its statistics first."""
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass
+    conn.close()
+
+
+@contextmanager
+def _pooled_connection() -> Iterator[sqlite3.Connection]:
+    """Borrow a connection to DB_FILE from the module pool.
+
+    Connections are opened lazily and returned to the pool afterwards, so
+    repeated backups and integrity checks skip connect/schema-load costs.
+    A connection that raised is closed instead of being reused, and the
+    pool is emptied if DB_FILE changes.
+    """
+    global _pool_db
+    db_file = DB_FILE
+    with _pool_lock:
+        if _pool_db != db_file:
+            while True:
+                try:
+                    _close_pooled(_pool.get_nowait())
+                except queue.Empty:
+                    break
+            _pool_db = db_file
+
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = sqlite3.connect(db_file, check_same_thread=False)
+
+    try:
+        yield conn
+    except BaseException:
+        conn.close()
+        raise
+
+    if _pool_db != db_file:
+        _close_pooled(conn)
+        return
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        _close_pooled(conn)
+
+
 def ensure_backup_dir() -> Path:
     """Ensure backup directory exists and return its path.
 
@@ -59,11 +187,153 @@ def ensure_backup_dir() -> Path:
     return backup_path
 
 
+def _scan_backups(backup_path: Path) -> List[os.DirEntry]:
+    """Return backup file entries in ``backup_path``, newest first.
+
+    Uses a single ``os.scandir`` pass; each entry caches its own ``stat()``
+    result, so callers can read size and mtime without further syscalls.
+    """
+    with os.scandir(backup_path) as it:
+        entries = [e for e in it
+                   if e.name.startswith("nris_backup_")
+                   and e.name.endswith((".db", ".db" + _COMPRESSED_SUFFIX))]
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    return entries
+
+
+def _db_fingerprint() -> List[int]:
+    """Size and mtime (ns) of the database and its WAL file.
+
+    Any committed write changes at least one of these, and unlike
+    ``PRAGMA data_version`` the values stay comparable across connections
+    and process restarts. A checkpoint may change them without a logical
+    change, which only costs an unnecessary (but correct) full backup.
+    """
+    parts: List[int] = []
+    for path in (DB_FILE, DB_FILE + "-wal"):
+        try:
+            st = os.stat(path)
+            parts += [st.st_size, st.st_mtime_ns]
+        except FileNotFoundError:
+            parts += [-1, -1]
+    return parts
+
+
+def _unchanged_backup(backup_path: Path, fingerprint: List[int]) -> Optional[Path]:
+    """Return the newest backup if the database hasn't changed since it was taken."""
+    try:
+        state = json.loads((backup_path / _BACKUP_STATE_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    if state.get('fingerprint') != fingerprint:
+        return None
+    previous = backup_path / state.get('filename', '')
+    return previous if previous.is_file() else None
+
+
+def _clone_file(src: str, dest: Path) -> None:
+    """Copy ``src`` to ``dest`` with the cheapest mechanism available.
+
+    Tries a reflink (O(1) on btrfs/XFS), then ``os.copy_file_range``
+    (in-kernel copy on Linux), then a plain buffered copy.
+    """
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                return
+            except OSError:
+                pass
+        if hasattr(os, 'copy_file_range'):
+            remaining = os.fstat(fsrc.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst, _BYTES_PER_MB)
+
+
+def _compress_backup(src: Path, dest: Path) -> None:
+    """Stream ``src`` into a zstd-compressed ``dest`` in 1 MB chunks."""
+    cctx = zstandard.ZstdCompressor(level=BACKUP_COMPRESSION_LEVEL)
+    with open(src, 'rb') as fin, open(dest, 'wb') as fout:
+        cctx.copy_stream(fin, fout, read_size=_BYTES_PER_MB, write_size=_BYTES_PER_MB)
+
+
+def _write_backup_checksum(backup_file: Path) -> Optional[str]:
+    """Hash a just-written backup and store the digest in its sidecar file.
+
+    The backup's pages are still in the OS page cache, so hashing through
+    an mmap view is close to free compared with re-reading it later.
+
+    Returns:
+        Hex digest, or None if hashing failed.
+    """
+    try:
+        with open(backup_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            digest = hashlib.blake2b(mm).hexdigest()
+        Path(str(backup_file) + BACKUP_CHECKSUM_SUFFIX).write_text(digest)
+        return digest
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not checksum backup {backup_file.name}: {e}")
+        return None
+
+
+def _fsync_file(path: Path) -> None:
+    """Flush a finished file to disk before it's renamed into place."""
+    # Opened for writing: on Windows fsync is FlushFileBuffers, which
+    # fails with EBADF on a read-only handle
+    with open(path, 'r+b') as f:
+        os.fsync(f.fileno())
+
+
+def _release_backup_pages(backup_file: Path) -> None:
+    """Drop a finished, already fsynced backup from the page cache.
+
+    Backups are written once and rarely read, so their pages would only
+    evict the live database's working set. No-op where posix_fadvise is
+    unavailable (e.g. Windows, macOS).
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(str(backup_file), os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug(f"Could not release page cache for {backup_file.name}: {e}")
+
+
+def _read_backup_checksum(backup_path: str) -> Optional[str]:
+    """Return the stored checksum for a backup, or None if there is none."""
+    try:
+        return Path(backup_path + BACKUP_CHECKSUM_SUFFIX).read_text().strip()
+    except OSError:
+        return None
+
+
 def create_backup(reason: str = "manual") -> Optional[str]:
     """Create a timestamped backup of the database.
 
-    Uses SQLite's backup API for safe, consistent backups even while
-    the database is in use.
+    Uses ``VACUUM INTO`` for a safe, consistent and defragmented copy
+    even while the database is in use, falling back to SQLite's backup
+    API on SQLite versions older than 3.27.
+    If the optional ``zstandard`` package is installed, the backup is
+    stored zstd-compressed as ``.db.zst``. If the database files haven't
+    changed since the previous backup, that backup's file is cloned under
+    the new name instead of being exported again.
 
     Args:
         reason: Why backup was created. Common values:
@@ -80,30 +350,148 @@ def create_backup(reason: str = "manual") -> Optional[str]:
         Returns None (doesn't raise) if database doesn't exist or
         backup fails, to allow graceful degradation.
 
+        Runs on the backup worker thread and waits for it; use
+        create_backup_async() to avoid blocking the caller.
+
     Example:
         >>> path = create_backup("manual")
         >>> if path:
         ...     print(f"Backup created: {path}")
     """
+    if threading.current_thread().name.startswith(_BACKUP_THREAD_PREFIX):
+        return _create_backup(reason)
+    return create_backup_async(reason).result()
+
+
+def create_backup_async(reason: str = "manual") -> "Future[Optional[str]]":
+    """Queue a backup on the backup worker thread and return immediately.
+
+    Backups are serialized on a single worker, so queued requests run one
+    after another.
+
+    Args:
+        reason: Why backup was created (see create_backup).
+
+    Returns:
+        Future resolving to the backup path, or None if the backup failed.
+
+    Example:
+        >>> future = create_backup_async("manual")
+        >>> path = wait_for_backup(future, timeout=30)
+    """
+    global _backup_executor
+    with _backup_executor_lock:
+        if _backup_executor is None:
+            _backup_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=_BACKUP_THREAD_PREFIX
+            )
+    return _backup_executor.submit(_create_backup, reason)
+
+
+def wait_for_backup(future: "Future[Optional[str]]",
+                    timeout: Optional[float] = None) -> Optional[str]:
+    """Wait for a queued backup to finish.
+
+    Args:
+        future: Future returned by create_backup_async().
+        timeout: Seconds to wait, or None to wait indefinitely.
+
+    Returns:
+        Path to the backup file, or None if it failed or timed out.
+    """
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        return None
+
+
+def get_backup_status(future: "Future[Optional[str]]") -> Dict[str, Any]:
+    """Report the state of a queued backup without blocking.
+
+    Returns:
+        Dictionary containing:
+            - state (str): "pending", "running", "completed" or "failed"
+            - path (str|None): Backup path once completed
+    """
+    if not future.done():
+        return {'state': 'running' if future.running() else 'pending', 'path': None}
+    path = future.result()
+    return {'state': 'completed' if path else 'failed', 'path': path}
+
+
+def _create_backup(reason: str) -> Optional[str]:
+    """Create a backup on the current thread (body of create_backup)."""
     if not os.path.exists(DB_FILE):
         logger.debug("No database file to backup")
         return None
 
-    source_conn = None
     dest_conn = None
+    tmp_file = None
+    packed_file = None
 
     try:
         backup_path = ensure_backup_dir()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_filename = f"nris_backup_{timestamp}_{reason}.db"
         backup_file = backup_path / backup_filename
-
-        # Use SQLite's backup API for safe copying
-        source_conn = sqlite3.connect(DB_FILE)
-        dest_conn = sqlite3.connect(str(backup_file))
-        source_conn.backup(dest_conn)
-
-        logger.info(f"Backup created: {backup_file}")
+        # Written under a temporary name and renamed into place, so a crash
+        # mid-write never leaves a truncated file that list_backups would show
+        tmp_file = backup_path / (backup_filename + ".tmp")
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+        fingerprint = _db_fingerprint()
+        previous = _unchanged_backup(backup_path, fingerprint)
+        if previous is not None and previous.name.endswith(_COMPRESSED_SUFFIX):
+            backup_file = backup_path / (backup_filename + _COMPRESSED_SUFFIX)
+        if previous == backup_file:
+            previous = None
+
+        if previous is not None:
+            # Nothing written since the last backup: reuse its bytes. A
+            # clone, not a hardlink, so the new backup gets its own mtime
+            # and rotation and list_backups order it by when it was taken
+            _clone_file(str(previous), tmp_file)
+            _fsync_file(tmp_file)
+            os.replace(tmp_file, backup_file)
+            tmp_file = None
+            checksum = _read_backup_checksum(str(previous))
+            if checksum:
+                Path(str(backup_file) + BACKUP_CHECKSUM_SUFFIX).write_text(checksum)
+            logger.info(f"Database unchanged since {previous.name}, cloned backup: {backup_file}")
+        else:
+            with _pooled_connection() as source_conn:
+                source_conn.execute(f"PRAGMA cache_size = -{BACKUP_CACHE_SIZE_KIB}")
+                source_conn.execute("PRAGMA temp_store = MEMORY")
+                if _HAS_VACUUM_INTO:
+                    source_conn.execute("VACUUM INTO ?", (str(tmp_file),))
+                else:
+                    # Use SQLite's backup API, whole database in one step
+                    dest_conn = sqlite3.connect(str(tmp_file))
+                    dest_conn.execute("PRAGMA temp_store = MEMORY")
+                    source_conn.backup(dest_conn, pages=-1, sleep=0)
+                    dest_conn.close()
+                    dest_conn = None
+
+            if zstandard is not None:
+                backup_file = backup_path / (backup_filename + _COMPRESSED_SUFFIX)
+                packed_file = backup_path / (backup_file.name + ".tmp")
+                _compress_backup(tmp_file, packed_file)
+                tmp_file.unlink()
+                tmp_file, packed_file = packed_file, None
+
+            _fsync_file(tmp_file)
+            os.replace(tmp_file, backup_file)
+            tmp_file = None
+
+            _write_backup_checksum(backup_file)
+            _release_backup_pages(backup_file)
+            logger.info(f"Backup created: {backup_file}")
+
+        (backup_path / _BACKUP_STATE_FILE).write_text(
+            json.dumps({'fingerprint': fingerprint, 'filename': backup_file.name})
+        )
+        _LIST_CACHE['dir_mtime_ns'] = None
 
         # Rotate old backups
         rotate_backups()
@@ -120,10 +508,34 @@ def create_backup(reason: str = "manual") -> Optional[str]:
         logger.error(f"Unexpected error during backup: {e}")
         return None
     finally:
-        if source_conn:
-            source_conn.close()
         if dest_conn:
             dest_conn.close()
+        for leftover in (tmp_file, packed_file):
+            if leftover is not None:
+                try:
+                    leftover.unlink()
+                except OSError:
+                    pass
+
+
+def _delete_backup(entry: os.DirEntry) -> bool:
+    """Delete one backup file, logging (not raising) on failure."""
+    try:
+        os.unlink(entry.path)
+    except PermissionError:
+        logger.warning(f"Permission denied deleting backup: {entry.name}")
+        return False
+    except OSError as e:
+        logger.warning(f"Could not delete backup {entry.name}: {e}")
+        return False
+
+    try:
+        os.unlink(entry.path + BACKUP_CHECKSUM_SUFFIX)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not delete checksum for {entry.name}: {e}")
+    return True
 
 
 def rotate_backups() -> int:
@@ -140,21 +552,20 @@ def rotate_backups() -> int:
 
     try:
         backup_path = ensure_backup_dir()
-        backups = sorted(
-            [f for f in backup_path.glob("nris_backup_*.db")],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True
-        )
+        old_backups = _scan_backups(backup_path)[MAX_BACKUPS:]
 
-        for old_backup in backups[MAX_BACKUPS:]:
-            try:
-                old_backup.unlink()
-                deleted_count += 1
-                logger.debug(f"Deleted old backup: {old_backup.name}")
-            except PermissionError:
-                logger.warning(f"Permission denied deleting backup: {old_backup.name}")
-            except OSError as e:
-                logger.warning(f"Could not delete backup {old_backup.name}: {e}")
+        if len(old_backups) > PARALLEL_DELETE_THRESHOLD:
+            # unlink latency dominates on network/spinning storage
+            with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+                results = list(executor.map(_delete_backup, old_backups))
+        else:
+            results = list(map(_delete_backup, old_backups))
+
+        deleted_names = [e.name for e, ok in zip(old_backups, results) if ok]
+        deleted_count = len(deleted_names)
+        if deleted_count:
+            _LIST_CACHE['dir_mtime_ns'] = None
+            logger.debug("Rotated %d backups: %s", deleted_count, deleted_names)
 
     except OSError as e:
         logger.warning(f"Error during backup rotation: {e}")
@@ -170,10 +581,16 @@ def list_backups() -> List[Dict[str, Any]]:
             - filename: Name of the backup file
             - path: Full path to the backup file
             - size_mb: File size in megabytes (rounded to 2 decimal places)
+            - size_bytes: Exact file size in bytes
             - created: Creation timestamp as formatted string
+            - checksum: blake2b hex digest recorded at backup time, or None
 
         Returns empty list if no backups exist or on error.
 
+    Note:
+        The listing is cached and reused while the backup directory's
+        mtime is unchanged; create_backup and rotate_backups invalidate it.
+
     Example:
         >>> backups = list_backups()
         >>> for b in backups:
@@ -181,33 +598,88 @@ def list_backups() -> List[Dict[str, Any]]:
     """
     try:
         backup_path = ensure_backup_dir()
-        backups = []
+        dir_mtime_ns = os.stat(backup_path).st_mtime_ns
+        if (_LIST_CACHE['dir'] == str(backup_path)
+                and _LIST_CACHE['dir_mtime_ns'] == dir_mtime_ns):
+            return list(_LIST_CACHE['entries'])
 
-        for backup_file in sorted(
-            backup_path.glob("nris_backup_*.db"),
-            key=lambda x: x.stat().st_mtime,
-            reverse=True
-        ):
+        backups = []
+        unreadable = []
+        for backup_file in _scan_backups(backup_path):
             try:
                 stat = backup_file.stat()
                 backups.append({
                     'filename': backup_file.name,
-                    'path': str(backup_file),
-                    'size_mb': round(stat.st_size / (1024 * 1024), 2),
-                    'created': datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+                    'path': backup_file.path,
+                    'size_mb': round(stat.st_size / _BYTES_PER_MB, 2),
+                    'size_bytes': stat.st_size,
+                    'created': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stat.st_mtime)),
+                    'checksum': _read_backup_checksum(backup_file.path)
                 })
-            except OSError as e:
-                logger.warning(f"Could not stat backup {backup_file.name}: {e}")
+            except OSError:
+                unreadable.append(backup_file.name)
                 continue
 
-        return backups
+        if unreadable:
+            logger.warning("Could not stat %d backups: %s", len(unreadable), unreadable)
+
+        _LIST_CACHE.update(dir=str(backup_path), dir_mtime_ns=dir_mtime_ns, entries=backups)
+        return list(backups)
 
     except OSError as e:
         logger.error(f"Error listing backups: {e}")
         return []
 
 
-def restore_backup(backup_path: str) -> Tuple[bool, str]:
+def _snapshot_for_restore() -> Optional[str]:
+    """Snapshot the live database before it is overwritten by a restore.
+
+    The database is about to be replaced, so no transactional copy is
+    needed: after checkpointing the WAL into the main file, the file is
+    cloned byte-for-byte (see _clone_file). Falls back to create_backup
+    if the checkpoint can't complete because another connection is busy.
+
+    Returns:
+        Path to the snapshot, or None if there is no database or it failed.
+    """
+    if not os.path.exists(DB_FILE):
+        return None
+
+    tmp_file = None
+    try:
+        with _pooled_connection() as conn:
+            busy = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()[0][0]
+        if busy:
+            return create_backup("pre_restore")
+
+        backup_path = ensure_backup_dir()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_file = backup_path / f"nris_backup_{timestamp}_pre_restore.db"
+        tmp_file = backup_path / (backup_file.name + ".tmp")
+        _clone_file(DB_FILE, tmp_file)
+
+        _fsync_file(tmp_file)
+        os.replace(tmp_file, backup_file)
+        tmp_file = None
+
+        _write_backup_checksum(backup_file)
+        logger.info(f"Pre-restore snapshot created: {backup_file}")
+        _LIST_CACHE['dir_mtime_ns'] = None
+        rotate_backups()
+        return str(backup_file)
+
+    except (sqlite3.Error, OSError) as e:
+        logger.error(f"Error creating pre-restore snapshot: {e}")
+        return None
+    finally:
+        if tmp_file is not None:
+            try:
+                tmp_file.unlink()
+            except OSError:
+                pass
+
+
+def restore_backup(backup_path: str, skip_pre_backup: bool = False) -> Tuple[bool, str]:
     """Restore database from a backup file.
 
     Creates a pre-restore backup of the current database before
@@ -215,6 +687,8 @@ def restore_backup(backup_path: str) -> Tuple[bool, str]:
 
     Args:
         backup_path: Path to the backup file to restore from.
+        skip_pre_backup: Skip the pre-restore backup. Only for callers
+            that have already snapshotted the current database.
 
     Returns:
         Tuple of (success: bool, message: str).
@@ -235,22 +709,34 @@ def restore_backup(backup_path: str) -> Tuple[bool, str]:
     if not os.path.exists(backup_path):
         return False, "Backup file not found"
 
-    if not backup_path.endswith('.db'):
-        return False, "Invalid backup file format (must be .db file)"
+    compressed = backup_path.endswith('.db' + _COMPRESSED_SUFFIX)
+    if not (backup_path.endswith('.db') or compressed):
+        return False, "Invalid backup file format (must be .db or .db.zst file)"
+    if compressed and zstandard is None:
+        return False, "Compressed backup requires the zstandard package"
 
     source_conn = None
     dest_conn = None
+    plain_path = None
 
     try:
         # First, create a backup of current state
-        pre_restore_backup = create_backup("pre_restore")
-        if not pre_restore_backup and os.path.exists(DB_FILE):
-            logger.warning("Could not create pre-restore backup, proceeding anyway")
-
-        # Restore using SQLite backup API
-        source_conn = sqlite3.connect(backup_path)
+        if not skip_pre_backup:
+            pre_restore_backup = _snapshot_for_restore()
+            if not pre_restore_backup and os.path.exists(DB_FILE):
+                logger.warning("Could not create pre-restore backup, proceeding anyway")
+
+        source_path = backup_path
+        if compressed:
+            fd, plain_path = tempfile.mkstemp(suffix=".db")
+            with os.fdopen(fd, 'wb') as fout, open(backup_path, 'rb') as fin:
+                zstandard.ZstdDecompressor().copy_stream(fin, fout)
+            source_path = plain_path
+
+        # Restore using SQLite backup API, whole database in one step
+        source_conn = sqlite3.connect(source_path)
         dest_conn = sqlite3.connect(DB_FILE)
-        source_conn.backup(dest_conn)
+        source_conn.backup(dest_conn, pages=-1, sleep=0)
 
         logger.info(f"Database restored from: {backup_path}")
         return True, "Database restored successfully"
@@ -272,13 +758,22 @@ def restore_backup(backup_path: str) -> Tuple[bool, str]:
             source_conn.close()
         if dest_conn:
             dest_conn.close()
+        if plain_path:
+            try:
+                os.unlink(plain_path)
+            except OSError:
+                pass
 
 
-def verify_database_integrity() -> Tuple[bool, str]:
+def verify_database_integrity(deep: bool = False) -> Tuple[bool, str]:
     """Run SQLite integrity check on the database.
 
-    Performs SQLite's built-in integrity_check PRAGMA to verify
-    the database structure and detect corruption.
+    Runs SQLite's quick_check PRAGMA, which catches structural corruption
+    without cross-checking index contents. The full integrity_check is
+    only run if quick_check reports a problem or ``deep`` is requested.
+
+    Args:
+        deep: Always run the full integrity_check (e.g. for an audit).
 
     Returns:
         Tuple of (is_ok: bool, message: str).
@@ -293,12 +788,14 @@ def verify_database_integrity() -> Tuple[bool, str]:
     if not os.path.exists(DB_FILE):
         return True, "Database does not exist yet (will be created)"
 
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA integrity_check")
-        result = cursor.fetchone()[0]
+        with _pooled_connection() as conn:
+            # fetchall() so no statement stays open on the pooled connection
+            result = None
+            if not deep:
+                result = conn.execute("PRAGMA quick_check").fetchall()[0][0]
+            if result != "ok":
+                result = conn.execute("PRAGMA integrity_check").fetchall()[0][0]
 
         if result == "ok":
             logger.debug("Database integrity check passed")
@@ -316,6 +813,25 @@ def verify_database_integrity() -> Tuple[bool, str]:
     except Exception as e:
         logger.error(f"Unexpected error during integrity check: {e}")
         return False, f"Integrity check failed: {e}"
+
+
+def enable_wal_mode() -> bool:
+    """Switch the database to WAL journaling so backups don't block writers.
+
+    journal_mode is persistent in the database file, so this only needs to
+    run once (at startup); per-connection pragmas are set where used.
+
+    Returns:
+        True if the database is in WAL mode afterwards.
+    """
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        mode: str = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        return mode.lower() == "wal"
+    except sqlite3.Error as e:
+        logger.warning(f"Could not enable WAL mode: {e}")
+        return False
     finally:
         if conn:
             conn.close()
@@ -325,8 +841,9 @@ def startup_data_protection() -> Dict[str, Any]:
     """Perform startup data protection tasks.
 
     Called during application startup to ensure data safety:
-    1. Verifies database integrity
-    2. Creates a startup backup
+    1. Enables WAL journaling
+    2. Verifies database integrity and creates a startup backup,
+       concurrently
 
     Returns:
         Dictionary containing:
@@ -350,17 +867,27 @@ def startup_data_protection() -> Dict[str, Any]:
         'warnings': []
     }
 
-    # Check integrity first
-    is_ok, message = verify_database_integrity()
+    db_exists = os.path.exists(DB_FILE)
+    if db_exists:
+        enable_wal_mode()
+
+    # Integrity check and startup backup both read every page; run them
+    # side by side (separate connections, WAL) so they share a warm page cache
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        integrity_future = executor.submit(verify_database_integrity)
+        backup_future = executor.submit(create_backup, "startup") if db_exists else None
+
+        is_ok, message = integrity_future.result()
+        backup_path = backup_future.result() if backup_future else None
+
     status['integrity_ok'] = is_ok
     status['integrity_message'] = message
 
     if not is_ok:
         status['warnings'].append(f"Database integrity issue: {message}")
 
-    # Create startup backup (only if database exists)
-    if os.path.exists(DB_FILE):
-        backup_path = create_backup("startup")
+    # Startup backup (only if database exists)
+    if db_exists:
         if backup_path:
             status['backup_created'] = True
             status['backup_path'] = backup_path
@@ -392,7 +919,7 @@ def get_backup_stats() -> Dict[str, Any]:
 
     return {
         'count': len(backups),
-        'total_size_mb': round(sum(b['size_mb'] for b in backups), 2),
+        'total_size_mb': round(sum(b['size_bytes'] for b in backups) / _BYTES_PER_MB, 2),
         'oldest': backups[-1]['created'] if backups else None,
         'newest': backups[0]['created'] if backups else None
     }
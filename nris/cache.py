@@ -10,6 +10,10 @@ Features:
 - Automatic cache invalidation
 - Query result caching
 
+Optional dependencies:
+- msgpack: Compact binary encoding for database cache values when installed
+- xxhash: Faster cache-key digests for ``@cached`` when installed
+
 Usage:
     from nris.cache import Cache, cached
 
@@ -25,16 +29,35 @@ Usage:
     value = cache.get('key')
 """
 
+import atexit
 import hashlib
+import heapq
+import inspect
 import json
 import logging
+import pickle
 import sqlite3
+import sys
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from functools import lru_cache, wraps
-from typing import Any, Callable, Dict, Optional, TypeVar, Generic, Union
+from typing import (
+    Any, Callable, Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar,
+    Union, cast
+)
 from collections import OrderedDict
 import threading
+import weakref
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None  # type: ignore[assignment, unused-ignore]
 
 from .config import DB_FILE
 
@@ -42,6 +65,231 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+_monotonic = time.monotonic
+
+# Bumped whenever a Cache drops entries, so @cached L0 tiers notice
+_invalidation_epoch = 0
+
+
+def _bump_invalidation_epoch() -> None:
+    global _invalidation_epoch
+    _invalidation_epoch += 1
+
+# Distinguishes "not cached" from a cached None in batch lookups
+_MISSING = object()
+
+# Keys per SELECT ... IN (...); stays under SQLite's host parameter limit
+_SQL_BATCH_SIZE = 500
+
+
+def _encode_value(value: Any, serializer: str) -> bytes:
+    """Serialize a value for DatabaseCache with the given serializer."""
+    if serializer == "pickle":
+        return _FORMAT_PICKLE + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if serializer == "msgpack":
+        packed: bytes = msgpack.packb(value, use_bin_type=True)
+        return _FORMAT_MSGPACK + packed
+    return _FORMAT_JSON + json.dumps(value).encode()
+
+
+def _decode_value(payload: Union[bytes, str], allow_pickle: bool = False) -> Any:
+    """Deserialize a stored value, including untagged JSON text rows.
+
+    Pickled values are only loaded when ``allow_pickle`` is set, since
+    unpickling data from a tampered database can execute code.
+    """
+    if isinstance(payload, str):
+        return json.loads(payload)
+    tag, body = payload[:1], payload[1:]
+    if tag == _FORMAT_PICKLE:
+        if not allow_pickle:
+            raise ValueError("pickled cache value but this cache does not use pickle")
+        return pickle.loads(body)
+    if tag == _FORMAT_MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack-encoded cache value but msgpack is not installed")
+        # Cached dicts may have int keys (per-test, per-chromosome maps)
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    if tag == _FORMAT_JSON:
+        return json.loads(body)
+    raise ValueError(f"Unknown cache value format {tag!r}")
+
+
+def _create_cache_table(conn: sqlite3.Connection, table_name: str) -> None:
+    """Create a cache table; timestamps are REAL unix seconds."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            cache_key TEXT PRIMARY KEY,
+            cache_value BLOB,
+            created_at REAL,
+            expires_at REAL
+        )
+    """)
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{table_name}_expires
+        ON {table_name}(expires_at)
+    """)
+
+
+def _iso_to_unix(text: Optional[str]) -> Optional[float]:
+    """Convert a legacy local-time ISO timestamp to unix seconds."""
+    if not text:
+        return None
+    return datetime.fromisoformat(text).timestamp()
+
+
+def upgrade_cache_timestamps(conn: sqlite3.Connection, table_name: str) -> bool:
+    """Rebuild a cache table that stores ISO TEXT timestamps with REAL ones.
+
+    Rows are converted in place; rows with unparsable timestamps are dropped.
+    The caller owns the transaction.
+
+    Args:
+        conn: Open database connection.
+        table_name: Cache table to upgrade.
+
+    Returns:
+        True if the table was rebuilt, False if already up to date or absent.
+    """
+    columns = {
+        row[1]: (row[2] or "").upper()
+        for row in conn.execute(f"PRAGMA table_info({table_name})")
+    }
+    if columns.get("expires_at") != "TEXT":
+        return False
+
+    rows = []
+    for key, value, created_at, expires_at in conn.execute(
+        f"SELECT cache_key, cache_value, created_at, expires_at FROM {table_name}"
+    ):
+        try:
+            rows.append((key, value, _iso_to_unix(created_at), _iso_to_unix(expires_at)))
+        except (TypeError, ValueError):
+            continue
+
+    # Dropping the table also drops its indexes, including legacy names
+    conn.execute(f"DROP TABLE {table_name}")
+    _create_cache_table(conn, table_name)
+    conn.executemany(
+        f"INSERT INTO {table_name} VALUES (?, ?, ?, ?)", rows
+    )
+    logger.info(f"Converted {table_name} timestamps to unix seconds ({len(rows)} rows)")
+    return True
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string above every string starting with ``prefix``.
+
+    Returns None when there is no such bound (empty prefix, or one made
+    only of the maximum code point), i.e. the range is open-ended.
+    """
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+    return stripped[:-1] + chr(ord(stripped[-1]) + 1)
+
+
+def _key_digest(text: str) -> str:
+    """Digest a cache key string; stable across processes for the L2 tier."""
+    data = text.encode()
+    if xxhash is not None:
+        digest: str = xxhash.xxh3_64_hexdigest(data)
+        return digest
+    return hashlib.md5(data).hexdigest()
+
+# Keys recently confirmed absent from L2, so repeat misses skip SQLite
+MISS_FILTER_SIZE = 4096
+MISS_FILTER_TTL = 60
+
+# One-byte format tag prefixed to every stored DatabaseCache value
+_FORMAT_JSON = b"\x00"
+_FORMAT_MSGPACK = b"\x01"
+_FORMAT_PICKLE = b"\x02"
+
+SERIALIZERS = ("json", "msgpack", "pickle")
+
+# Bytes of the cache database to memory-map for reads; less on 32-bit
+CACHE_MMAP_SIZE = 256 * 1024 * 1024 if sys.maxsize > 2**32 else 64 * 1024 * 1024
+
+# Per-decorator hot-key tier in front of the shared cache for @cached
+CACHED_L0_SIZE = 32
+
+# How long DatabaseCache waits to gather more writes before committing
+WRITE_BEHIND_DELAY = 0.05
+
+
+def _close_connection(
+    conn: sqlite3.Connection, registry: Set[sqlite3.Connection]
+) -> None:
+    """Close ``conn`` and drop it from ``registry``; safe to call twice."""
+    registry.discard(conn)
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+class _ConnectionHolder:
+    """Thread-local slot whose finalizer closes the connection it holds."""
+
+    __slots__ = ('conn', 'close', '__weakref__')
+
+    def __init__(
+        self, conn: sqlite3.Connection, registry: Set[sqlite3.Connection]
+    ) -> None:
+        self.conn = conn
+        registry.add(conn)
+        self.close = weakref.finalize(self, _close_connection, conn, registry)
+        # Exit-time flushes may still need it; those close() explicitly
+        self.close.atexit = False
+
+
+class ThreadConnections:
+    """One sqlite3 connection per thread, closed when that thread exits.
+
+    Each connection lives in thread-local storage inside a holder. When a
+    thread ends its thread-locals are dropped and the holder's finalizer
+    closes the connection, so short-lived threads (Streamlit runs every
+    script execution in a new one) don't leave connections open.
+    close_all() may run from any thread, so open connections with
+    ``check_same_thread=False``.
+    """
+
+    def __init__(self) -> None:
+        self._tls = threading.local()
+        self._open: Set[sqlite3.Connection] = set()
+
+    def __len__(self) -> int:
+        """Number of connections currently open."""
+        return len(self._open)
+
+    def get(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's connection, or None if it has none."""
+        holder = getattr(self._tls, 'holder', None)
+        return holder.conn if holder is not None else None
+
+    def set(self, conn: sqlite3.Connection) -> None:
+        """Make ``conn`` the calling thread's connection."""
+        self._tls.holder = _ConnectionHolder(conn, self._open)
+
+    def release(self) -> None:
+        """Close the calling thread's connection, if it has one."""
+        holder = getattr(self._tls, 'holder', None)
+        if holder is not None:
+            self._tls.holder = None
+            holder.close()
+
+    def close_all(self) -> None:
+        """Close the connections of every thread."""
+        # Dropping the thread-locals finalizes every thread's holder
+        self._tls = threading.local()
+        while self._open:
+            try:
+                conn = self._open.pop()
+            except KeyError:
+                break  # Emptied by a finalizer in the meantime
+            _close_connection(conn, self._open)
+
 
 class LRUCache(Generic[T]):
     """Thread-safe in-memory LRU cache.
@@ -60,14 +308,11 @@ class LRUCache(Generic[T]):
         self.maxsize = maxsize
         self.default_ttl = ttl
         self._cache: OrderedDict[str, tuple] = OrderedDict()
-        self._lock = threading.RLock()
-
-    def _is_expired(self, entry: tuple) -> bool:
-        """Check if cache entry has expired."""
-        _, expires_at = entry
-        if expires_at is None:
-            return False
-        return time.time() > expires_at
+        # (expires_at, key) min-heap; may hold stale pairs for keys that
+        # were overwritten, deleted or evicted since
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # Plain Lock: no method re-enters while holding it
+        self._lock = threading.Lock()
 
     def get(self, key: str, default: Optional[T] = None) -> Optional[T]:
         """Get value from cache.
@@ -78,19 +323,31 @@ class LRUCache(Generic[T]):
 
         Returns:
             Cached value or default.
+
+        Note:
+            Hits don't take the lock: ``OrderedDict.get`` and
+            ``move_to_end`` are single C calls and atomic on their own.
+            Only removing an expired entry (check-then-delete) is locked.
         """
-        with self._lock:
-            if key not in self._cache:
-                return default
+        entry = self._cache.get(key)
+        if entry is None:
+            return default
 
-            entry = self._cache[key]
-            if self._is_expired(entry):
-                del self._cache[key]
-                return default
+        # Inline expiry check; entries without a TTL never read the clock
+        expires_at = entry[1]
+        if expires_at is not None and expires_at < _monotonic():
+            with self._lock:
+                # Don't drop a fresh value set by another thread meanwhile
+                if self._cache.get(key) is entry:
+                    del self._cache[key]
+            return default
 
-            # Move to end (most recently used)
+        # Move to end (most recently used)
+        try:
             self._cache.move_to_end(key)
-            return entry[0]
+        except KeyError:
+            pass  # Deleted or evicted concurrently; still return what we read
+        return entry[0]
 
     def set(self, key: str, value: T, ttl: Optional[int] = None) -> None:
         """Set value in cache.
@@ -100,15 +357,71 @@ class LRUCache(Generic[T]):
             value: Value to cache.
             ttl: Time-to-live in seconds (uses default if None).
         """
+        # Work out the entry before locking to keep the critical section short
+        expires_at = self._expiry_for(ttl)
         with self._lock:
-            actual_ttl = ttl if ttl is not None else self.default_ttl
-            expires_at = time.time() + actual_ttl if actual_ttl > 0 else None
+            self._store(key, (value, expires_at))
 
-            # Remove oldest if at capacity
-            while len(self._cache) >= self.maxsize:
-                self._cache.popitem(last=False)
+    def get_many(self, keys: Iterable[str]) -> Dict[str, T]:
+        """Get several values at once.
+
+        Args:
+            keys: Cache keys to look up.
+
+        Returns:
+            Dictionary of the keys that were found, mapped to their values.
+        """
+        found: Dict[str, T] = {}
+        for key in keys:
+            value = self.get(key, cast(T, _MISSING))
+            if value is not _MISSING:
+                found[key] = cast(T, value)
+        return found
 
-            self._cache[key] = (value, expires_at)
+    def set_many(self, items: Dict[str, T], ttl: Optional[int] = None) -> None:
+        """Set several values under a single lock acquisition.
+
+        Args:
+            items: Mapping of cache keys to values.
+            ttl: Time-to-live in seconds (uses default if None).
+        """
+        expires_at = self._expiry_for(ttl)
+        with self._lock:
+            for key, value in items.items():
+                self._store(key, (value, expires_at))
+
+    def _expiry_for(self, ttl: Optional[int]) -> Optional[float]:
+        """Absolute expiry time for a TTL, or None if it never expires."""
+        actual_ttl = ttl if ttl is not None else self.default_ttl
+        # Monotonic so wall-clock adjustments don't expire entries early
+        return _monotonic() + actual_ttl if actual_ttl > 0 else None
+
+    def _store(self, key: str, entry: tuple) -> None:
+        """Insert or replace an entry. Caller holds the lock."""
+        cache = self._cache
+        if key in cache:
+            # Overwrite in place; no need to evict anything
+            cache[key] = entry
+            cache.move_to_end(key)
+        else:
+            # Remove oldest if at capacity
+            while len(cache) >= self.maxsize:
+                cache.popitem(last=False)
+            cache[key] = entry
+
+        expires_at = entry[1]
+        if expires_at is not None:
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            if len(self._expiry_heap) > 2 * self.maxsize:
+                self._compact_expiry_heap()
+
+    def _compact_expiry_heap(self) -> None:
+        """Rebuild the expiry heap from live entries. Caller holds the lock."""
+        self._expiry_heap = [
+            (entry[1], k) for k, entry in list(self._cache.items())
+            if entry[1] is not None
+        ]
+        heapq.heapify(self._expiry_heap)
 
     def delete(self, key: str) -> bool:
         """Delete key from cache.
@@ -120,10 +433,30 @@ class LRUCache(Generic[T]):
             True if key was deleted, False if not found.
         """
         with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+            return self._cache.pop(key, None) is not None
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with ``prefix``.
+
+        Rebuilds the dict from the surviving entries in one pass, keeping
+        their LRU order. Prefix deletes are rare next to sets and evictions,
+        so no sorted key index is kept to speed them up at the cost of
+        every insert.
+
+        Args:
+            prefix: Key prefix to match.
+
+        Returns:
+            Number of keys deleted.
+        """
+        with self._lock:
+            # Rebuild rather than delete one by one; iterate a snapshot
+            # because lock-free get() may reorder keys meanwhile
+            items = list(self._cache.items())
+            self._cache = OrderedDict(
+                (k, v) for k, v in items if not k.startswith(prefix)
+            )
+            return len(items) - len(self._cache)
 
     def clear(self) -> int:
         """Clear all cache entries.
@@ -134,22 +467,30 @@ class LRUCache(Generic[T]):
         with self._lock:
             count = len(self._cache)
             self._cache.clear()
+            self._expiry_heap.clear()
             return count
 
     def cleanup_expired(self) -> int:
         """Remove expired entries.
 
+        Pops the expiry heap only as far as entries have expired, so the
+        cost depends on how many expired rather than on the cache size.
+
         Returns:
             Number of entries removed.
         """
+        now = time.monotonic()
+        count = 0
         with self._lock:
-            expired_keys = [
-                k for k, v in self._cache.items()
-                if self._is_expired(v)
-            ]
-            for key in expired_keys:
-                del self._cache[key]
-            return len(expired_keys)
+            heap = self._expiry_heap
+            while heap and heap[0][0] < now:
+                expires_at, key = heapq.heappop(heap)
+                entry = self._cache.get(key)
+                # Skip stale pairs left by overwritten or removed keys
+                if entry is not None and entry[1] == expires_at:
+                    del self._cache[key]
+                    count += 1
+            return count
 
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics.
@@ -171,9 +512,20 @@ class DatabaseCache:
     Stores cache entries in SQLite for persistence across sessions.
     Useful for expensive computations that don't change frequently.
 
+    Each thread keeps one connection open for the lifetime of the
+    cache rather than reconnecting per operation. Connections run in
+    autocommit mode and are closed by ``close()`` or at interpreter exit.
+
+    ``set()`` is write-behind: entries are buffered and committed in one
+    transaction by a background thread shortly afterwards. Reads see
+    buffered entries immediately; call ``flush()`` to force them to disk.
+
     Args:
         db_path: Path to database file.
         table_name: Name of cache table.
+        serializer: "json", "msgpack" or "pickle". Defaults to msgpack when
+            installed, else json. "pickle" handles arbitrary objects such as
+            numpy arrays and DataFrames, but only use it on a trusted file.
 
     Example:
         cache = DatabaseCache()
@@ -183,34 +535,89 @@ class DatabaseCache:
     def __init__(
         self,
         db_path: Optional[str] = None,
-        table_name: str = "_analytics_cache"
+        table_name: str = "_analytics_cache",
+        serializer: Optional[str] = None
     ):
+        if serializer is None:
+            serializer = "msgpack" if msgpack is not None else "json"
+        if serializer not in SERIALIZERS:
+            raise ValueError(
+                f"Unknown serializer {serializer!r}; expected one of {SERIALIZERS}"
+            )
+        if serializer == "msgpack" and msgpack is None:
+            raise ValueError("serializer 'msgpack' requires the msgpack package")
         self.db_path = db_path or DB_FILE
         self.table_name = table_name
+        self.serializer = serializer
+        # Built once; identical strings also hit sqlite3's statement cache
+        self._sql_get = (
+            f"SELECT cache_value, expires_at FROM {table_name} WHERE cache_key = ?"
+        )
+        self._sql_set = (
+            f"INSERT OR REPLACE INTO {table_name} "
+            f"(cache_key, cache_value, created_at, expires_at) VALUES (?, ?, ?, ?)"
+        )
+        self._sql_delete = f"DELETE FROM {table_name} WHERE cache_key = ?"
+        # Key range rather than LIKE: LIKE ignores case, treats '_' and '%'
+        # in the prefix as wildcards, and can't use the primary key index
+        self._sql_delete_range = (
+            f"DELETE FROM {table_name} WHERE cache_key >= ? AND cache_key < ?"
+        )
+        self._sql_delete_from = f"DELETE FROM {table_name} WHERE cache_key >= ?"
+        self._sql_clear = f"DELETE FROM {table_name}"
+        self._sql_cleanup = f"DELETE FROM {table_name} WHERE expires_at < ?"
+        self._connections = ThreadConnections()
+        # Buffered writes: key -> (payload, created_at, expires_at) with
+        # timestamps in unix seconds, as stored
+        self._pending: Dict[str, tuple] = {}
+        self._inflight: Dict[str, tuple] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        _open_db_caches.add(self)
         self._ensure_table()
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Get database connection."""
-        return sqlite3.connect(self.db_path)
+        """Get this thread's database connection, opening it on first use."""
+        conn = self._connections.get()
+        if conn is None:
+            # check_same_thread=False only so close() can run from any thread
+            conn = sqlite3.connect(
+                self.db_path, isolation_level=None, check_same_thread=False
+            )
+            # Per-connection settings; journal_mode is set in _ensure_table
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA cache_size = -10000")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute(f"PRAGMA mmap_size = {CACHE_MMAP_SIZE}")
+            self._connections.set(conn)
+        return conn
+
+    def _release_connection(self) -> None:
+        """Close the calling thread's connection, if it has one."""
+        self._connections.release()
+
+    def close(self) -> None:
+        """Flush buffered writes and close the connections of every thread."""
+        self.flush()
+        self._connections.close_all()
 
     def _ensure_table(self) -> None:
         """Create cache table if it doesn't exist."""
         try:
             conn = self._get_connection()
-            conn.execute(f"""
-                CREATE TABLE IF NOT EXISTS {self.table_name} (
-                    cache_key TEXT PRIMARY KEY,
-                    cache_value TEXT,
-                    created_at TEXT,
-                    expires_at TEXT
-                )
-            """)
-            conn.execute(f"""
-                CREATE INDEX IF NOT EXISTS idx_{self.table_name}_expires
-                ON {self.table_name}(expires_at)
-            """)
-            conn.commit()
-            conn.close()
+            # page_size only takes effect on a new file, and must precede WAL
+            conn.execute("PRAGMA page_size = 8192")
+            # WAL is persistent in the database file, so once is enough
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                upgrade_cache_timestamps(conn, self.table_name)
+                _create_cache_table(conn, self.table_name)
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
         except sqlite3.Error as e:
             logger.warning(f"Could not create cache table: {e}")
 
@@ -225,61 +632,182 @@ class DatabaseCache:
             Cached value or default.
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.execute(
-                f"SELECT cache_value, expires_at FROM {self.table_name} WHERE cache_key = ?",
-                (key,)
-            )
-            row = cursor.fetchone()
-            conn.close()
+            with self._pending_lock:
+                entry = self._pending.get(key) or self._inflight.get(key)
 
-            if not row:
-                return default
+            if entry is not None:
+                payload, _, expires_at = entry
+            else:
+                conn = self._get_connection()
+                cursor = conn.execute(self._sql_get, (key,))
+                row = cursor.fetchone()
 
-            value_json, expires_at = row
+                if not row:
+                    return default
+
+                payload, expires_at = row
 
             # Check expiration
-            if expires_at:
-                if datetime.fromisoformat(expires_at) < datetime.now():
-                    self.delete(key)
-                    return default
+            if expires_at is not None and expires_at < time.time():
+                self.delete(key)
+                return default
 
-            return json.loads(value_json)
+            return _decode_value(payload, self.serializer == "pickle")
 
-        except (sqlite3.Error, json.JSONDecodeError) as e:
+        except (sqlite3.Error, TypeError, ValueError, EOFError,
+                pickle.UnpicklingError) as e:
             logger.debug(f"Cache get error for {key}: {e}")
             return default
 
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values with one query per batch of keys.
+
+        Expired entries are skipped and left for ``cleanup_expired()``.
+
+        Args:
+            keys: Cache keys to look up.
+
+        Returns:
+            Dictionary of the keys that were found, mapped to their values.
+        """
+        keys = list(dict.fromkeys(keys))
+        entries: Dict[str, tuple] = {}
+        with self._pending_lock:
+            for key in keys:
+                entry = self._pending.get(key) or self._inflight.get(key)
+                if entry is not None:
+                    entries[key] = (entry[0], entry[2])
+
+        remaining = [k for k in keys if k not in entries]
+        try:
+            conn = self._get_connection()
+            for i in range(0, len(remaining), _SQL_BATCH_SIZE):
+                batch = remaining[i:i + _SQL_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch))
+                for key, payload, expires_at in conn.execute(
+                    f"SELECT cache_key, cache_value, expires_at FROM {self.table_name} "
+                    f"WHERE cache_key IN ({placeholders})",
+                    batch
+                ):
+                    entries[key] = (payload, expires_at)
+        except sqlite3.Error as e:
+            logger.debug(f"Cache get_many error: {e}")
+
+        now = time.time()
+        allow_pickle = self.serializer == "pickle"
+        found: Dict[str, Any] = {}
+        for key, (payload, expires_at) in entries.items():
+            try:
+                if expires_at is not None and expires_at < now:
+                    continue
+                found[key] = _decode_value(payload, allow_pickle)
+            except (TypeError, ValueError, EOFError, pickle.UnpicklingError) as e:
+                logger.debug(f"Cache get error for {key}: {e}")
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: int = 3600) -> int:
+        """Set several values; they are committed together in one transaction.
+
+        Args:
+            items: Mapping of cache keys to values.
+            ttl: Time-to-live in seconds.
+
+        Returns:
+            Number of values queued; unserializable values are skipped.
+        """
+        now = time.time()
+        encoded = {}
+        for key, value in items.items():
+            try:
+                encoded[key] = (_encode_value(value, self.serializer), now, now + ttl)
+            except (TypeError, ValueError, OverflowError, AttributeError,
+                    pickle.PicklingError) as e:
+                logger.debug(f"Cache set error for {key}: {e}")
+
+        if encoded:
+            with self._pending_lock:
+                self._pending.update(encoded)
+                self._start_writer()
+        return len(encoded)
+
     def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
         """Set value in database cache.
 
         Args:
             key: Cache key.
-            value: Value to cache (must be JSON serializable).
+            value: Value to cache (must be supported by the serializer).
             ttl: Time-to-live in seconds.
 
         Returns:
-            True if successful, False otherwise.
+            True if the value was queued, False if it is not serializable.
         """
         try:
-            conn = self._get_connection()
-            expires_at = (datetime.now() + timedelta(seconds=ttl)).isoformat()
-            value_json = json.dumps(value)
-
-            conn.execute(
-                f"""INSERT OR REPLACE INTO {self.table_name}
-                    (cache_key, cache_value, created_at, expires_at)
-                    VALUES (?, ?, ?, ?)""",
-                (key, value_json, datetime.now().isoformat(), expires_at)
-            )
-            conn.commit()
-            conn.close()
-            return True
-
-        except (sqlite3.Error, TypeError) as e:
+            payload = _encode_value(value, self.serializer)
+        except (TypeError, ValueError, OverflowError, AttributeError,
+                pickle.PicklingError) as e:
             logger.debug(f"Cache set error for {key}: {e}")
             return False
 
+        now = time.time()
+        with self._pending_lock:
+            self._pending[key] = (payload, now, now + ttl)
+            self._start_writer()
+        return True
+
+    def _start_writer(self) -> None:
+        """Start the write-behind thread if idle. Caller holds _pending_lock."""
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write_behind,
+                name="nris-cache-writer",
+                daemon=True
+            )
+            self._writer.start()
+
+    def _write_behind(self) -> None:
+        """Background loop committing buffered writes until none are left."""
+        try:
+            while True:
+                time.sleep(WRITE_BEHIND_DELAY)
+                self.flush()
+                with self._pending_lock:
+                    if not self._pending:
+                        self._writer = None
+                        return
+        finally:
+            self._release_connection()
+
+    def flush(self) -> int:
+        """Commit all buffered writes in a single transaction.
+
+        Returns:
+            Number of entries written.
+        """
+        with self._flush_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            if not batch:
+                return 0
+
+            conn = self._get_connection()
+            try:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    self._sql_set,
+                    [(k, *entry) for k, entry in batch.items()]
+                )
+                conn.execute("COMMIT")
+                return len(batch)
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                logger.warning(f"Cache flush failed, dropped {len(batch)} entries: {e}")
+                return 0
+            finally:
+                with self._pending_lock:
+                    self._inflight = {}
+
     def delete(self, key: str) -> bool:
         """Delete key from cache.
 
@@ -290,18 +818,34 @@ class DatabaseCache:
             True if deleted, False otherwise.
         """
         try:
+            self.flush()
             conn = self._get_connection()
-            cursor = conn.execute(
-                f"DELETE FROM {self.table_name} WHERE cache_key = ?",
-                (key,)
-            )
-            conn.commit()
-            deleted = cursor.rowcount > 0
-            conn.close()
-            return deleted
+            cursor = conn.execute(self._sql_delete, (key,))
+            return cursor.rowcount > 0
         except sqlite3.Error:
             return False
 
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with ``prefix``.
+
+        Args:
+            prefix: Key prefix to match.
+
+        Returns:
+            Number of rows deleted.
+        """
+        upper = _prefix_upper_bound(prefix)
+        try:
+            self.flush()
+            conn = self._get_connection()
+            if upper is None:
+                cursor = conn.execute(self._sql_delete_from, (prefix,))
+            else:
+                cursor = conn.execute(self._sql_delete_range, (prefix, upper))
+            return cursor.rowcount
+        except sqlite3.Error:
+            return 0
+
     def clear(self) -> int:
         """Clear all cache entries.
 
@@ -309,12 +853,10 @@ class DatabaseCache:
             Number of entries cleared.
         """
         try:
+            self.flush()
             conn = self._get_connection()
-            cursor = conn.execute(f"DELETE FROM {self.table_name}")
-            count = cursor.rowcount
-            conn.commit()
-            conn.close()
-            return count
+            cursor = conn.execute(self._sql_clear)
+            return cursor.rowcount
         except sqlite3.Error:
             return 0
 
@@ -325,19 +867,26 @@ class DatabaseCache:
             Number of entries removed.
         """
         try:
+            self.flush()
             conn = self._get_connection()
             cursor = conn.execute(
-                f"DELETE FROM {self.table_name} WHERE expires_at < ?",
-                (datetime.now().isoformat(),)
+                self._sql_cleanup, (time.time(),)
             )
-            count = cursor.rowcount
-            conn.commit()
-            conn.close()
-            return count
+            return cursor.rowcount
         except sqlite3.Error:
             return 0
 
 
+# Every live DatabaseCache, so their connections can be closed at exit
+_open_db_caches: "weakref.WeakSet[DatabaseCache]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_db_caches() -> None:
+    for db_cache in list(_open_db_caches):
+        db_cache.close()
+
+
 class Cache:
     """Unified cache interface with memory and database backends.
 
@@ -345,6 +894,10 @@ class Cache:
     - L1: Fast in-memory LRU cache
     - L2: Persistent database cache (optional)
 
+    Keys that miss in L2 are remembered for ``MISS_FILTER_TTL`` seconds so
+    repeated lookups skip the database. Writes made to L2 outside this
+    instance may therefore stay invisible for up to that long.
+
     Args:
         memory_maxsize: Max items in memory cache.
         memory_ttl: Default TTL for memory cache.
@@ -370,6 +923,9 @@ class Cache:
     ):
         self.memory = LRUCache(maxsize=memory_maxsize, ttl=memory_ttl)
         self.db_cache = DatabaseCache(db_path) if use_db_cache else None
+        self._miss_filter: LRUCache[bool] = LRUCache(
+            maxsize=MISS_FILTER_SIZE, ttl=MISS_FILTER_TTL
+        )
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get value from cache (memory first, then database).
@@ -386,16 +942,70 @@ class Cache:
         if value is not None:
             return value
 
-        # Try database cache (L2)
-        if self.db_cache:
+        # Try database cache (L2), unless it recently missed
+        if self.db_cache and not self._miss_filter.get(key):
             value = self.db_cache.get(key)
             if value is not None:
                 # Promote to L1
                 self.memory.set(key, value)
                 return value
+            self._miss_filter.set(key, True)
 
         return default
 
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values, filling L1 misses from L2 in one batch.
+
+        Args:
+            keys: Cache keys to look up.
+
+        Returns:
+            Dictionary of the keys that were found, mapped to their values.
+        """
+        keys = list(keys)
+        found = {
+            k: v for k, v in self.memory.get_many(keys).items() if v is not None
+        }
+
+        if self.db_cache:
+            missing = [
+                k for k in keys
+                if k not in found and not self._miss_filter.get(k)
+            ]
+            if missing:
+                from_db = {
+                    k: v for k, v in self.db_cache.get_many(missing).items()
+                    if v is not None
+                }
+                # Promote to L1
+                self.memory.set_many(from_db)
+                found.update(from_db)
+                self._miss_filter.set_many(
+                    {k: True for k in missing if k not in from_db}
+                )
+
+        return found
+
+    def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: int = 300,
+        persist: bool = False
+    ) -> None:
+        """Set several values in cache.
+
+        Args:
+            items: Mapping of cache keys to values.
+            ttl: Time-to-live in seconds.
+            persist: Also store in database cache.
+        """
+        self.memory.set_many(items, ttl)
+        for key in items:
+            self._miss_filter.delete(key)
+
+        if persist and self.db_cache:
+            self.db_cache.set_many(items, ttl)
+
     def set(
         self,
         key: str,
@@ -412,6 +1022,7 @@ class Cache:
             persist: Also store in database cache.
         """
         self.memory.set(key, value, ttl)
+        self._miss_filter.delete(key)
 
         if persist and self.db_cache:
             self.db_cache.set(key, value, ttl)
@@ -425,7 +1036,9 @@ class Cache:
         Returns:
             True if deleted from any tier.
         """
+        _bump_invalidation_epoch()
         memory_deleted = self.memory.delete(key)
+        self._miss_filter.delete(key)
         db_deleted = self.db_cache.delete(key) if self.db_cache else False
         return memory_deleted or db_deleted
 
@@ -439,32 +1052,10 @@ class Cache:
             Number of keys invalidated.
         """
         # Note: This is a simple prefix match
-        count = 0
-
-        # Memory cache - need to iterate
-        with self.memory._lock:
-            keys_to_delete = [
-                k for k in self.memory._cache.keys()
-                if k.startswith(pattern)
-            ]
-            for key in keys_to_delete:
-                del self.memory._cache[key]
-                count += 1
-
-        # Database cache
+        _bump_invalidation_epoch()
+        count = self.memory.delete_prefix(pattern)
         if self.db_cache:
-            try:
-                conn = self.db_cache._get_connection()
-                cursor = conn.execute(
-                    f"DELETE FROM {self.db_cache.table_name} WHERE cache_key LIKE ?",
-                    (f"{pattern}%",)
-                )
-                count += cursor.rowcount
-                conn.commit()
-                conn.close()
-            except sqlite3.Error:
-                pass
-
+            count += self.db_cache.delete_prefix(pattern)
         return count
 
     def clear(self) -> int:
@@ -473,6 +1064,7 @@ class Cache:
         Returns:
             Total number of entries cleared.
         """
+        _bump_invalidation_epoch()
         count = self.memory.clear()
         if self.db_cache:
             count += self.db_cache.clear()
@@ -517,6 +1109,107 @@ def get_cache() -> Cache:
     return _cache
 
 
+# Template for @cached wrappers specialized to one signature. The factory
+# binds its settings as closure cells; the body mirrors the generic wrapper.
+# Module names are reached through _nris_-prefixed cells too, so parameters
+# of the decorated function can't shadow them. get_cache and the epoch are
+# read from the module namespace on each call since they can be rebound.
+_SPECIALIZED_WRAPPER = """
+def _nris_make(_nris_func, _nris_prefix, _nris_ttl, _nris_persist,
+               _nris_hit, _nris_miss, _nris_l0, _nris_globals, _nris_digest,
+               _nris_log{default_names}):
+    def wrapper({params}):
+        _nris_text = {key_expr}
+        _nris_hot = _nris_l0.get(_nris_text)
+        if (_nris_hot is not None
+                and _nris_hot[1] == _nris_globals["_invalidation_epoch"]):
+            return _nris_hot[0]
+        _nris_key = _nris_prefix + _nris_digest(_nris_text)
+        _nris_cache = _nris_globals["get_cache"]()
+        _nris_result = _nris_cache.get(_nris_key)
+        if _nris_result is not None:
+            _nris_log.debug(_nris_hit)
+            return _nris_result
+        _nris_log.debug(_nris_miss)
+        _nris_epoch = _nris_globals["_invalidation_epoch"]
+        _nris_result = _nris_func({call_args})
+        _nris_cache.set(_nris_key, _nris_result, ttl=_nris_ttl, persist=_nris_persist)
+        if _nris_result is not None:
+            _nris_l0.set(_nris_text, (_nris_result, _nris_epoch))
+        return _nris_result
+    return wrapper
+"""
+
+
+def _specialized_wrapper(
+    func: Callable[..., T],
+    prefix: str,
+    ttl: int,
+    persist: bool,
+    l0: LRUCache
+) -> Optional[Callable[..., T]]:
+    """Compile a @cached wrapper for ``func``'s exact parameter list.
+
+    Like ``functools.lru_cache``'s fast paths, the key is built straight
+    from named parameters, with no ``*args`` packing or kwargs sorting.
+    Positional and keyword calls for the same argument share a key.
+
+    Returns:
+        The wrapper, or None when the signature needs the generic wrapper
+        (``*args``/``**kwargs``, or parameters it cannot name safely).
+    """
+    try:
+        parameters = list(inspect.signature(func).parameters.values())
+    except (TypeError, ValueError):
+        return None
+
+    params: List[str] = []
+    call_args: List[str] = []
+    defaults: List[Any] = []
+    saw_positional_only = False
+    saw_keyword_only = False
+    for p in parameters:
+        if (p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+                or not p.name.isidentifier() or p.name.startswith("_nris_")):
+            return None
+        if p.kind is p.POSITIONAL_ONLY:
+            saw_positional_only = True
+        elif saw_positional_only:
+            params.append("/")
+            saw_positional_only = False
+        if p.kind is p.KEYWORD_ONLY and not saw_keyword_only:
+            params.append("*")
+            saw_keyword_only = True
+
+        if p.default is p.empty:
+            params.append(p.name)
+        else:
+            params.append(f"{p.name}=_nris_d{len(defaults)}")
+            defaults.append(p.default)
+        call_args.append(f"{p.name}={p.name}" if p.kind is p.KEYWORD_ONLY else p.name)
+    if saw_positional_only:
+        params.append("/")
+
+    key_expr = (
+        'f"' + ":".join(f"{{{p.name}!s}}" for p in parameters) + '"'
+        if parameters else '""'
+    )
+    source = _SPECIALIZED_WRAPPER.format(
+        default_names="".join(f", _nris_d{i}" for i in range(len(defaults))),
+        params=", ".join(params),
+        key_expr=key_expr,
+        call_args=", ".join(call_args)
+    )
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<cached {func.__qualname__}>", "exec"), {}, namespace)
+    wrapper: Callable[..., T] = namespace["_nris_make"](
+        func, f"{prefix}:", ttl, persist,
+        f"Cache hit for {func.__name__}", f"Cache miss for {func.__name__}", l0,
+        globals(), _key_digest, logger, *defaults
+    )
+    return wrapper
+
+
 def cached(
     ttl: int = 300,
     key_prefix: str = "",
@@ -532,6 +1225,9 @@ def cached(
     Returns:
         Decorator function.
 
+    Functions with a fixed parameter list get a wrapper compiled for that
+    signature; ones taking ``*args``/``**kwargs`` use a generic wrapper.
+
     Example:
         @cached(ttl=600, key_prefix='analytics')
         def compute_statistics(date_range: str) -> Dict:
@@ -539,31 +1235,52 @@ def cached(
             return stats
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> T:
-            # Generate cache key from function name and arguments
-            key_parts = [key_prefix or func.__name__]
-            key_parts.extend(str(a) for a in args)
-            key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
-            cache_key = hashlib.md5(":".join(key_parts).encode()).hexdigest()
-
-            cache = get_cache()
-            result = cache.get(cache_key)
-
-            if result is not None:
-                logger.debug(f"Cache hit for {func.__name__}")
-                return result
+        prefix = key_prefix or func.__name__
+
+        # Results this process computed, keyed by the undigested key text.
+        # Entries from before the last Cache invalidation are ignored.
+        l0: LRUCache[Tuple[T, int]] = LRUCache(maxsize=CACHED_L0_SIZE, ttl=ttl)
+
+        specialized = _specialized_wrapper(func, prefix, ttl, persist, l0)
+        if specialized is not None:
+            wrapper = wraps(func)(specialized)
+        else:
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> T:
+                # Generate cache key from function name and arguments
+                key_parts = [str(a) for a in args]
+                key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
+                key_text = ':'.join(key_parts)
+
+                hot = l0.get(key_text)
+                if hot is not None and hot[1] == _invalidation_epoch:
+                    return hot[0]
+
+                # Keep the prefix readable so invalidate() can match on it
+                cache_key = f"{prefix}:{_key_digest(key_text)}"
+
+                cache = get_cache()
+                result = cache.get(cache_key)
+
+                if result is not None:
+                    logger.debug(f"Cache hit for {func.__name__}")
+                    return result
+
+                logger.debug(f"Cache miss for {func.__name__}")
+                epoch = _invalidation_epoch
+                result = func(*args, **kwargs)
+                cache.set(cache_key, result, ttl=ttl, persist=persist)
+                if result is not None:
+                    l0.set(key_text, (result, epoch))
 
-            logger.debug(f"Cache miss for {func.__name__}")
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl=ttl, persist=persist)
+                return result
 
-            return result
+        def invalidate() -> int:
+            l0.clear()
+            return get_cache().invalidate_pattern(f"{prefix}:")
 
         # Add method to invalidate this function's cache
-        wrapper.invalidate = lambda: get_cache().invalidate_pattern(  # type: ignore
-            key_prefix or func.__name__
-        )
+        wrapper.invalidate = invalidate  # type: ignore
 
         return wrapper
     return decorator
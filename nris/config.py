@@ -1,19 +1,94 @@
 """
 Configuration management and translations for NRIS.
+
+Optional dependencies:
+- orjson: faster config file parsing and writing (falls back to json)
 """
 
 import json
-import copy
-from typing import Dict
+import os
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    Any, Callable, Dict, List, Mapping, Optional, Tuple, TypedDict, cast
+)
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment, unused-ignore]
+
 # File paths
 DB_FILE = "nipt_registry_v2.db"
 CONFIG_FILE = "nris_config.json"
 BACKUP_DIR = "backups"
 MAX_BACKUPS = 10
 
-DEFAULT_CONFIG = {
+
+def _freeze(value: Any) -> Any:
+    """Read-only view of nested config: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Mutable deep copy of a frozen config value."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+class QCThresholds(TypedDict):
+    MIN_CFF: float
+    MAX_CFF: float
+    GC_RANGE: List[float]
+    MIN_UNIQ_RATE: float
+    MAX_ERROR_RATE: float
+    QS_LIMIT_NEG: float
+    QS_LIMIT_POS: float
+
+
+class ClinicalThresholds(TypedDict):
+    TRISOMY_LOW: float
+    TRISOMY_AMBIGUOUS: float
+    SCA_THRESHOLD: float
+    SCA_XY_THRESHOLD: float
+    RAT_POSITIVE: float
+    RAT_AMBIGUOUS: float
+
+
+# Per-test threshold tables, keyed by test number (1, 2, 3)
+ThresholdsByTest = Dict[int, Dict[str, float]]
+
+
+class PerTestThresholds(TypedDict):
+    TRISOMY: ThresholdsByTest
+    RAT: ThresholdsByTest
+    SCA: ThresholdsByTest
+    CNV: ThresholdsByTest
+
+
+class NRISConfig(TypedDict):
+    """Shape of the dict returned by load_config()."""
+    QC_THRESHOLDS: QCThresholds
+    PANEL_READ_LIMITS: Dict[str, int]
+    CLINICAL_THRESHOLDS: ClinicalThresholds
+    TEST_SPECIFIC_THRESHOLDS: PerTestThresholds
+    REPORT_LANGUAGE: str
+    ALLOW_ALPHANUMERIC_MRN: bool
+    DEFAULT_SORT: str
+
+
+# Read-only so no caller can change the defaults for everyone else;
+# use default_config() for a mutable copy
+DEFAULT_CONFIG = _freeze({
     'QC_THRESHOLDS': {
         'MIN_CFF': 3.5,
         'MAX_CFF': 50.0,
@@ -62,237 +137,199 @@ DEFAULT_CONFIG = {
     'REPORT_LANGUAGE': 'en',
     'ALLOW_ALPHANUMERIC_MRN': False,
     'DEFAULT_SORT': 'id'
-}
-
-TRANSLATIONS = {
-    'en': {
-        'lab_title': 'CLINICAL GENETICS LABORATORY',
-        'report_title': 'Non-Invasive Prenatal Testing (NIPT) Report',
-        'report_id': 'Report ID:',
-        'report_date': 'Report Date:',
-        'panel_type': 'Panel Type:',
-        'report_time': 'Report Time:',
-        'test_number': 'Test Number:',
-        'first_test': '1st Test',
-        'second_test': '2nd Test',
-        'third_test': '3rd Test',
-        'patient_info': 'PATIENT INFORMATION',
-        'name': 'Name:',
-        'mrn': 'MRN:',
-        'maternal_age': 'Maternal Age:',
-        'gestational_age': 'Gestational Age:',
-        'weight': 'Weight:',
-        'height': 'Height:',
-        'bmi': 'BMI:',
-        'years': 'years',
-        'weeks': 'weeks',
-        'qc_assessment': 'QUALITY CONTROL ASSESSMENT',
-        'qc_status': 'QC Status',
-        'parameter': 'Parameter',
-        'value': 'Value',
-        'reference_range': 'Reference Range',
-        'status': 'Status',
-        'fetal_fraction': 'Fetal Fraction (Cff)',
-        'gc_content': 'GC Content',
-        'seq_reads': 'Sequencing Reads',
-        'unique_rate': 'Unique Read Rate',
-        'error_rate': 'Error Rate',
-        'quality_score': 'Quality Score',
-        'qc_recommendation': 'QC Recommendation:',
-        'qc_override_applied': 'QC Override Applied:',
-        'original_status': 'Original status was',
-        'validated_by': 'Validated by',
-        'reason': 'Reason:',
-        'override': 'Override',
-        'pass': 'PASS',
-        'fail': 'FAIL',
-        'warning': 'WARNING',
-        'aneuploidy_results': 'ANEUPLOIDY SCREENING RESULTS',
-        'condition': 'Condition',
-        'result': 'Result',
-        'z_score': 'Z-Score',
-        'reportable': 'Reportable',
-        'ref': 'Ref',
-        'trisomy_21': 'Trisomy 21 (Down Syndrome)',
-        'trisomy_18': 'Trisomy 18 (Edwards Syndrome)',
-        'trisomy_13': 'Trisomy 13 (Patau Syndrome)',
-        'sca': 'Sex Chromosome Aneuploidy',
-        'fetal_sex': 'Fetal Sex:',
-        'male': 'Male',
-        'female': 'Female',
-        'undetermined': 'Undetermined',
-        'cnv_findings': 'COPY NUMBER VARIATION (CNV) FINDINGS',
-        'rat_findings': 'RARE AUTOSOMAL TRISOMY (RAT) FINDINGS',
-        'finding': 'Finding',
-        'clinical_significance': 'Clinical Significance',
-        'maternal_factors': 'MATERNAL FACTORS & AGE-BASED RISK',
-        'bmi_underweight': '(Underweight)',
-        'bmi_normal': '(Normal)',
-        'bmi_overweight': '(Overweight)',
-        'bmi_obese': '(Obese - may affect fetal fraction)',
-        'age_risk_text': 'Based on maternal age of {age} years, the a priori risks are: Trisomy 21: 1 in {t21}, Trisomy 18: 1 in {t18}, Trisomy 13: 1 in {t13}',
-        'final_interpretation': 'FINAL INTERPRETATION',
-        'clinical_recommendations': 'CLINICAL RECOMMENDATIONS',
-        'no_high_risk': 'No high-risk findings detected. Continue standard prenatal care.',
-        'nipt_screening': 'NIPT is a screening test. It does not diagnose chromosomal abnormalities.',
-        'rec_t21_positive': 'Confirmatory diagnostic testing (amniocentesis or CVS) is strongly recommended. Genetic counseling should be offered.',
-        'rec_t18_positive': 'Confirmatory diagnostic testing (amniocentesis or CVS) is strongly recommended. Detailed ultrasound and genetic counseling advised.',
-        'rec_t13_positive': 'Confirmatory diagnostic testing (amniocentesis or CVS) is strongly recommended. Detailed ultrasound and genetic counseling advised.',
-        'rec_sca_positive': 'Genetic counseling recommended. Confirmatory testing may be considered based on clinical judgment.',
-        'rec_cnv_positive': 'Detailed ultrasound recommended. Genetic counseling and possible confirmatory testing advised.',
-        'rec_rat_positive': 'Genetic counseling recommended. Clinical correlation and possible confirmatory testing advised.',
-        'rec_high_risk': 'Re-analysis recommended. If persistent, consider confirmatory diagnostic testing.',
-        'rec_low_risk': 'No additional testing indicated based on NIPT result alone. Standard prenatal care recommended.',
-        'clinical_notes': 'CLINICAL NOTES & OBSERVATIONS',
-        'key_markers': 'Key clinical markers:',
-        'nt_noted': 'Nuchal Translucency noted',
-        'ff_concerns': 'Fetal Fraction concerns noted',
-        'ivf_noted': 'ART/IVF conception noted',
-        'multiple_noted': 'Multiple gestation noted',
-        'limitations': 'LIMITATIONS AND DISCLAIMER',
-        'important_info': 'Important Information:',
-        'disclaimer_1': 'NIPT is a screening test, not a diagnostic test. Positive results should be confirmed with diagnostic testing (amniocentesis or CVS).',
-        'disclaimer_2': 'False positive and false negative results can occur. A negative result does not eliminate the possibility of chromosomal abnormalities.',
-        'disclaimer_3': 'This test screens for specific chromosomal conditions and does not detect all genetic disorders.',
-        'disclaimer_4': 'Results should be interpreted in conjunction with other clinical findings, ultrasound, and maternal history.',
-        'disclaimer_5': 'Test performance may be affected by factors including: low fetal fraction, maternal chromosomal abnormalities, confined placental mosaicism, vanishing twin, or maternal malignancy.',
-        'disclaimer_6': 'Genetic counseling is recommended for all patients, especially those with positive or inconclusive results.',
-        'authorization': 'AUTHORIZATION',
-        'performed_by': 'Performed by:',
-        'reviewed_by': 'Reviewed by:',
-        'approved_by': 'Approved by:',
-        'date': 'Date:',
-        'clinical_pathologist': 'Clinical Pathologist',
-        'lab_director': 'Laboratory Director',
-        'lab_staff': 'Laboratory Staff',
-        'report_generated': 'Report generated:',
-        'version': 'NRIS v2.4 Enhanced Edition',
-    },
-    'fr': {
-        'lab_title': 'LABORATOIRE DE GENETIQUE CLINIQUE',
-        'report_title': 'Rapport de Depistage Prenatal Non Invasif (DPNI)',
-        'report_id': 'ID du rapport:',
-        'report_date': 'Date du rapport:',
-        'panel_type': 'Type de panel:',
-        'report_time': 'Heure du rapport:',
-        'test_number': 'Numéro de test:',
-        'first_test': '1er Test',
-        'second_test': '2ème Test',
-        'third_test': '3ème Test',
-        'patient_info': 'INFORMATIONS PATIENTE',
-        'name': 'Nom:',
-        'mrn': 'NDM:',
-        'maternal_age': 'Age maternel:',
-        'gestational_age': 'Age gestationnel:',
-        'weight': 'Poids:',
-        'height': 'Taille:',
-        'bmi': 'IMC:',
-        'years': 'ans',
-        'weeks': 'semaines',
-        'qc_assessment': 'EVALUATION DU CONTROLE QUALITE',
-        'qc_status': 'Statut CQ',
-        'parameter': 'Parametre',
-        'value': 'Valeur',
-        'reference_range': 'Plage de reference',
-        'status': 'Statut',
-        'fetal_fraction': 'Fraction foetale (Cff)',
-        'gc_content': 'Contenu GC',
-        'seq_reads': 'Lectures de sequencage',
-        'unique_rate': 'Taux de lectures uniques',
-        'error_rate': "Taux d'erreur",
-        'quality_score': 'Score de qualite',
-        'qc_recommendation': 'Recommandation CQ:',
-        'qc_override_applied': 'Derogation CQ appliquee:',
-        'original_status': 'Le statut original etait',
-        'validated_by': 'Valide par',
-        'reason': 'Raison:',
-        'override': 'Derogation',
-        'pass': 'CONFORME',
-        'fail': 'NON CONFORME',
-        'warning': 'ATTENTION',
-        'aneuploidy_results': 'RESULTATS DU DEPISTAGE DES ANEUPLOIDIES',
-        'condition': 'Condition',
-        'result': 'Resultat',
-        'z_score': 'Score Z',
-        'reportable': 'Rapportable',
-        'ref': 'Ref',
-        'trisomy_21': 'Trisomie 21 (Syndrome de Down)',
-        'trisomy_18': 'Trisomie 18 (Syndrome d\'Edwards)',
-        'trisomy_13': 'Trisomie 13 (Syndrome de Patau)',
-        'sca': 'Aneuploidie des chromosomes sexuels',
-        'fetal_sex': 'Sexe foetal:',
-        'male': 'Masculin',
-        'female': 'Feminin',
-        'undetermined': 'Indetermine',
-        'cnv_findings': 'RESULTATS DES VARIATIONS DU NOMBRE DE COPIES (CNV)',
-        'rat_findings': 'RESULTATS DES TRISOMIES AUTOSOMIQUES RARES (TAR)',
-        'finding': 'Resultat',
-        'clinical_significance': 'Signification clinique',
-        'maternal_factors': 'FACTEURS MATERNELS ET RISQUE LIE A L\'AGE',
-        'bmi_underweight': '(Insuffisance ponderale)',
-        'bmi_normal': '(Normal)',
-        'bmi_overweight': '(Surpoids)',
-        'bmi_obese': '(Obesite - peut affecter la fraction foetale)',
-        'age_risk_text': 'Selon l\'age maternel de {age} ans, les risques a priori sont: Trisomie 21: 1 sur {t21}, Trisomie 18: 1 sur {t18}, Trisomie 13: 1 sur {t13}',
-        'final_interpretation': 'INTERPRETATION FINALE',
-        'clinical_recommendations': 'RECOMMANDATIONS CLINIQUES',
-        'no_high_risk': 'Aucun resultat a haut risque detecte. Poursuivre les soins prenataux standards.',
-        'nipt_screening': 'Le DPNI est un test de depistage. Il ne diagnostique pas les anomalies chromosomiques.',
-        'rec_t21_positive': 'Un test diagnostique de confirmation (amniocent&egrave;se ou biopsie de villosites choriales) est fortement recommande. Un conseil genetique devrait etre propose.',
-        'rec_t18_positive': 'Un test diagnostique de confirmation (amniocent&egrave;se ou biopsie de villosites choriales) est fortement recommande. Une echographie detaillee et un conseil genetique sont conseilles.',
-        'rec_t13_positive': 'Un test diagnostique de confirmation (amniocent&egrave;se ou biopsie de villosites choriales) est fortement recommande. Une echographie detaillee et un conseil genetique sont conseilles.',
-        'rec_sca_positive': 'Conseil genetique recommande. Un test de confirmation peut etre envisage selon le jugement clinique.',
-        'rec_cnv_positive': 'Echographie detaillee recommandee. Conseil genetique et eventuel test de confirmation conseilles.',
-        'rec_rat_positive': 'Conseil genetique recommande. Correlation clinique et eventuel test de confirmation conseilles.',
-        'rec_high_risk': 'Re-analyse recommandee. Si le resultat persiste, envisager un test diagnostique de confirmation.',
-        'rec_low_risk': 'Aucun test supplementaire indique sur la seule base du resultat DPNI. Soins prenataux standards recommandes.',
-        'clinical_notes': 'NOTES CLINIQUES ET OBSERVATIONS',
-        'key_markers': 'Marqueurs cliniques cles:',
-        'nt_noted': 'Clarte nucale notee',
-        'ff_concerns': 'Preoccupations concernant la fraction foetale notees',
-        'ivf_noted': 'Conception par PMA/FIV notee',
-        'multiple_noted': 'Grossesse multiple notee',
-        'limitations': 'LIMITES ET AVERTISSEMENT',
-        'important_info': 'Informations importantes:',
-        'disclaimer_1': 'Le DPNI est un test de depistage, pas un test diagnostique. Les resultats positifs doivent etre confirmes par un test diagnostique (amniocent&egrave;se ou biopsie de villosites choriales).',
-        'disclaimer_2': 'Des faux positifs et faux negatifs peuvent survenir. Un resultat negatif n\'elimine pas la possibilite d\'anomalies chromosomiques.',
-        'disclaimer_3': 'Ce test depiste des conditions chromosomiques specifiques et ne detecte pas tous les troubles genetiques.',
-        'disclaimer_4': 'Les resultats doivent etre interpretes en conjonction avec d\'autres donnees cliniques, l\'echographie et l\'historique maternel.',
-        'disclaimer_5': 'La performance du test peut etre affectee par des facteurs incluant: faible fraction foetale, anomalies chromosomiques maternelles, mosaicisme placentaire confine, jumeau evanescent ou malignite maternelle.',
-        'disclaimer_6': 'Un conseil genetique est recommande pour toutes les patientes, en particulier celles avec des resultats positifs ou non concluants.',
-        'authorization': 'AUTORISATION',
-        'performed_by': 'Realise par:',
-        'reviewed_by': 'Revise par:',
-        'approved_by': 'Approuve par:',
-        'date': 'Date:',
-        'clinical_pathologist': 'Medecin responsable',
-        'lab_director': 'Directeur du laboratoire',
-        'lab_staff': 'Personnel du laboratoire',
-        'report_generated': 'Rapport genere:',
-        'version': 'NRIS v2.4 Edition Amelioree',
-    }
-}
+})
+
+
+def default_config() -> NRISConfig:
+    """Return a mutable deep copy of DEFAULT_CONFIG."""
+    config: NRISConfig = _thaw(DEFAULT_CONFIG)
+    return config
+
+
+def _deep_merge(base: Mapping, override: Mapping) -> Dict:
+    """Mutable copy of base with override's values laid over it.
+
+    Nested dicts are merged key by key; scalars and lists from override
+    replace the base value. JSON turns int keys such as test numbers into
+    strings, so '1' in override updates base key 1 rather than adding a
+    second entry.
+    """
+    merged = {k: _thaw(v) for k, v in base.items()}
+    names = {str(k): k for k in base}
+    for key, value in override.items():
+        if key not in base:
+            key = names.get(key, key)
+        current = base.get(key)
+        if isinstance(current, Mapping) and isinstance(value, Mapping):
+            merged[key] = _deep_merge(current, value)
+        else:
+            merged[key] = value
+    return merged
 
 
+# Translation tables live in translations/<lang>.json and are loaded on
+# first use, so languages that are never requested cost nothing
+TRANSLATIONS_DIR = Path(__file__).parent / "translations"
+
+# lang -> that language's table merged over English
+_LANG_CACHE: Dict[str, Dict[str, str]] = {}
+
+
+def _interned_pairs(pairs: List[Tuple[str, str]]) -> Dict[str, str]:
+    """Intern keys and values so text repeated across languages is one object."""
+    return {sys.intern(k): sys.intern(v) for k, v in pairs}
+
+
+def _read_language(lang: str) -> Dict[str, str]:
+    """Read one language's table, or an empty one if it isn't shipped."""
+    if not lang.isidentifier():
+        return {}  # Never let a language code escape TRANSLATIONS_DIR
+    try:
+        with open(TRANSLATIONS_DIR / f"{lang}.json", 'r', encoding='utf-8') as f:
+            table: Dict[str, str] = json.load(
+                f, object_pairs_hook=_interned_pairs
+            )
+    except FileNotFoundError:
+        return {}
+    return table
+
+
+def _load_lang(lang: str) -> Dict[str, str]:
+    """Build and cache the merged table for ``lang``."""
+    table = _LANG_CACHE.get(lang)
+    if table is None:
+        english = _LANG_CACHE.get('en') or _read_language('en')
+        own = _read_language(lang) if lang != 'en' else None
+        # Languages with no table of their own share English's dict
+        table = {**english, **own} if own else english
+        _LANG_CACHE[lang] = table
+    return table
+
+
+_load_lang('en')
+
+
+@lru_cache(maxsize=1024)
 def get_translation(key: str, lang: str = 'en') -> str:
-    """Get translated text for a given key and language."""
-    return TRANSLATIONS.get(lang, TRANSLATIONS['en']).get(key, TRANSLATIONS['en'].get(key, key))
+    """Get translated text for a given key and language.
+
+    Falls back to English for unknown languages or keys, then to the key.
+    Tables never change after loading, so results are memoized.
+    """
+    table = _LANG_CACHE.get(lang) or _load_lang(lang)
+    return table.get(key, key)
+
+
+def get_translator(lang: str = 'en') -> Callable[[str], str]:
+    """Return a function translating keys into ``lang``.
+
+    Resolves the language once, so loops over many labels pay a single
+    dict lookup per key. Same fallbacks as get_translation().
+    """
+    table = _LANG_CACHE.get(lang) or _load_lang(lang)
+
+    def translate(key: str, _get: Callable[[str, str], str] = table.get) -> str:
+        return _get(key, key)
+
+    return translate
+
+
+def _loads(data: bytes) -> Any:
+    """Parse config file contents."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(config: Mapping[str, Any]) -> bytes:
+    """Serialize config as indented JSON, int keys written as strings."""
+    if orjson is not None:
+        return orjson.dumps(
+            config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(config, indent=2).encode('utf-8')
 
 
-def load_config() -> Dict:
-    """Load configuration from file or return defaults."""
+# (file signature, parsed config) from the last load; one tuple so readers
+# never see a signature paired with another load's config
+_config_cache: Optional[Tuple[Optional[Tuple[int, int]], NRISConfig]] = None
+
+
+def _config_signature() -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of the config file, or None if it doesn't exist."""
+    try:
+        st = os.stat(CONFIG_FILE)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def invalidate_config_cache() -> None:
+    """Force the next load_config() to re-read the config file."""
+    global _config_cache
+    _config_cache = None
+
+
+def load_config() -> NRISConfig:
+    """Load configuration from file merged over the defaults.
+
+    Keys missing from the file take their DEFAULT_CONFIG value, so callers
+    always see the full structure. The merged config is reused until the
+    file's mtime or size changes.
+    The returned dict is shared between callers; copy it before modifying.
+    """
+    global _config_cache
+    signature = _config_signature()
+    cached = _config_cache
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
     try:
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
+        with open(CONFIG_FILE, 'rb') as f:
+            merged = _deep_merge(DEFAULT_CONFIG, _loads(f.read()))
+        config = cast(NRISConfig, merged)
     except Exception:
-        return copy.deepcopy(DEFAULT_CONFIG)
+        config = default_config()
+    _config_cache = (signature, config)
+    return config
+
+
+def reload_config() -> NRISConfig:
+    """Re-read the config file even if its signature is unchanged."""
+    invalidate_config_cache()
+    return load_config()
 
 
-def save_config(config: Dict) -> bool:
-    """Save configuration to file."""
+def save_config(config: NRISConfig) -> bool:
+    """Save configuration to file.
+
+    Written to a temp file and moved into place, so a crash mid-write
+    leaves the previous config intact instead of a truncated file.
+    """
+    global _config_cache
+    tmp_file = CONFIG_FILE + '.tmp'
     try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
-        return True
+        data = _dumps(config)
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, CONFIG_FILE)
     except Exception:
+        invalidate_config_cache()
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
         return False
+    # Cache what a reload would produce: JSON turns int keys into strings
+    _config_cache = (
+        _config_signature(),
+        cast(NRISConfig, _deep_merge(DEFAULT_CONFIG, _loads(data))),
+    )
+    return True
+
+
+# Parse the config once at import so the first report or QC pass doesn't
+# pay for it; later load_config() calls only stat the file
+load_config()
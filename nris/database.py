@@ -1,25 +1,287 @@
 """
 Database operations for NRIS.
+
+Optional dependencies:
+- orjson: faster JSON encoding of result columns (falls back to json)
+- zstandard: compressed result JSON columns (see COMPRESS_RESULT_JSON)
 """
 
+import atexit
+import queue
 import sqlite3
 import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any, Union
 
 from .config import DB_FILE
 from .auth import hash_password
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore[assignment, unused-ignore]
+
+# Reads share a pool of query_only connections; writes go through a single
+# writer connection so they queue on a lock instead of SQLite's busy handler
+READER_POOL_SIZE = 4
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 20000
+# Bytes of the database to memory-map so hot pages skip read syscalls; less on 32-bit
+MMAP_SIZE = 256 * 1024 * 1024 if sys.maxsize > 2**32 else 64 * 1024 * 1024
+_reader_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=READER_POOL_SIZE)
+_reader_db: Optional[str] = None
+_reader_lock = threading.Lock()
+_writer_conn: Optional[sqlite3.Connection] = None
+_writer_db: Optional[str] = None
+# Reentrant: writers log_audit() while still holding the writer connection
+_writer_lock = threading.RLock()
+
+# INSERT ... RETURNING (new patient and its id in one statement) needs SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_SQL_INSERT_PATIENT = """
+    INSERT INTO patients
+    (mrn_id, full_name, age, weight_kg, height_cm, bmi, weeks, clinical_notes, created_at, created_by, is_deleted)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+"""
+_SQL_INSERT_NEW_PATIENT = _SQL_INSERT_PATIENT + "ON CONFLICT(mrn_id) DO NOTHING RETURNING id"
+
+# Store the results JSON columns (qc_metrics, cnv, rat, full_z) as
+# zstd-compressed BLOBs when zstandard is installed. Off by default because
+# NRIS_Enhanced.py reads the same database and expects JSON text; readers in
+# this package accept both forms
+COMPRESS_RESULT_JSON = False
+RESULT_JSON_COMPRESSION_LEVEL = 3
+
+# Result text that makes an overridden result HIGH RISK rather than NEGATIVE
+_HIGH_RISK_MARKERS = ('HIGH', 'RE-LIBRARY', 'RESAMPLE')
+
+# log_audit() buffers rows for this long so a background thread can commit
+# a burst of them (bulk deletes/saves) in one transaction
+AUDIT_FLUSH_DELAY = 0.2
+# (DB_FILE when logged, time.time() when logged, (user_id, action, details))
+_audit_pending: List[Tuple[str, float, tuple]] = []
+_audit_lock = threading.Lock()
+_audit_flush_lock = threading.Lock()
+_audit_writer: Optional[threading.Thread] = None
+
+_SQL_INSERT_AUDIT = """
+    INSERT INTO audit_log (user_id, action, details, timestamp, ip_address)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# Hot read queries. Every call passes the identical string, so sqlite3's
+# per-connection statement cache hands back the already-prepared statement
+# on the pooled connections instead of re-parsing the SQL
+# The detail queries alias columns to the keys callers expect, so a
+# sqlite3.Row maps straight onto the returned dict
+_SQL_PATIENT_DETAILS = """
+    SELECT p.id, p.mrn_id AS mrn, p.full_name AS name, p.age,
+           p.weight_kg AS weight, p.height_cm AS height, p.bmi, p.weeks,
+           p.clinical_notes AS notes, p.created_at
+    FROM patients p
+    WHERE p.id = ?
+"""
+_SQL_RESULT_DETAILS = """
+    SELECT id, patient_id, panel_type, qc_status, qc_details, qc_advice,
+           qc_metrics_json AS qc_metrics, t21_res, t18_res, t13_res, sca_res,
+           cnv_json AS cnv_list, rat_json AS rat_list, full_z_json AS full_z,
+           final_summary, created_at, COALESCE(test_number, 1) AS test_number
+    FROM results
+    WHERE id = ?
+"""
+# Result count as a correlated subquery: counted from idx_results_patient_id
+# alone, with no join rows to build and group
+_SQL_DUPLICATE_PATIENT = """
+    SELECT p.id, p.full_name, p.mrn_id, p.age, p.weeks,
+           (SELECT COUNT(*) FROM results r WHERE r.patient_id = p.id) AS result_count
+    FROM patients p
+    WHERE p.mrn_id = ?
+"""
+_SQL_QC_OVERRIDE_INFO = """
+    SELECT r.qc_override, r.qc_override_reason, r.qc_override_at, u.full_name
+    FROM results r
+    LEFT JOIN users u ON r.qc_override_by = u.id
+    WHERE r.id = ?
+"""
+
 
-def get_db_connection():
-    """Get database connection with foreign keys and WAL mode enabled."""
-    conn = sqlite3.connect(DB_FILE)
+def _json_dumps(value: Any) -> str:
+    """Encode a JSON column value."""
+    if orjson is not None:
+        encoded = orjson.dumps(
+            value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+        # orjson writes NaN/Infinity as null; re-encode anything that may
+        # hold them with json so they are stored as json.dumps would
+        if b'null' not in encoded:
+            return encoded.decode('utf-8')
+        try:
+            return json.dumps(value)
+        except TypeError:
+            return encoded.decode('utf-8')  # e.g. numpy ints json can't encode
+    return json.dumps(value)
+
+
+def _json_loads(text: Union[str, bytes]) -> Any:
+    """Decode a JSON column value."""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN written by json.dumps in older rows
+    return json.loads(text)
+
+
+def _pack_json(value: Any) -> Union[str, bytes]:
+    """Encode a results JSON column, compressed if COMPRESS_RESULT_JSON is on."""
+    text = _json_dumps(value)
+    if COMPRESS_RESULT_JSON and zstandard is not None:
+        compressed: bytes = zstandard.ZstdCompressor(
+            level=RESULT_JSON_COMPRESSION_LEVEL
+        ).compress(text.encode('utf-8'))
+        return compressed
+    return text
+
+
+def decode_json_column(value: Union[str, bytes, None], default: Any) -> Any:
+    """Decode a results JSON column stored as text or as a compressed BLOB.
+
+    Args:
+        value: Column value as read from the database.
+        default: Returned for NULL or empty values.
+
+    Raises:
+        RuntimeError: For a compressed value when zstandard isn't installed.
+    """
+    if not value:
+        return default
+    if isinstance(value, bytes):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read compressed result data")
+        value = zstandard.ZstdDecompressor().decompress(value)
+    return _json_loads(value)
+
+
+def _now_iso() -> str:
+    """Current local time in the ISO format stored in timestamp columns."""
+    return datetime.now().isoformat()
+
+
+def _connect(db_file: str, readonly: bool) -> sqlite3.Connection:
+    """Open a connection to db_file with the standard pragmas applied once."""
+    conn = sqlite3.connect(db_file, check_same_thread=False)
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
     conn.execute("PRAGMA foreign_keys = ON")
-    conn.execute("PRAGMA journal_mode = WAL")
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+    except sqlite3.OperationalError:
+        # Switching modes fails at once (no busy wait) while another
+        # connection writes; the mode is persistent, so a later connect sets it
+        pass
     conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
     return conn
 
 
+@contextmanager
+def _reader_connection() -> Iterator[sqlite3.Connection]:
+    """Borrow a read-only connection from the pool, opening one if it's empty."""
+    global _reader_db
+    db_file = DB_FILE
+    with _reader_lock:
+        if _reader_db != db_file:
+            while True:
+                try:
+                    _reader_pool.get_nowait().close()
+                except queue.Empty:
+                    break
+            _reader_db = db_file
+
+    try:
+        conn = _reader_pool.get_nowait()
+    except queue.Empty:
+        conn = _connect(db_file, readonly=True)
+
+    try:
+        yield conn
+    except BaseException:
+        conn.close()
+        raise
+
+    if conn.in_transaction:
+        conn.rollback()
+    if _reader_db != db_file:
+        conn.close()
+        return
+    try:
+        _reader_pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+@contextmanager
+def _writer_connection() -> Iterator[sqlite3.Connection]:
+    """Hold the writer connection, reopening it if DB_FILE changed."""
+    global _writer_conn, _writer_db
+    db_file = DB_FILE
+    with _writer_lock:
+        if _writer_conn is None or _writer_db != db_file:
+            if _writer_conn is not None:
+                _writer_conn.close()
+            _writer_conn = _connect(db_file, readonly=False)
+            _writer_db = db_file
+        conn = _writer_conn
+
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        if conn.in_transaction:
+            conn.commit()
+
+
+def get_db_connection(readonly: bool = False):
+    """Borrow a pooled database connection for a ``with`` block.
+
+    Connections are opened once with foreign keys, WAL, a busy timeout
+    and cache pragmas, then reused. ``readonly=True`` hands out one of
+    the shared query_only reader connections; otherwise the caller gets
+    the single writer connection, held exclusively until the block ends.
+    Like ``with sqlite3.connect(...)``, a pending transaction is committed
+    when the block exits normally and rolled back if it raises.
+    """
+    return _reader_connection() if readonly else _writer_connection()
+
+
+_INDEX_STATEMENTS = (
+    "CREATE INDEX IF NOT EXISTS idx_patients_mrn ON patients(mrn_id)",
+    "CREATE INDEX IF NOT EXISTS idx_patients_deleted ON patients(is_deleted)",
+    "CREATE INDEX IF NOT EXISTS idx_results_patient_id ON results(patient_id)",
+    "CREATE INDEX IF NOT EXISTS idx_results_created_at ON results(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_results_qc_status ON results(qc_status)",
+    "CREATE INDEX IF NOT EXISTS idx_audit_user_id ON audit_log(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)",
+)
+_SQL_CREATE_INDEXES = ";\n".join(_INDEX_STATEMENTS) + ";"
+
+
 def init_database() -> None:
     """Initialize database with all tables and indexes."""
     with sqlite3.connect(DB_FILE) as conn:
@@ -30,7 +292,8 @@ def init_database() -> None:
             CREATE TABLE IF NOT EXISTS users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
+                password_hash BLOB NOT NULL,
+                password_salt BLOB,
                 full_name TEXT,
                 role TEXT DEFAULT 'technician',
                 created_at TEXT,
@@ -41,6 +304,12 @@ def init_database() -> None:
             )
         ''')
 
+        # Migration: Add password_salt column (raw-bytes password storage)
+        try:
+            c.execute("ALTER TABLE users ADD COLUMN password_salt BLOB")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
         c.execute('''
             CREATE TABLE IF NOT EXISTS patients (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -100,73 +369,113 @@ def init_database() -> None:
             )
         ''')
 
-        # Create indexes
-        index_statements = [
-            "CREATE INDEX IF NOT EXISTS idx_patients_mrn ON patients(mrn_id)",
-            "CREATE INDEX IF NOT EXISTS idx_patients_deleted ON patients(is_deleted)",
-            "CREATE INDEX IF NOT EXISTS idx_results_patient_id ON results(patient_id)",
-            "CREATE INDEX IF NOT EXISTS idx_results_created_at ON results(created_at)",
-            "CREATE INDEX IF NOT EXISTS idx_results_qc_status ON results(qc_status)",
-            "CREATE INDEX IF NOT EXISTS idx_audit_user_id ON audit_log(user_id)",
-            "CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp)",
-            "CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)"
-        ]
-        for idx_sql in index_statements:
-            try:
-                c.execute(idx_sql)
-            except sqlite3.OperationalError:
-                pass
+        # Create indexes in one script; if one fails (e.g. a legacy table
+        # lacks the column), retry one by one so the rest still get created
+        try:
+            conn.executescript(_SQL_CREATE_INDEXES)
+        except sqlite3.OperationalError:
+            for idx_sql in _INDEX_STATEMENTS:
+                try:
+                    c.execute(idx_sql)
+                except sqlite3.OperationalError:
+                    pass
 
         # Create default admin user if none exists
         c.execute("SELECT COUNT(*) FROM users")
         if c.fetchone()[0] == 0:
-            admin_hash = hash_password("admin123")
+            admin_salt, admin_hash = hash_password("admin123")
             c.execute("""
-                INSERT INTO users (username, password_hash, full_name, role, created_at, must_change_password)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, ("admin", admin_hash, "System Administrator", "admin", datetime.now().isoformat(), 1))
+                INSERT INTO users (username, password_salt, password_hash, full_name, role, created_at, must_change_password)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, ("admin", admin_salt, admin_hash, "System Administrator", "admin", _now_iso(), 1))
 
 
 def log_audit(action: str, details: str, user_id: Optional[int] = None) -> None:
-    """Log user actions for compliance."""
-    try:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            safe_details = str(details)[:1000] if details else ""
-            c.execute("""
-                INSERT INTO audit_log (user_id, action, details, timestamp, ip_address)
-                VALUES (?, ?, ?, ?, ?)
-            """, (user_id, action, safe_details, datetime.now().isoformat(), "local"))
-            conn.commit()
-    except Exception:
-        pass
+    """Log user actions for compliance.
+
+    The entry is timestamped now but written shortly afterwards by a
+    background thread, batched with other recent entries. Call
+    flush_audit() to write buffered entries immediately.
+    """
+    safe_details = (details if isinstance(details, str) else str(details))[:1000] if details else ""
+    # Only the clock is read here; the timestamp is formatted at flush time
+    entry = (DB_FILE, time.time(), (user_id, action, safe_details))
+    with _audit_lock:
+        _audit_pending.append(entry)
+        _start_audit_writer()
+
+
+def _start_audit_writer() -> None:
+    """Start the audit write-behind thread if idle. Caller holds _audit_lock."""
+    global _audit_writer
+    if _audit_writer is None:
+        _audit_writer = threading.Thread(
+            target=_audit_write_behind,
+            name="nris-audit-writer",
+            daemon=True
+        )
+        _audit_writer.start()
+
+
+def _audit_write_behind() -> None:
+    """Background loop committing buffered audit rows until none are left."""
+    global _audit_writer
+    while True:
+        time.sleep(AUDIT_FLUSH_DELAY)
+        flush_audit()
+        with _audit_lock:
+            if not _audit_pending:
+                _audit_writer = None
+                return
+
+
+@atexit.register
+def flush_audit() -> int:
+    """Write all buffered audit entries, one transaction per database.
+
+    Returns:
+        Number of entries written.
+    """
+    with _audit_flush_lock:
+        with _audit_lock:
+            batch = _audit_pending[:]
+            _audit_pending.clear()
+
+        by_db: Dict[str, List[tuple]] = {}
+        for db_file, logged_at, fields in batch:
+            timestamp = datetime.fromtimestamp(logged_at).isoformat()
+            by_db.setdefault(db_file, []).append((*fields, timestamp, "local"))
+
+        written = 0
+        for db_file, rows in by_db.items():
+            try:
+                if db_file == DB_FILE:
+                    with _writer_connection() as conn:
+                        conn.executemany(_SQL_INSERT_AUDIT, rows)
+                else:
+                    # Logged before DB_FILE was switched; keep them with their database
+                    conn = _connect(db_file, readonly=False)
+                    try:
+                        with conn:
+                            conn.executemany(_SQL_INSERT_AUDIT, rows)
+                    finally:
+                        conn.close()
+                written += len(rows)
+            except Exception:
+                pass  # Audit logging never fails the caller
+        return written
 
 
 def get_patient_details(patient_id: int) -> Optional[Dict]:
     """Get full patient details."""
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             c = conn.cursor()
-            c.execute("""
-                SELECT p.id, p.mrn_id, p.full_name, p.age, p.weight_kg, p.height_cm,
-                       p.bmi, p.weeks, p.clinical_notes, p.created_at
-                FROM patients p
-                WHERE p.id = ?
-            """, (patient_id,))
+            c.row_factory = sqlite3.Row
+            c.execute(_SQL_PATIENT_DETAILS, (patient_id,))
             row = c.fetchone()
             if row:
-                return {
-                    'id': row[0],
-                    'mrn': row[1],
-                    'name': row[2],
-                    'age': row[3],
-                    'weight': row[4],
-                    'height': row[5],
-                    'bmi': row[6],
-                    'weeks': row[7],
-                    'notes': row[8],
-                    'created_at': row[9]
-                }
+                return dict(row)
     except Exception:
         pass
     return None
@@ -175,36 +484,18 @@ def get_patient_details(patient_id: int) -> Optional[Dict]:
 def get_result_details(result_id: int) -> Optional[Dict]:
     """Get full result details."""
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             c = conn.cursor()
-            c.execute("""
-                SELECT id, patient_id, panel_type, qc_status, qc_details, qc_advice,
-                       qc_metrics_json, t21_res, t18_res, t13_res, sca_res,
-                       cnv_json, rat_json, full_z_json, final_summary, created_at, test_number
-                FROM results
-                WHERE id = ?
-            """, (result_id,))
+            c.row_factory = sqlite3.Row
+            c.execute(_SQL_RESULT_DETAILS, (result_id,))
             row = c.fetchone()
             if row:
-                return {
-                    'id': row[0],
-                    'patient_id': row[1],
-                    'panel_type': row[2],
-                    'qc_status': row[3],
-                    'qc_details': row[4],
-                    'qc_advice': row[5],
-                    'qc_metrics': json.loads(row[6]) if row[6] else {},
-                    't21_res': row[7],
-                    't18_res': row[8],
-                    't13_res': row[9],
-                    'sca_res': row[10],
-                    'cnv_list': json.loads(row[11]) if row[11] else [],
-                    'rat_list': json.loads(row[12]) if row[12] else [],
-                    'full_z': json.loads(row[13]) if row[13] else {},
-                    'final_summary': row[14],
-                    'created_at': row[15],
-                    'test_number': row[16] if row[16] is not None else 1
-                }
+                result = dict(row)
+                result['qc_metrics'] = decode_json_column(result['qc_metrics'], {})
+                result['cnv_list'] = decode_json_column(result['cnv_list'], [])
+                result['rat_list'] = decode_json_column(result['rat_list'], [])
+                result['full_z'] = decode_json_column(result['full_z'], {})
+                return result
     except Exception:
         pass
     return None
@@ -213,15 +504,9 @@ def get_result_details(result_id: int) -> Optional[Dict]:
 def check_duplicate_patient(mrn: str) -> Tuple[bool, Optional[Dict]]:
     """Check if a patient with this MRN already exists."""
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             c = conn.cursor()
-            c.execute("""
-                SELECT p.id, p.full_name, p.mrn_id, p.age, p.weeks, COUNT(r.id) as result_count
-                FROM patients p
-                LEFT JOIN results r ON r.patient_id = p.id
-                WHERE p.mrn_id = ?
-                GROUP BY p.id
-            """, (mrn,))
+            c.execute(_SQL_DUPLICATE_PATIENT, (mrn,))
             row = c.fetchone()
             if row:
                 return True, {
@@ -242,6 +527,7 @@ def delete_patient(patient_id: int, user_id: Optional[int] = None) -> Tuple[bool
     try:
         with get_db_connection() as conn:
             c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
 
             c.execute("SELECT mrn_id, full_name FROM patients WHERE id = ?", (patient_id,))
             patient = c.fetchone()
@@ -250,10 +536,9 @@ def delete_patient(patient_id: int, user_id: Optional[int] = None) -> Tuple[bool
 
             mrn, name = patient
 
-            c.execute("SELECT COUNT(*) FROM results WHERE patient_id = ?", (patient_id,))
-            result_count = c.fetchone()[0]
-
+            # The delete's row count is the number of results removed
             c.execute("DELETE FROM results WHERE patient_id = ?", (patient_id,))
+            result_count = c.rowcount
             c.execute("DELETE FROM patients WHERE id = ?", (patient_id,))
 
             conn.commit()
@@ -271,6 +556,7 @@ def delete_record(report_id: int, user_id: Optional[int] = None) -> Tuple[bool,
     try:
         with get_db_connection() as conn:
             c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
             c.execute("SELECT patient_id FROM results WHERE id = ?", (report_id,))
             row = c.fetchone()
             if not row:
@@ -291,7 +577,6 @@ def save_result(patient: Dict, results: Dict, clinical: Dict, full_z: Optional[D
     from .utils import validate_mrn
     from .config import load_config
 
-    conn = None
     try:
         config = load_config()
         allow_alphanum = config.get('ALLOW_ALPHANUMERIC_MRN', False)
@@ -299,62 +584,67 @@ def save_result(patient: Dict, results: Dict, clinical: Dict, full_z: Optional[D
         if not is_valid:
             return 0, f"Invalid MRN: {error_msg}"
 
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("BEGIN TRANSACTION")
-
-        c.execute("""
-            SELECT id, full_name FROM patients
-            WHERE mrn_id = ?
-        """, (patient['id'],))
-        existing = c.fetchone()
-
-        if existing:
-            patient_db_id = existing[0]
-            existing_name = existing[1]
-            if not allow_duplicate:
-                conn.rollback()
-                return 0, f"Patient with MRN '{patient['id']}' already exists in registry as '{existing_name}'"
-        else:
-            c.execute("""
-                INSERT INTO patients
-                (mrn_id, full_name, age, weight_kg, height_cm, bmi, weeks, clinical_notes, created_at, created_by, is_deleted)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-            """, (
+        with get_db_connection() as conn:
+            c = conn.cursor()
+            # Take the write lock before the MRN lookup so a concurrent writer
+            # can't make this transaction fail with SQLITE_BUSY on upgrade
+            c.execute("BEGIN IMMEDIATE")
+            now = _now_iso()
+
+            patient_row = (
                 patient['id'], patient['name'], patient['age'], patient['weight'],
                 patient['height'], patient['bmi'], patient['weeks'], patient['notes'],
-                datetime.now().isoformat(), user_id
+                now, user_id
+            )
+            # A new MRN is inserted and its id returned in one statement;
+            # only an existing MRN needs the lookup below
+            inserted = None
+            if _HAS_RETURNING:
+                c.execute(_SQL_INSERT_NEW_PATIENT, patient_row)
+                inserted = c.fetchone()
+
+            if inserted:
+                patient_db_id = inserted[0]
+            else:
+                c.execute("""
+                    SELECT id, full_name FROM patients
+                    WHERE mrn_id = ?
+                """, (patient['id'],))
+                existing = c.fetchone()
+
+                if existing:
+                    patient_db_id = existing[0]
+                    existing_name = existing[1]
+                    if not allow_duplicate:
+                        conn.rollback()
+                        return 0, f"Patient with MRN '{patient['id']}' already exists in registry as '{existing_name}'"
+                else:
+                    c.execute(_SQL_INSERT_PATIENT, patient_row)
+                    patient_db_id = c.lastrowid
+
+            qc_metrics_json = _pack_json(qc_metrics) if qc_metrics else "{}"
+
+            c.execute("""
+                INSERT INTO results
+                (patient_id, panel_type, qc_status, qc_details, qc_advice, qc_metrics_json,
+                 t21_res, t18_res, t13_res, sca_res,
+                 cnv_json, rat_json, full_z_json, final_summary, created_at, created_by, test_number)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                patient_db_id, results['panel'], results['qc_status'],
+                str(results['qc_msgs']), results['qc_advice'], qc_metrics_json,
+                clinical['t21'], clinical['t18'], clinical['t13'], clinical['sca'],
+                _pack_json(clinical['cnv_list']), _pack_json(clinical['rat_list']),
+                _pack_json(full_z) if full_z else "{}", clinical['final'],
+                now, user_id, test_number
             ))
-            patient_db_id = c.lastrowid
-
-        qc_metrics_json = json.dumps(qc_metrics) if qc_metrics else "{}"
-
-        c.execute("""
-            INSERT INTO results
-            (patient_id, panel_type, qc_status, qc_details, qc_advice, qc_metrics_json,
-             t21_res, t18_res, t13_res, sca_res,
-             cnv_json, rat_json, full_z_json, final_summary, created_at, created_by, test_number)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            patient_db_id, results['panel'], results['qc_status'],
-            str(results['qc_msgs']), results['qc_advice'], qc_metrics_json,
-            clinical['t21'], clinical['t18'], clinical['t13'], clinical['sca'],
-            json.dumps(clinical['cnv_list']), json.dumps(clinical['rat_list']),
-            json.dumps(full_z) if full_z else "{}", clinical['final'],
-            datetime.now().isoformat(), user_id, test_number
-        ))
-        result_id = c.lastrowid
-
-        conn.commit()
+            result_id = c.lastrowid
+
+            conn.commit()
         log_audit("SAVE_RESULT", f"Created result {result_id} for patient {patient['id']} (Test #{test_number})", user_id)
         return result_id, "Success"
     except Exception as e:
-        if conn:
-            conn.rollback()
         return 0, str(e)
-    finally:
-        if conn:
-            conn.close()
 
 
 def override_qc_status(result_id: int, reason: str, user_id: int) -> Tuple[bool, str]:
@@ -362,6 +652,7 @@ def override_qc_status(result_id: int, reason: str, user_id: int) -> Tuple[bool,
     try:
         with get_db_connection() as conn:
             c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
 
             c.execute("""
                 SELECT t21_res, t18_res, t13_res, sca_res, cnv_json, rat_json, final_summary
@@ -373,13 +664,15 @@ def override_qc_status(result_id: int, reason: str, user_id: int) -> Tuple[bool,
 
             t21_res, t18_res, t13_res, sca_res, cnv_json, rat_json, old_summary = row
 
-            all_results = [str(t21_res), str(t18_res), str(t13_res), str(sca_res)]
-            is_positive = any('POSITIVE' in r.upper() for r in all_results)
-            is_high_risk = any('HIGH' in r.upper() or 'RE-LIBRARY' in r.upper() or 'RESAMPLE' in r.upper() for r in all_results)
+            # One upper-cased text for all four results; no marker contains a
+            # space, so none can match across the joins
+            all_results = " ".join(str(r) for r in (t21_res, t18_res, t13_res, sca_res)).upper()
+            is_positive = 'POSITIVE' in all_results
+            is_high_risk = any(m in all_results for m in _HIGH_RISK_MARKERS)
 
             try:
-                cnvs = json.loads(cnv_json) if cnv_json else []
-                rats = json.loads(rat_json) if rat_json else []
+                cnvs = decode_json_column(cnv_json, [])
+                rats = decode_json_column(rat_json, [])
                 if cnvs or rats:
                     is_high_risk = True
             except Exception:
@@ -400,7 +693,7 @@ def override_qc_status(result_id: int, reason: str, user_id: int) -> Tuple[bool,
                     qc_override_at = ?,
                     final_summary = ?
                 WHERE id = ?
-            """, (user_id, reason, datetime.now().isoformat(), new_summary, result_id))
+            """, (user_id, reason, _now_iso(), new_summary, result_id))
             if c.rowcount == 0:
                 return False, "Result not found"
             conn.commit()
@@ -413,14 +706,9 @@ def override_qc_status(result_id: int, reason: str, user_id: int) -> Tuple[bool,
 def get_qc_override_info(result_id: int) -> Optional[Dict]:
     """Get QC override information for a result."""
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             c = conn.cursor()
-            c.execute("""
-                SELECT r.qc_override, r.qc_override_reason, r.qc_override_at, u.full_name
-                FROM results r
-                LEFT JOIN users u ON r.qc_override_by = u.id
-                WHERE r.id = ?
-            """, (result_id,))
+            c.execute(_SQL_QC_OVERRIDE_INFO, (result_id,))
             row = c.fetchone()
             if row and row[0]:
                 return {
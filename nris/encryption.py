@@ -26,16 +26,48 @@ Security Note:
 
 from abc import ABC, abstractmethod
 import base64
+from functools import lru_cache
 import hashlib
 import hmac
 import logging
 import os
 import secrets
-from typing import Optional, Protocol, Union, Dict, Any, Type, runtime_checkable
+from typing import Optional, Protocol, Union, Dict, Any, List, Type, runtime_checkable
 
 logger = logging.getLogger(__name__)
 
 
+def _xor_with_key(data: bytes, key_bytes: bytes) -> bytes:
+    """XOR data with key_bytes repeated to its length.
+
+    Done as one big-integer XOR so the work happens in C rather than a
+    Python loop per byte.
+    """
+    size = len(data)
+    stream = (key_bytes * (size // len(key_bytes) + 1))[:size]
+    return (
+        int.from_bytes(data, 'little') ^ int.from_bytes(stream, 'little')
+    ).to_bytes(size, 'little')
+
+
+@lru_cache(maxsize=32)
+def _derive_fernet_key(password: str) -> bytes:
+    """Derive a Fernet-compatible key from a password.
+
+    PBKDF2 is deliberately slow (100k rounds), so derived keys are cached
+    and constructing several backends for the same password derives once.
+    """
+    # Use PBKDF2 with SHA256
+    key = hashlib.pbkdf2_hmac(
+        'sha256',
+        password.encode(),
+        b'nris_salt_v1',  # Static salt (consider making configurable)
+        100000,  # Iterations
+        dklen=32
+    )
+    return base64.urlsafe_b64encode(key)
+
+
 class EncryptionError(Exception):
     """Raised when encryption/decryption fails."""
     pass
@@ -65,6 +97,10 @@ class EncryptionBackend(Protocol):
             def is_encrypted(self, data: str) -> bool:
                 # Check if data appears encrypted
                 return data.startswith('MYENC:')
+
+    Backends may also provide ``encrypt_many(plaintexts) -> list`` to
+    encrypt several values in one call; FieldEncryptor uses it when
+    present and falls back to calling encrypt() per value.
     """
 
     def encrypt(self, plaintext: str) -> str:
@@ -116,6 +152,10 @@ class NoEncryption:
         """Return ciphertext unchanged."""
         return ciphertext
 
+    def encrypt_many(self, plaintexts: List[str]) -> List[str]:
+        """Return plaintexts unchanged."""
+        return list(plaintexts)
+
     def is_encrypted(self, data: str) -> bool:
         """Always returns False (data is never encrypted)."""
         return False
@@ -149,6 +189,9 @@ class FernetEncryption:
             self._key = base64.urlsafe_b64encode(secrets.token_bytes(32)).decode()
             logger.warning("Generated new encryption key. Store this securely!")
 
+        # Fallback cipher key, hashed once rather than on every call
+        self._key_bytes = hashlib.sha256(self._key.encode()).digest()
+
         # Try to use cryptography library
         try:
             from cryptography.fernet import Fernet
@@ -157,7 +200,7 @@ class FernetEncryption:
                 self._fernet = Fernet(self._key.encode())
             else:
                 # Derive a proper key from the provided key
-                derived = self._derive_key(self._key)
+                derived = _derive_fernet_key(self._key)
                 self._fernet = Fernet(derived)
         except ImportError:
             logger.info("cryptography library not available, using fallback encryption")
@@ -170,28 +213,13 @@ class FernetEncryption:
             logger.warning(f"cryptography library error ({type(e).__name__}: {e}), using fallback encryption")
             self._use_fallback = True
 
-    def _derive_key(self, password: str) -> bytes:
-        """Derive a Fernet-compatible key from a password."""
-        # Use PBKDF2 with SHA256
-        key = hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode(),
-            b'nris_salt_v1',  # Static salt (consider making configurable)
-            100000,  # Iterations
-            dklen=32
-        )
-        return base64.urlsafe_b64encode(key)
-
     def _fallback_encrypt(self, plaintext: str) -> str:
         """Simple XOR-based encryption fallback (less secure)."""
-        key_bytes = hashlib.sha256(self._key.encode()).digest()
+        key_bytes = self._key_bytes
         plaintext_bytes = plaintext.encode('utf-8')
 
         # XOR encryption with key cycling
-        encrypted = bytes(
-            p ^ key_bytes[i % len(key_bytes)]
-            for i, p in enumerate(plaintext_bytes)
-        )
+        encrypted = _xor_with_key(plaintext_bytes, key_bytes)
 
         # Add HMAC for integrity
         mac = hmac.new(key_bytes, encrypted, hashlib.sha256).digest()[:16]
@@ -200,7 +228,7 @@ class FernetEncryption:
 
     def _fallback_decrypt(self, ciphertext: str) -> str:
         """Simple XOR-based decryption fallback."""
-        key_bytes = hashlib.sha256(self._key.encode()).digest()
+        key_bytes = self._key_bytes
 
         try:
             data = base64.urlsafe_b64decode(ciphertext.encode())
@@ -219,10 +247,7 @@ class FernetEncryption:
             raise EncryptionError("Ciphertext integrity check failed")
 
         # XOR decryption
-        decrypted = bytes(
-            e ^ key_bytes[i % len(key_bytes)]
-            for i, e in enumerate(encrypted)
-        )
+        decrypted = _xor_with_key(encrypted, key_bytes)
 
         return decrypted.decode('utf-8')
 
@@ -252,6 +277,30 @@ class FernetEncryption:
         except Exception as e:
             raise EncryptionError(f"Encryption failed: {e}")
 
+    def encrypt_many(self, plaintexts: List[str]) -> List[str]:
+        """Encrypt several strings, choosing the cipher path once.
+
+        Args:
+            plaintexts: Strings to encrypt.
+
+        Returns:
+            Encrypted strings, the same as encrypt() would give for each.
+        """
+        if self._use_fallback:
+            encrypt_one = self._fallback_encrypt
+        else:
+            fernet_encrypt = self._fernet.encrypt
+
+            def encrypt_one(plaintext: str) -> str:
+                token: bytes = fernet_encrypt(plaintext.encode())
+                return token.decode()
+
+        prefix = self.PREFIX
+        try:
+            return [f"{prefix}{encrypt_one(p)}" if p else p for p in plaintexts]
+        except Exception as e:
+            raise EncryptionError(f"Encryption failed: {e}")
+
     def decrypt(self, ciphertext: str) -> str:
         """Decrypt Fernet-encrypted ciphertext.
 
@@ -281,6 +330,14 @@ class FernetEncryption:
         return data.startswith(self.PREFIX) if data else False
 
 
+def _copy_dicts(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy data and any nested dicts, as encrypt_dict would, leaving values as-is."""
+    return {
+        key: _copy_dicts(value) if isinstance(value, dict) else value
+        for key, value in data.items()
+    }
+
+
 class FieldEncryptor:
     """Encrypts specific fields in dictionaries.
 
@@ -319,14 +376,28 @@ class FieldEncryptor:
         Returns:
             New dictionary with sensitive fields encrypted.
         """
+        if isinstance(self.backend, NoEncryption):
+            return _copy_dicts(data)
+
         result = {}
+        sensitive = []
         for key, value in data.items():
             if key in self.encrypted_fields and isinstance(value, str):
-                result[key] = self.backend.encrypt(value)
+                sensitive.append(key)
+                result[key] = value  # Replaced below, keeps key order
             elif isinstance(value, dict):
                 result[key] = self.encrypt_dict(value)
             else:
                 result[key] = value
+
+        if sensitive:
+            values = [result[key] for key in sensitive]
+            encrypt_many = getattr(self.backend, 'encrypt_many', None)
+            if encrypt_many is not None:
+                encrypted = encrypt_many(values)
+            else:
+                encrypted = [self.backend.encrypt(value) for value in values]
+            result.update(zip(sensitive, encrypted))
         return result
 
     def decrypt_dict(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -338,6 +409,9 @@ class FieldEncryptor:
         Returns:
             New dictionary with sensitive fields decrypted.
         """
+        if isinstance(self.backend, NoEncryption):
+            return _copy_dicts(data)
+
         result = {}
         for key, value in data.items():
             if key in self.encrypted_fields and isinstance(value, str):
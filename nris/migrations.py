@@ -6,7 +6,8 @@ database schema changes. Migrations are versioned and tracked to ensure
 consistent database state across deployments.
 
 Features:
-- Automatic migration tracking with version table
+- Automatic migration tracking in the database header (PRAGMA user_version),
+  with an optional history table
 - Forward migrations with rollback support
 - Migration history and status reporting
 - Safe transaction handling
@@ -22,26 +23,60 @@ Usage:
     print(f"Current version: {status['current_version']}")
 """
 
+import bisect
+import copy
+import hashlib
+import re
 import sqlite3
 import logging
+import sys
+import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Callable, Tuple
 from dataclasses import dataclass, field
 
+from .cache import ThreadConnections, upgrade_cache_timestamps
 from .config import DB_FILE
 
 logger = logging.getLogger(__name__)
 
+# Page cache and memory map for migration connections; index builds and
+# whole-table UPDATEs read every row, so both pay off on a large registry
+MIGRATION_CACHE_SIZE_KIB = 65536
+MIGRATION_MMAP_SIZE = 256 * 1024 * 1024 if sys.maxsize > 2**32 else 64 * 1024 * 1024
+
+_ADD_COLUMN_RE = re.compile(
+    r'^\s*ALTER\s+TABLE\s+["`\[]?(\w+)["`\]]?\s+ADD\s+(?:COLUMN\s+)?["`\[]?(\w+)',
+    re.IGNORECASE
+)
+
+
+def _version_number(version: str) -> int:
+    """Parse a migration version string such as "008".
+
+    Raises:
+        ValueError: If the version isn't a non-negative integer, which
+            user_version requires.
+    """
+    if not (version.isascii() and version.isdigit()):
+        raise ValueError(
+            f"Migration version must be a string of digits such as '008', got {version!r}"
+        )
+    return int(version)
+
 
 @dataclass
 class Migration:
     """Represents a database migration.
 
     Attributes:
-        version: Unique version identifier (e.g., "001", "002").
+        version: Unique version number as a string of digits (e.g., "001",
+            "002"); anything else raises ValueError.
         description: Human-readable description of the migration.
         up: SQL statements or callable to apply the migration.
         down: SQL statements or callable to rollback the migration.
+        checksum: Short change-detection tag of version, description and
+            up, computed once at construction.
     """
     version: str
     description: str
@@ -49,6 +84,17 @@ class Migration:
     down: List[str] = field(default_factory=list)
     up_callable: Optional[Callable[[sqlite3.Connection], None]] = None
     down_callable: Optional[Callable[[sqlite3.Connection], None]] = None
+    checksum: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        _version_number(self.version)
+        content = f"{self.version}:{self.description}:{';'.join(self.up)}"
+        self.checksum = hashlib.blake2s(content.encode(), digest_size=4).hexdigest()
+
+
+def _upgrade_analytics_cache_timestamps(conn: sqlite3.Connection) -> None:
+    """Migration 007: convert _analytics_cache timestamps to unix seconds."""
+    upgrade_cache_timestamps(conn, "_analytics_cache")
 
 
 class MigrationError(Exception):
@@ -56,14 +102,37 @@ class MigrationError(Exception):
     pass
 
 
+def _get_user_version(conn: sqlite3.Connection) -> int:
+    """Read the schema version stored in the database file header."""
+    version: int = conn.execute("PRAGMA user_version").fetchone()[0]
+    return version
+
+
+def _set_user_version(conn: sqlite3.Connection, version: int) -> None:
+    """Store the schema version in the database file header.
+
+    PRAGMA takes no bound parameters, hence the int() before formatting.
+    Inside a transaction the change commits or rolls back with it.
+    """
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
 class MigrationManager:
     """Manages database migrations.
 
-    Tracks applied migrations in a version table and provides methods
-    to apply pending migrations or rollback to a specific version.
+    The number of the last applied migration is kept in SQLite's
+    ``user_version`` header field, so checking for pending migrations is
+    a single pragma read. Migrations apply in version order and each one
+    is applied when its number is above the stored version. Applied
+    migrations are also logged in a history table for get_status() and
+    get_history() unless ``record_history`` is False.
 
     Args:
         db_path: Path to the SQLite database file.
+        record_history: Log applied migrations in the history table.
+
+    Each thread keeps one connection open across calls; close() (or
+    leaving a ``with`` block) closes them.
 
     Example:
         manager = MigrationManager()
@@ -78,15 +147,64 @@ class MigrationManager:
 
     VERSION_TABLE = "_schema_migrations"
 
-    def __init__(self, db_path: Optional[str] = None):
+    # Seconds get_pending()/get_status() answers are reused for, so polling
+    # them doesn't query the database each time. Changes made through this
+    # manager invalidate them at once; other processes' within the TTL.
+    STATUS_CACHE_TTL = 30
+
+    def __init__(self, db_path: Optional[str] = None, record_history: bool = True):
         self.db_path = db_path or DB_FILE
+        self.record_history = record_history
         self._migrations: List[Migration] = []
+        # int(version) of each entry in self._migrations, kept sorted with it
+        self._version_numbers: List[int] = []
+        self._version_cache: Optional[Tuple[float, int]] = None
+        self._status_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._connections = ThreadConnections()
         self._register_migrations()
 
+    def __enter__(self) -> "MigrationManager":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connections of every thread."""
+        self._connections.close_all()
+
+    def invalidate_status_cache(self) -> None:
+        """Drop cached get_pending()/get_status() results."""
+        self._version_cache = None
+        self._status_cache = None
+
+    def _is_fresh(self, cached_at: float) -> bool:
+        """Check whether a value cached at ``cached_at`` is within the TTL."""
+        return time.monotonic() - cached_at < self.STATUS_CACHE_TTL
+
     def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection."""
-        conn = sqlite3.connect(self.db_path)
+        """Get this thread's connection, opening it on first use.
+
+        Settings are tuned for bulk schema changes and applied once per
+        connection.
+        """
+        conn = self._connections.get()
+        if conn is not None:
+            return conn
+        # check_same_thread=False only so close() can run from any thread
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # journal_mode persists in the file; only switch when it isn't WAL yet
+        if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() != "wal":
+            try:
+                conn.execute("PRAGMA journal_mode = WAL")
+            except sqlite3.OperationalError:
+                pass  # Another connection is writing; stay on the rollback journal
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA cache_size = -{MIGRATION_CACHE_SIZE_KIB}")
+        conn.execute(f"PRAGMA mmap_size = {MIGRATION_MMAP_SIZE}")
         conn.execute("PRAGMA foreign_keys = ON")
+        self._connections.set(conn)
         return conn
 
     def _ensure_version_table(self, conn: sqlite3.Connection) -> None:
@@ -101,13 +219,33 @@ class MigrationManager:
         """)
         conn.commit()
 
-    def _get_applied_versions(self, conn: sqlite3.Connection) -> set:
-        """Get set of already applied migration versions."""
-        self._ensure_version_table(conn)
-        cursor = conn.execute(
-            f"SELECT version FROM {self.VERSION_TABLE} ORDER BY version"
-        )
-        return {row[0] for row in cursor.fetchall()}
+    def _has_version_table(self, conn: sqlite3.Connection) -> bool:
+        """Check whether the history table exists, without creating it."""
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (self.VERSION_TABLE,)
+        ).fetchone() is not None
+
+    def _get_current_version(self, conn: sqlite3.Connection) -> int:
+        """Get the number of the last applied migration (0 if none).
+
+        Databases migrated before user_version was used have it at 0;
+        their version is taken from the history table instead.
+        """
+        current = _get_user_version(conn)
+        if current == 0 and self._has_version_table(conn):
+            cursor = conn.execute(f"SELECT version FROM {self.VERSION_TABLE}")
+            current = max((int(row[0]) for row in cursor.fetchall()), default=0)
+        return current
+
+    def _version_label(self, number: int) -> Optional[str]:
+        """Map a version number back to its registered version string."""
+        if number == 0:
+            return None
+        for m in self._migrations:
+            if int(m.version) == number:
+                return m.version
+        return str(number)
 
     def _record_migration(
         self,
@@ -138,11 +276,65 @@ class MigrationManager:
             (version,)
         )
 
+    def _statements_to_run(
+        self,
+        conn: sqlite3.Connection,
+        statements: List[str]
+    ) -> List[str]:
+        """Drop ADD COLUMN statements whose column already exists."""
+        columns: Dict[str, set] = {}
+        to_run = []
+        for sql in statements:
+            match = _ADD_COLUMN_RE.match(sql)
+            if match:
+                table, column = match.group(1).lower(), match.group(2).lower()
+                if table not in columns:
+                    columns[table] = {
+                        row[1].lower()
+                        for row in conn.execute(f'PRAGMA table_info("{table}")')
+                    }
+                if column in columns[table]:
+                    logger.debug(f"Column {table}.{column} already exists, skipping")
+                    continue
+            to_run.append(sql)
+        return to_run
+
+    def _apply_statements(
+        self,
+        conn: sqlite3.Connection,
+        statements: List[str]
+    ) -> None:
+        """Open a transaction and run a migration's SQL in it.
+
+        The statements go to SQLite as one script. An ADD COLUMN that
+        _statements_to_run didn't recognise (e.g. behind a comment, or with
+        a quoted name containing spaces) can still hit an existing column;
+        then the script is rolled back and rerun one statement at a time,
+        skipping the duplicate columns. The transaction is left open.
+        """
+        # Separators go on their own line, out of any trailing -- comment
+        script = "BEGIN;\n" + "".join(f"{sql}\n;\n" for sql in statements)
+        try:
+            conn.executescript(script)
+            return
+        except sqlite3.OperationalError as e:
+            if "duplicate column" not in str(e).lower():
+                raise
+            conn.rollback()
+
+        conn.execute("BEGIN")
+        for sql in statements:
+            try:
+                conn.execute(sql)
+            except sqlite3.OperationalError as e:
+                if "duplicate column" in str(e).lower():
+                    logger.debug(f"Column already exists, skipping: {e}")
+                else:
+                    raise
+
     def _compute_checksum(self, migration: Migration) -> str:
-        """Compute a checksum for migration verification."""
-        import hashlib
-        content = f"{migration.version}:{migration.description}:{migration.up}"
-        return hashlib.md5(content.encode()).hexdigest()[:8]
+        """Get the checksum recorded for a migration."""
+        return migration.checksum
 
     def _register_migrations(self) -> None:
         """Register all available migrations."""
@@ -184,6 +376,10 @@ class MigrationManager:
             description="Add columns for query optimization",
             up=[
                 """ALTER TABLE results ADD COLUMN has_anomaly INTEGER DEFAULT 0""",
+                # One scan evaluating every LIKE per row is the cheapest
+                # backfill: partial indexes per column would each need their
+                # own scan to build. The index is created afterwards so the
+                # UPDATE doesn't maintain it row by row.
                 """UPDATE results SET has_anomaly = 1 WHERE
                     final_summary LIKE '%POSITIVE%' OR
                     final_summary LIKE '%HIGH RISK%' OR
@@ -229,18 +425,47 @@ class MigrationManager:
             ]
         ))
 
+        # Migration 006: Store password salt and digest as raw bytes
+        self._migrations.append(Migration(
+            version="006",
+            description="Add password_salt BLOB column to users",
+            up=[
+                # Legacy hex "salt$hash" rows are rewritten on next login
+                "ALTER TABLE users ADD COLUMN password_salt BLOB",
+            ],
+            down=[
+                # SQLite doesn't support DROP COLUMN in older versions
+            ]
+        ))
+
+        # Migration 007: Cache timestamps as REAL unix seconds
+        self._migrations.append(Migration(
+            version="007",
+            description="Store analytics cache timestamps as unix seconds",
+            up_callable=_upgrade_analytics_cache_timestamps,
+            down=[
+                # Cache contents are disposable; TEXT timestamps aren't restored
+            ]
+        ))
+
+        self._version_numbers = [int(m.version) for m in self._migrations]
+
+    def _applied_count(self, current: int) -> int:
+        """Number of registered migrations at or below version current."""
+        return bisect.bisect_right(self._version_numbers, current)
+
     def register(self, migration: Migration) -> None:
         """Register a custom migration.
 
         Args:
             migration: Migration to register.
         """
-        # Insert in version order
-        for i, m in enumerate(self._migrations):
-            if migration.version < m.version:
-                self._migrations.insert(i, migration)
-                return
-        self._migrations.append(migration)
+        self.invalidate_status_cache()
+        # Insert in version order, after any migration with the same number
+        number = int(migration.version)
+        i = bisect.bisect_right(self._version_numbers, number)
+        self._version_numbers.insert(i, number)
+        self._migrations.insert(i, migration)
 
     def get_pending(self) -> List[Migration]:
         """Get list of pending (not yet applied) migrations.
@@ -248,12 +473,14 @@ class MigrationManager:
         Returns:
             List of migrations that haven't been applied yet.
         """
-        conn = self._get_connection()
-        try:
-            applied = self._get_applied_versions(conn)
-            return [m for m in self._migrations if m.version not in applied]
-        finally:
-            conn.close()
+        cached = self._version_cache
+        if cached is not None and self._is_fresh(cached[0]):
+            current = cached[1]
+        else:
+            conn = self._get_connection()
+            current = self._get_current_version(conn)
+            self._version_cache = (time.monotonic(), current)
+        return self._migrations[self._applied_count(current):]
 
     def migrate(self, target_version: Optional[str] = None) -> List[str]:
         """Apply pending migrations.
@@ -271,40 +498,43 @@ class MigrationManager:
         applied_versions: List[str] = []
 
         try:
-            applied = self._get_applied_versions(conn)
+            current = self._get_current_version(conn)
+            if _get_user_version(conn) != current:
+                # Carry a pre-user_version database's version into the header
+                _set_user_version(conn, current)
+                conn.commit()
 
             for migration in self._migrations:
-                if migration.version in applied:
+                number = int(migration.version)
+                if number <= current:
                     continue
 
-                if target_version and migration.version > target_version:
+                if target_version and number > _version_number(target_version):
                     break
 
                 logger.info(f"Applying migration {migration.version}: {migration.description}")
 
-                try:
-                    # Start transaction
-                    conn.execute("BEGIN TRANSACTION")
+                if self.record_history and not applied_versions:
+                    self._ensure_version_table(conn)
 
-                    # Apply SQL statements
-                    for sql in migration.up:
-                        try:
-                            conn.execute(sql)
-                        except sqlite3.OperationalError as e:
-                            # Handle "duplicate column" errors gracefully
-                            if "duplicate column" in str(e).lower():
-                                logger.debug(f"Column already exists, skipping: {e}")
-                            else:
-                                raise
+                try:
+                    # The transaction stays open for the callable and
+                    # version bump below
+                    self._apply_statements(
+                        conn, self._statements_to_run(conn, migration.up)
+                    )
 
                     # Apply callable if present
                     if migration.up_callable:
                         migration.up_callable(conn)
 
                     # Record migration
-                    self._record_migration(conn, migration)
+                    _set_user_version(conn, number)
+                    if self.record_history:
+                        self._record_migration(conn, migration)
 
                     conn.commit()
+                    current = number
                     applied_versions.append(migration.version)
                     logger.info(f"Migration {migration.version} applied successfully")
 
@@ -317,7 +547,7 @@ class MigrationManager:
             return applied_versions
 
         finally:
-            conn.close()
+            self.invalidate_status_cache()
 
     def rollback(self, steps: int = 1) -> List[str]:
         """Rollback the most recent migrations.
@@ -332,21 +562,15 @@ class MigrationManager:
         rolled_back: List[str] = []
 
         try:
-            # Get applied migrations in reverse order
-            cursor = conn.execute(
-                f"SELECT version FROM {self.VERSION_TABLE} ORDER BY version DESC LIMIT ?",
-                (steps,)
-            )
-            versions_to_rollback = [row[0] for row in cursor.fetchall()]
-
-            for version in versions_to_rollback:
-                migration = next(
-                    (m for m in self._migrations if m.version == version),
-                    None
-                )
-                if not migration:
-                    logger.warning(f"Migration {version} not found, skipping")
-                    continue
+            current = self._get_current_version(conn)
+            applied = self._migrations[:self._applied_count(current)]
+            if steps <= 0:
+                return rolled_back
+
+            for i in range(len(applied) - 1, max(len(applied) - steps, 0) - 1, -1):
+                migration = applied[i]
+                version = migration.version
+                previous = int(applied[i - 1].version) if i > 0 else 0
 
                 logger.info(f"Rolling back migration {version}")
 
@@ -361,7 +585,9 @@ class MigrationManager:
                     if migration.down_callable:
                         migration.down_callable(conn)
 
-                    self._remove_migration_record(conn, version)
+                    _set_user_version(conn, previous)
+                    if self._has_version_table(conn):
+                        self._remove_migration_record(conn, version)
 
                     conn.commit()
                     rolled_back.append(version)
@@ -375,7 +601,7 @@ class MigrationManager:
             return rolled_back
 
         finally:
-            conn.close()
+            self.invalidate_status_cache()
 
     def rollback_to(self, target_version: str) -> List[str]:
         """Rollback to a specific version.
@@ -386,16 +612,10 @@ class MigrationManager:
         Returns:
             List of rolled back migration versions.
         """
-        conn = self._get_connection()
-        try:
-            cursor = conn.execute(
-                f"SELECT version FROM {self.VERSION_TABLE} WHERE version > ? ORDER BY version DESC",
-                (target_version,)
-            )
-            count = len(cursor.fetchall())
-            return self.rollback(count) if count > 0 else []
-        finally:
-            conn.close()
+        current = self._get_current_version(self._get_connection())
+        target = _version_number(target_version)
+        count = max(self._applied_count(current) - self._applied_count(target), 0)
+        return self.rollback(count) if count > 0 else []
 
     def get_status(self) -> Dict[str, Any]:
         """Get current migration status.
@@ -408,33 +628,45 @@ class MigrationManager:
             - applied: List of applied migration info
             - pending: List of pending migration info
         """
+        cached = self._status_cache
+        if cached is None or not self._is_fresh(cached[0]):
+            cached = (time.monotonic(), self._read_status())
+            self._status_cache = cached
+        return copy.deepcopy(cached[1])
+
+    def _read_status(self) -> Dict[str, Any]:
+        """Build get_status()'s result from the database."""
         conn = self._get_connection()
-        try:
+        current = self._get_current_version(conn)
+        applied_at: Dict[str, str] = {}
+        if self.record_history:
             self._ensure_version_table(conn)
-
+        if self._has_version_table(conn):
             cursor = conn.execute(
-                f"SELECT version, description, applied_at FROM {self.VERSION_TABLE} ORDER BY version"
+                f"SELECT version, applied_at FROM {self.VERSION_TABLE}"
             )
-            applied_rows = cursor.fetchall()
-
-            applied_versions = {row[0] for row in applied_rows}
-            pending = [m for m in self._migrations if m.version not in applied_versions]
-
-            return {
-                'current_version': applied_rows[-1][0] if applied_rows else None,
-                'applied_count': len(applied_rows),
-                'pending_count': len(pending),
-                'applied': [
-                    {'version': row[0], 'description': row[1], 'applied_at': row[2]}
-                    for row in applied_rows
-                ],
-                'pending': [
-                    {'version': m.version, 'description': m.description}
-                    for m in pending
-                ]
-            }
-        finally:
-            conn.close()
+            applied_at = dict(cursor.fetchall())
+
+        split = self._applied_count(current)
+        applied, pending = self._migrations[:split], self._migrations[split:]
+
+        return {
+            'current_version': self._version_label(current),
+            'applied_count': len(applied),
+            'pending_count': len(pending),
+            'applied': [
+                {
+                    'version': m.version,
+                    'description': m.description,
+                    'applied_at': applied_at.get(m.version)
+                }
+                for m in applied
+            ],
+            'pending': [
+                {'version': m.version, 'description': m.description}
+                for m in pending
+            ]
+        }
 
     def get_history(self) -> List[Dict[str, Any]]:
         """Get migration history.
@@ -443,22 +675,19 @@ class MigrationManager:
             List of applied migrations with timestamps.
         """
         conn = self._get_connection()
-        try:
-            self._ensure_version_table(conn)
-            cursor = conn.execute(
-                f"SELECT version, description, applied_at, checksum FROM {self.VERSION_TABLE} ORDER BY version"
-            )
-            return [
-                {
-                    'version': row[0],
-                    'description': row[1],
-                    'applied_at': row[2],
-                    'checksum': row[3]
-                }
-                for row in cursor.fetchall()
-            ]
-        finally:
-            conn.close()
+        self._ensure_version_table(conn)
+        cursor = conn.execute(
+            f"SELECT version, description, applied_at, checksum FROM {self.VERSION_TABLE} ORDER BY version"
+        )
+        return [
+            {
+                'version': row[0],
+                'description': row[1],
+                'applied_at': row[2],
+                'checksum': row[3]
+            }
+            for row in cursor.fetchall()
+        ]
 
 
 def run_migrations(db_path: Optional[str] = None) -> List[str]:
@@ -470,5 +699,5 @@ def run_migrations(db_path: Optional[str] = None) -> List[str]:
     Returns:
         List of applied migration versions.
     """
-    manager = MigrationManager(db_path)
-    return manager.migrate()
+    with MigrationManager(db_path) as manager:
+        return manager.migrate()
@@ -1,9 +1,32 @@
 """
 PDF data extraction functions for NRIS.
+
+Optional dependencies (the first one installed is used for page text):
+- pypdfium2: PDFium bindings, much faster text extraction
+- pypdf: Maintained successor to PyPDF2
+- PyPDF2: Legacy parser, kept as the last fallback
 """
 
+import copy
+import hashlib
+import io
+import os
 import re
-from typing import Dict, List, Optional, Tuple
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple, Union
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None  # type: ignore[assignment, unused-ignore]
 
 try:
     import PyPDF2
@@ -17,6 +40,81 @@ MAX_PDF_SIZE_MB = 50
 ALLOWED_PDF_EXTENSIONS = {'.pdf'}
 MIN_TEXT_LENGTH = 100
 
+# Batches larger than this are parsed in worker processes, one file each;
+# PDF parsing is CPU-bound, so threads wouldn't help
+PARALLEL_PARSE_THRESHOLD = 2
+
+# Results of recent extractions keyed by (content digest, filename), so a
+# re-uploaded or retried file isn't parsed again
+EXTRACT_CACHE_SIZE = 256
+_extract_cache: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+_extract_cache_lock = threading.Lock()
+
+# Field patterns, compiled once at import. Within a list, earlier patterns
+# take priority; re.IGNORECASE throughout. Each pattern is searched on its
+# own: one fused alternation over all fields would let a match hide the
+# next field's keyword (the name pattern consumes the "MRN" after it), and
+# an exact fused scan with lookaheads measured ~4x slower, as the
+# alternation loses re's literal-prefix search.
+_I = re.IGNORECASE
+# Whitespace runs other than a lone space; those are already normalized
+_WS_RE = re.compile(r'(?: \s|[^\S ])\s*')
+_NAME_TRAILING_JUNK_RE = re.compile(r'[\d\|\,]+$')
+_NAME_PATTERNS = [re.compile(p, _I) for p in (
+    r'(?:Patient|Patient\s+Name|Name)[:\s]+([A-Za-z][A-Za-z\s\-\'\.]+?)(?:\s*(?:MRN|ID|Age|DOB|Date|\||,|\n|$))',
+    r'Full\s+Name[:\s]+([A-Za-z][A-Za-z\s\-\'\.]+?)(?:\s*(?:MRN|\n|$))',
+)]
+_MRN_PATTERNS = [re.compile(p, _I) for p in (
+    r'MRN[:\s#]+([A-Za-z0-9\-]+)',
+    r'(?:Patient\s+)?ID[:\s#]+([A-Za-z0-9\-]{4,})',
+    r'Sample\s+ID[:\s]+([A-Za-z0-9\-]+)',
+)]
+_AGE_PATTERNS = [re.compile(r'(?:Maternal\s+)?Age[:\s]+(\d{1,2})\s*(?:years?|yrs?|y)?(?:\s|,|\.|$)', _I)]
+_WEIGHT_PATTERNS = [re.compile(r'Weight[:\s]+(\d+\.?\d*)\s*(?:kg|KG|kilograms?)', _I)]
+_HEIGHT_PATTERNS = [re.compile(r'Height[:\s]+(\d{2,3})\s*(?:cm|CM|centimeters?)', _I)]
+_WEEKS_PATTERNS = [re.compile(r'(?:Gestational\s+Age|GA)[:\s]+(\d{1,2})\s*(?:\+\s*\d+)?(?:\s*weeks?|\s*wks?)?', _I)]
+_READS_PATTERNS = [re.compile(r'(?:Total\s+)?Reads?[:\s]+(\d+\.?\d*)\s*(?:M|million)', _I)]
+_CFF_PATTERNS = [re.compile(r'(?:Cff|FF|Fetal\s+Fraction)[:\s]+(\d+\.?\d*)\s*%?', _I)]
+_GC_PATTERNS = [re.compile(r'GC\s*(?:Content)?[:\s]+(\d+\.?\d*)\s*%?', _I)]
+_Z_PATTERNS = {
+    chrom: [re.compile(p, _I) for p in (
+        rf'(?:Trisomy\s*)?{chrom}[^)]*?\(Z[:\s]*(-?\d+\.?\d*)\)',
+        rf'Z[-\s]?{chrom}\b[:\s]+(-?\d+\.?\d*)',
+    )]
+    for chrom in (13, 18, 21)
+}
+_Z_XX_PATTERNS = [re.compile(r'Z[-\s]?XX\b[:\s]*(-?\d+\.?\d*)', _I)]
+_Z_XY_PATTERNS = [re.compile(r'Z[-\s]?XY\b[:\s]*(-?\d+\.?\d*)', _I)]
+_SCA_PATTERNS = [(re.compile(p, _I), sca_type) for p, sca_type in (
+    (r'XXX\+XY|XXX\s*\+\s*XY', 'XXX+XY'),
+    (r'XO\+XY|XO\s*\+\s*XY', 'XO+XY'),
+    (r'Turner|Monosomy\s+X|45[,\s]*X(?:O)?', 'XO'),
+    (r'Triple\s+X|Trisomy\s+X|47[,\s]*XXX', 'XXX'),
+    (r'Klinefelter|47[,\s]*XXY', 'XXY'),
+    (r'47[,\s]*XYY', 'XYY'),
+    (r'(?:Fetal\s+)?Sex[:\s]+Male|XY\s+(?:Male|detected)', 'XY'),
+    (r'(?:Fetal\s+)?Sex[:\s]+Female|XX\s+(?:Female|detected)', 'XX'),
+)]
+
+
+def _reads_in_millions(value: str) -> float:
+    # Reports give reads either in millions or as a raw count
+    reads = float(value)
+    return reads / 1000000 if reads > 100 else reads
+
+
+# Plain numeric fields: (key, patterns, cast, (low, high), decimals). The
+# first in-range match wins; decimals of None keeps the cast value as is.
+_NUMERIC_FIELDS = (
+    ('age', _AGE_PATTERNS, int, (15, 60), None),
+    ('weight', _WEIGHT_PATTERNS, float, (30, 200), 1),
+    ('height', _HEIGHT_PATTERNS, int, (100, 220), None),
+    ('weeks', _WEEKS_PATTERNS, int, (9, 42), None),
+    ('reads', _READS_PATTERNS, _reads_in_millions, (0.1, 100), 2),
+    ('cff', _CFF_PATTERNS, float, (0.5, 50), 2),
+    ('gc', _GC_PATTERNS, float, (20, 80), 2),
+)
+
 
 def validate_pdf_file(pdf_file, filename: str = "") -> Tuple[bool, str]:
     """Validate PDF file before processing.
@@ -34,38 +132,45 @@ def validate_pdf_file(pdf_file, filename: str = "") -> Tuple[bool, str]:
         if f'.{ext}' not in ALLOWED_PDF_EXTENSIONS:
             return False, f"Invalid file type: .{ext}. Only PDF files are allowed."
 
-    # Check file size
+    # Read the header and find the size in one pass, then rewind for the
+    # parser; uploads may be spooled to disk, so each seek can cost
+    header = size_bytes = None
     try:
+        pdf_file.seek(0)
+        header = pdf_file.read(8)
         pdf_file.seek(0, 2)
         size_bytes = pdf_file.tell()
         pdf_file.seek(0)
+    except Exception:
+        pass
+
+    # Check file size
+    if size_bytes is not None:
         size_mb = size_bytes / (1024 * 1024)
         if size_mb > MAX_PDF_SIZE_MB:
             return False, f"File too large: {size_mb:.1f}MB. Maximum allowed is {MAX_PDF_SIZE_MB}MB."
-    except Exception:
-        pass
 
     # Verify it's a valid PDF by checking header
-    try:
-        pdf_file.seek(0)
-        header = pdf_file.read(8)
-        pdf_file.seek(0)
-        if isinstance(header, bytes):
-            header = header.decode('latin-1', errors='ignore')
-        if not header.startswith('%PDF'):
-            return False, "Invalid PDF file: missing PDF header signature."
-    except Exception:
-        pass
+    if isinstance(header, bytes):
+        header = header.decode('latin-1', errors='ignore')
+    if isinstance(header, str) and not header.startswith('%PDF'):
+        return False, "Invalid PDF file: missing PDF header signature."
 
     return True, ""
 
 
-def extract_with_fallback(text: str, patterns: List[str], group: int = 1,
+def extract_with_fallback(text: str, patterns: List[Union[str, Pattern]], group: int = 1,
                           flags: int = re.IGNORECASE) -> Optional[str]:
-    """Try multiple regex patterns and return first match."""
+    """Try multiple regex patterns and return first match.
+
+    Patterns may be precompiled; ``flags`` only applies to string patterns.
+    """
     for pattern in patterns:
         try:
-            match = re.search(pattern, text, flags)
+            if isinstance(pattern, str):
+                match = re.search(pattern, text, flags)
+            else:
+                match = pattern.search(text)
             if match:
                 return match.group(group).strip()
         except (re.error, IndexError):
@@ -73,9 +178,139 @@ def extract_with_fallback(text: str, patterns: List[str], group: int = 1,
     return None
 
 
+def _extract_z_score(patterns: List[Pattern], text: str) -> Optional[float]:
+    """Return the last in-range Z-score any of the patterns finds in text."""
+    all_matches = []
+    for pattern in patterns:
+        for match in pattern.finditer(text):
+            try:
+                z_val = float(match.group(1))
+                if -20 <= z_val <= 50:
+                    all_matches.append((match.start(), z_val))
+            except (ValueError, IndexError):
+                continue
+    if all_matches:
+        all_matches.sort(key=lambda x: x[0])
+        return round(all_matches[-1][1], 3)
+    return None
+
+
+def _new_record(filename: str) -> Dict:
+    """Empty extraction result for one report, before any fields are found."""
+    return {
+        'source_file': filename,
+        'patient_name': '',
+        'mrn': '',
+        'age': 0,
+        'weight': 0.0,
+        'height': 0,
+        'bmi': 0.0,
+        'weeks': 0,
+        'panel': 'NIPT Standard',
+        'reads': 0.0,
+        'cff': 0.0,
+        'gc': 0.0,
+        'qs': 0.0,
+        'unique_rate': 0.0,
+        'error_rate': 0.0,
+        'z_scores': {},
+        'sca_type': 'XX',
+        'cnv_findings': [],
+        'rat_findings': [],
+        'qc_status': '',
+        'final_result': '',
+        'notes': '',
+        'extraction_confidence': 'HIGH'
+    }
+
+
+def _extract_fields(text: str, data: Dict) -> None:
+    """Fill data with the fields found in whitespace-normalized report text."""
+    # Extract patient name
+    for pattern in _NAME_PATTERNS:
+        name_match = pattern.search(text)
+        if name_match:
+            name = name_match.group(1).strip()
+            name = _NAME_TRAILING_JUNK_RE.sub('', name).strip()
+            if len(name) > 2:
+                data['patient_name'] = name
+                break
+
+    # Extract MRN
+    for pattern in _MRN_PATTERNS:
+        mrn_match = pattern.search(text)
+        if mrn_match:
+            data['mrn'] = mrn_match.group(1).strip()
+            break
+
+    # Extract numeric measurements
+    for key, patterns, cast, (low, high), decimals in _NUMERIC_FIELDS:
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                value = cast(match.group(1))
+                if low <= value <= high:
+                    data[key] = value if decimals is None else round(value, decimals)
+                    break
+
+    # Calculate BMI if not present
+    if not data['bmi'] and data['weight'] > 0 and data['height'] > 0:
+        data['bmi'] = round(data['weight'] / ((data['height']/100)**2), 1)
+
+    # Extract Z-scores for main trisomies
+    for chrom, z_patterns in _Z_PATTERNS.items():
+        z_val = _extract_z_score(z_patterns, text)
+        if z_val is not None:
+            data['z_scores'][chrom] = z_val
+
+    # Extract SCA Z-scores
+    z_val = _extract_z_score(_Z_XX_PATTERNS, text)
+    if z_val is not None:
+        data['z_scores']['XX'] = z_val
+
+    z_val = _extract_z_score(_Z_XY_PATTERNS, text)
+    if z_val is not None:
+        data['z_scores']['XY'] = z_val
+
+    # Detect SCA type
+    for pattern, sca_type in _SCA_PATTERNS:
+        if pattern.search(text):
+            data['sca_type'] = sca_type
+            break
+
+
+def _cache_key(raw: bytes, filename: str) -> Tuple[str, str]:
+    # The filename is part of the key: it's copied into the result and
+    # decides the file-type warning
+    return hashlib.blake2b(raw, digest_size=16).hexdigest(), filename
+
+
+def _cache_get(key: Tuple[str, str]) -> Optional[Dict]:
+    """Copy of a cached extraction result, or None."""
+    with _extract_cache_lock:
+        data = _extract_cache.get(key)
+        if data is None:
+            return None
+        _extract_cache.move_to_end(key)
+    return copy.deepcopy(data)
+
+
+def _cache_put(key: Tuple[str, str], data: Dict) -> None:
+    """Remember an extraction result, evicting the least recently used."""
+    data = copy.deepcopy(data)
+    with _extract_cache_lock:
+        _extract_cache[key] = data
+        _extract_cache.move_to_end(key)
+        while len(_extract_cache) > EXTRACT_CACHE_SIZE:
+            _extract_cache.popitem(last=False)
+
+
 def extract_data_from_pdf(pdf_file, filename: str = "") -> Optional[Dict]:
     """Extract comprehensive patient and test data from PDF report.
 
+    Results are cached by file content and name, so extracting the same
+    upload again returns a copy of the earlier result.
+
     Args:
         pdf_file: File-like object containing PDF data
         filename: Original filename
@@ -83,236 +318,91 @@ def extract_data_from_pdf(pdf_file, filename: str = "") -> Optional[Dict]:
     Returns:
         Dict with extracted data or None if extraction fails
     """
-    if PyPDF2 is None:
+    if not _has_pdf_backend():
         return None
 
-    extraction_warnings = []
-
-    # Validate PDF file first
-    is_valid, error_msg = validate_pdf_file(pdf_file, filename)
-    if not is_valid:
-        extraction_warnings.append(error_msg)
-
     try:
         pdf_file.seek(0)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-
-        if len(pdf_reader.pages) == 0:
-            return None
-
-        text = ""
-        for page_num, page in enumerate(pdf_reader.pages):
-            try:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            except Exception:
-                extraction_warnings.append(f"Could not extract text from page {page_num + 1}")
-
-        if len(text.strip()) < MIN_TEXT_LENGTH:
-            extraction_warnings.append("Low text content - possible scanned PDF")
+        raw = pdf_file.read()
+    except Exception:
+        return None
 
-        # Clean up text
-        text = re.sub(r'\s+', ' ', text)
-
-        # Initialize data structure
-        data = {
-            'source_file': filename,
-            'patient_name': '',
-            'mrn': '',
-            'age': 0,
-            'weight': 0.0,
-            'height': 0,
-            'bmi': 0.0,
-            'weeks': 0,
-            'panel': 'NIPT Standard',
-            'reads': 0.0,
-            'cff': 0.0,
-            'gc': 0.0,
-            'qs': 0.0,
-            'unique_rate': 0.0,
-            'error_rate': 0.0,
-            'z_scores': {},
-            'sca_type': 'XX',
-            'cnv_findings': [],
-            'rat_findings': [],
-            'qc_status': '',
-            'final_result': '',
-            'notes': '',
-            'extraction_confidence': 'HIGH'
-        }
+    key = _cache_key(raw, filename)
+    data = _cache_get(key)
+    if data is None:
+        data = _extract_pdf(raw, filename)
+        if data is not None:
+            _cache_put(key, data)
+    return data
 
-        # Extract patient name
-        name_patterns = [
-            r'(?:Patient|Patient\s+Name|Name)[:\s]+([A-Za-z][A-Za-z\s\-\'\.]+?)(?:\s*(?:MRN|ID|Age|DOB|Date|\||,|\n|$))',
-            r'Full\s+Name[:\s]+([A-Za-z][A-Za-z\s\-\'\.]+?)(?:\s*(?:MRN|\n|$))',
-        ]
-        for pattern in name_patterns:
-            name_match = re.search(pattern, text, re.IGNORECASE)
-            if name_match:
-                name = name_match.group(1).strip()
-                name = re.sub(r'[\d\|\,]+$', '', name).strip()
-                if len(name) > 2:
-                    data['patient_name'] = name
-                    break
 
-        # Extract MRN
-        mrn_patterns = [
-            r'MRN[:\s#]+([A-Za-z0-9\-]+)',
-            r'(?:Patient\s+)?ID[:\s#]+([A-Za-z0-9\-]{4,})',
-            r'Sample\s+ID[:\s]+([A-Za-z0-9\-]+)',
-        ]
-        for pattern in mrn_patterns:
-            mrn_match = re.search(pattern, text, re.IGNORECASE)
-            if mrn_match:
-                data['mrn'] = mrn_match.group(1).strip()
-                break
+def _has_pdf_backend() -> bool:
+    return pdfium is not None or pypdf is not None or PyPDF2 is not None
 
-        # Extract age
-        age_patterns = [
-            r'(?:Maternal\s+)?Age[:\s]+(\d{1,2})\s*(?:years?|yrs?|y)?(?:\s|,|\.|$)',
-        ]
-        for pattern in age_patterns:
-            age_match = re.search(pattern, text, re.IGNORECASE)
-            if age_match:
-                age = int(age_match.group(1))
-                if 15 <= age <= 60:
-                    data['age'] = age
-                    break
 
-        # Extract weight
-        weight_patterns = [
-            r'Weight[:\s]+(\d+\.?\d*)\s*(?:kg|KG|kilograms?)',
-        ]
-        for pattern in weight_patterns:
-            weight_match = re.search(pattern, text, re.IGNORECASE)
-            if weight_match:
-                weight = float(weight_match.group(1))
-                if 30 <= weight <= 200:
-                    data['weight'] = round(weight, 1)
-                    break
+def _iter_page_texts(pdf_bytes: bytes) -> Iterator[Optional[str]]:
+    """Yield the text of each page, or None for a page that can't be read.
 
-        # Extract height
-        height_patterns = [
-            r'Height[:\s]+(\d{2,3})\s*(?:cm|CM|centimeters?)',
-        ]
-        for pattern in height_patterns:
-            height_match = re.search(pattern, text, re.IGNORECASE)
-            if height_match:
-                height = int(height_match.group(1))
-                if 100 <= height <= 220:
-                    data['height'] = height
-                    break
+    Uses the fastest installed library. Errors opening the document are
+    raised; errors on a single page are not.
+    """
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(pdf_bytes)
+        try:
+            for page_num in range(len(pdf)):
+                try:
+                    page = pdf[page_num]
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_range()
+                    textpage.close()
+                    page.close()
+                except Exception:
+                    text = None
+                yield text
+        finally:
+            pdf.close()
+        return
+
+    reader_module = pypdf if pypdf is not None else PyPDF2
+    pdf_reader = reader_module.PdfReader(io.BytesIO(pdf_bytes))
+    for page in pdf_reader.pages:
+        try:
+            text = page.extract_text() or ""
+        except Exception:
+            text = None
+        yield text
 
-        # Calculate BMI if not present
-        if not data['bmi'] and data['weight'] > 0 and data['height'] > 0:
-            data['bmi'] = round(data['weight'] / ((data['height']/100)**2), 1)
-
-        # Extract gestational weeks
-        weeks_patterns = [
-            r'(?:Gestational\s+Age|GA)[:\s]+(\d{1,2})\s*(?:\+\s*\d+)?(?:\s*weeks?|\s*wks?)?',
-        ]
-        for pattern in weeks_patterns:
-            weeks_match = re.search(pattern, text, re.IGNORECASE)
-            if weeks_match:
-                weeks = int(weeks_match.group(1))
-                if 9 <= weeks <= 42:
-                    data['weeks'] = weeks
-                    break
 
-        # Extract sequencing reads
-        reads_patterns = [
-            r'(?:Total\s+)?Reads?[:\s]+(\d+\.?\d*)\s*(?:M|million)',
-        ]
-        for pattern in reads_patterns:
-            reads_match = re.search(pattern, text, re.IGNORECASE)
-            if reads_match:
-                reads = float(reads_match.group(1))
-                if reads > 100:
-                    reads = reads / 1000000
-                if 0.1 <= reads <= 100:
-                    data['reads'] = round(reads, 2)
-                    break
+def _extract_pdf(raw: bytes, filename: str) -> Optional[Dict]:
+    """Uncached body of extract_data_from_pdf."""
+    # Validate PDF file first; a file that fails would only fail to parse
+    is_valid, _ = validate_pdf_file(io.BytesIO(raw), filename)
+    if not is_valid:
+        return None
 
-        # Extract fetal fraction
-        cff_patterns = [
-            r'(?:Cff|FF|Fetal\s+Fraction)[:\s]+(\d+\.?\d*)\s*%?',
-        ]
-        for pattern in cff_patterns:
-            cff_match = re.search(pattern, text, re.IGNORECASE)
-            if cff_match:
-                cff = float(cff_match.group(1))
-                if 0.5 <= cff <= 50:
-                    data['cff'] = round(cff, 2)
-                    break
+    extraction_warnings = []
 
-        # Extract GC content
-        gc_patterns = [
-            r'GC\s*(?:Content)?[:\s]+(\d+\.?\d*)\s*%?',
-        ]
-        for pattern in gc_patterns:
-            gc_match = re.search(pattern, text, re.IGNORECASE)
-            if gc_match:
-                gc = float(gc_match.group(1))
-                if 20 <= gc <= 80:
-                    data['gc'] = round(gc, 2)
-                    break
+    try:
+        page_count = 0
+        page_texts = []
+        for page_count, page_text in enumerate(_iter_page_texts(raw), 1):
+            if page_text is None:
+                extraction_warnings.append(f"Could not extract text from page {page_count}")
+            elif page_text:
+                # Collapse whitespace per page, while the string is small
+                page_text = _WS_RE.sub(' ', page_text).strip()
+                if page_text:
+                    page_texts.append(page_text)
 
-        # Extract Z-scores for main trisomies
-        def extract_z_score(patterns_list, search_text):
-            all_matches = []
-            for pattern in patterns_list:
-                for match in re.finditer(pattern, search_text, re.IGNORECASE):
-                    try:
-                        z_val = float(match.group(1))
-                        if -20 <= z_val <= 50:
-                            all_matches.append((match.start(), z_val))
-                    except (ValueError, IndexError):
-                        continue
-            if all_matches:
-                all_matches.sort(key=lambda x: x[0])
-                return round(all_matches[-1][1], 3)
+        if page_count == 0:
             return None
+        text = " ".join(page_texts)
 
-        for chrom in [13, 18, 21]:
-            z_patterns = [
-                rf'(?:Trisomy\s*)?{chrom}[^)]*?\(Z[:\s]*(-?\d+\.?\d*)\)',
-                rf'Z[-\s]?{chrom}\b[:\s]+(-?\d+\.?\d*)',
-            ]
-            z_val = extract_z_score(z_patterns, text)
-            if z_val is not None:
-                data['z_scores'][chrom] = z_val
-
-        # Extract SCA Z-scores
-        z_xx_patterns = [
-            r'Z[-\s]?XX\b[:\s]*(-?\d+\.?\d*)',
-        ]
-        z_val = extract_z_score(z_xx_patterns, text)
-        if z_val is not None:
-            data['z_scores']['XX'] = z_val
+        if len(text) < MIN_TEXT_LENGTH:
+            extraction_warnings.append("Low text content - possible scanned PDF")
 
-        z_xy_patterns = [
-            r'Z[-\s]?XY\b[:\s]*(-?\d+\.?\d*)',
-        ]
-        z_val = extract_z_score(z_xy_patterns, text)
-        if z_val is not None:
-            data['z_scores']['XY'] = z_val
-
-        # Detect SCA type
-        sca_patterns = [
-            (r'XXX\+XY|XXX\s*\+\s*XY', 'XXX+XY'),
-            (r'XO\+XY|XO\s*\+\s*XY', 'XO+XY'),
-            (r'Turner|Monosomy\s+X|45[,\s]*X(?:O)?', 'XO'),
-            (r'Triple\s+X|Trisomy\s+X|47[,\s]*XXX', 'XXX'),
-            (r'Klinefelter|47[,\s]*XXY', 'XXY'),
-            (r'47[,\s]*XYY', 'XYY'),
-            (r'(?:Fetal\s+)?Sex[:\s]+Male|XY\s+(?:Male|detected)', 'XY'),
-            (r'(?:Fetal\s+)?Sex[:\s]+Female|XX\s+(?:Female|detected)', 'XX'),
-        ]
-        for pattern, sca_type in sca_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                data['sca_type'] = sca_type
-                break
+        data = _new_record(filename)
+        _extract_fields(text, data)
 
         # Calculate extraction confidence
         critical_fields = {
@@ -341,6 +431,50 @@ def extract_data_from_pdf(pdf_file, filename: str = "") -> Optional[Dict]:
         return None
 
 
+def _extract_from_bytes(item: Tuple[str, bytes]) -> Optional[Dict]:
+    """Worker entry point: extract one file shipped to another process."""
+    filename, raw = item
+    return _extract_pdf(raw, filename)
+
+
+def _extract_all(pdf_files: List, filenames: List[str]) -> List[Optional[Dict]]:
+    """Extract every file, in parallel processes for larger batches."""
+    if len(pdf_files) > PARALLEL_PARSE_THRESHOLD and _has_pdf_backend():
+        # Uploaded files may not pickle; send their bytes instead. The
+        # cache lives in this process, so it's checked and filled here.
+        results: List[Optional[Dict]] = []
+        misses: List[Tuple[int, Tuple[str, str], Tuple[str, bytes]]] = []
+        for pdf_file, filename in zip(pdf_files, filenames):
+            try:
+                pdf_file.seek(0)
+                raw = pdf_file.read()
+            except Exception:
+                # Reported as a failed file, as extract_data_from_pdf does
+                results.append(None)
+                continue
+            key = _cache_key(raw, filename)
+            results.append(_cache_get(key))
+            if results[-1] is None:
+                misses.append((len(results) - 1, key, (filename, raw)))
+        items = [item for _, _, item in misses]
+        workers = min(len(items), os.cpu_count() or 1)
+        try:
+            if len(items) > PARALLEL_PARSE_THRESHOLD:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    extracted = list(executor.map(_extract_from_bytes, items))
+            else:
+                extracted = [_extract_from_bytes(item) for item in items]
+        except (OSError, BrokenProcessPool):
+            # No worker processes available here; parse in this one
+            extracted = [_extract_from_bytes(item) for item in items]
+        for (i, key, _), data in zip(misses, extracted):
+            results[i] = data
+            if data is not None:
+                _cache_put(key, data)
+        return results
+    return [extract_data_from_pdf(f, name) for f, name in zip(pdf_files, filenames)]
+
+
 def parse_pdf_batch(pdf_files: List) -> Dict[str, List[Dict]]:
     """Parse multiple PDF files and group by patient MRN.
 
@@ -353,10 +487,12 @@ def parse_pdf_batch(pdf_files: List) -> Dict[str, List[Dict]]:
     patients = {}
     errors = []
 
-    for pdf_file in pdf_files:
-        filename = pdf_file.name if hasattr(pdf_file, 'name') else 'unknown.pdf'
-        data = extract_data_from_pdf(pdf_file, filename)
-
+    filenames = [
+        pdf_file.name if hasattr(pdf_file, 'name') else 'unknown.pdf'
+        for pdf_file in pdf_files
+    ]
+    # Results come back in input order, so grouping matches a serial parse
+    for filename, data in zip(filenames, _extract_all(pdf_files, filenames)):
         if data:
             if data['mrn']:
                 mrn = data['mrn']
@@ -3,9 +3,8 @@ PDF report generation functions for NRIS.
 """
 
 import io
-import json
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, Union
 
 try:
     import pandas as pd
@@ -19,17 +18,17 @@ try:
 except ImportError:
     REPORTLAB_AVAILABLE = False
 
-from ..config import load_config, get_translation
-from ..database import get_db_connection
+from ..config import load_config, get_translator
+from ..database import decode_json_column, get_db_connection
 from ..utils import get_maternal_age_risk
-from ..analysis.qc import get_reportable_status
+from ..analysis.qc import ResultText, fold_result, get_reportable_status
 
 
-def get_clinical_recommendation(result: str, test_type: str) -> str:
+def get_clinical_recommendation(result: Union[str, ResultText], test_type: str) -> str:
     """Generate clinical recommendation based on test result.
 
     Args:
-        result: Result text (e.g., "POSITIVE", "Low Risk")
+        result: Result text (e.g., "POSITIVE", "Low Risk") or a folded ResultText
         test_type: Type of test (T21, T18, T13, SCA, CNV, RAT)
 
     Returns:
@@ -52,9 +51,10 @@ def get_clinical_recommendation(result: str, test_type: str) -> str:
         }
     }
 
-    if 'POSITIVE' in result.upper():
+    result_upper = fold_result(result).upper
+    if 'POSITIVE' in result_upper:
         return recommendations['POSITIVE'].get(test_type, recommendations['POSITIVE'].get('default', ''))
-    elif 'HIGH' in result.upper() or 'AMBIGUOUS' in result.upper():
+    elif 'HIGH' in result_upper or 'AMBIGUOUS' in result_upper:
         return recommendations['HIGH']['default']
     else:
         return recommendations['LOW']['default']
@@ -78,10 +78,9 @@ def generate_pdf_report(report_id: int, lang: str = None) -> Optional[bytes]:
         if lang is None:
             lang = config.get('REPORT_LANGUAGE', 'en')
 
-        def t(key: str) -> str:
-            return get_translation(key, lang)
+        t = get_translator(lang)
 
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             query = """
                 SELECT r.id, p.full_name, p.mrn_id, p.age, p.weeks, r.created_at, p.clinical_notes,
                        r.panel_type, r.qc_status, r.qc_details, r.qc_advice, r.qc_metrics_json,
@@ -104,10 +103,10 @@ def generate_pdf_report(report_id: int, lang: str = None) -> Optional[bytes]:
             return None
 
         row = df.iloc[0]
-        cnvs = json.loads(row['cnv_json']) if row['cnv_json'] else []
-        rats = json.loads(row['rat_json']) if row['rat_json'] else []
-        z_data = json.loads(row['full_z_json']) if row['full_z_json'] else {}
-        qc_metrics = json.loads(row['qc_metrics_json']) if row.get('qc_metrics_json') else {}
+        cnvs = decode_json_column(row['cnv_json'], [])
+        rats = decode_json_column(row['rat_json'], [])
+        z_data = decode_json_column(row['full_z_json'], {})
+        qc_metrics = decode_json_column(row.get('qc_metrics_json'), {})
 
         qc_override = bool(row.get('qc_override'))
         qc_override_reason = row.get('qc_override_reason', '')
@@ -188,15 +187,18 @@ def generate_pdf_report(report_id: int, lang: str = None) -> Optional[bytes]:
             return f"{z:.2f}" if isinstance(z, (int, float)) else str(z)
 
         effective_qc_status = 'PASS' if qc_override else (row['qc_status'] or 'PASS')
-        t21_reportable, _ = get_reportable_status(str(row['t21_res']), effective_qc_status, qc_override)
-        t18_reportable, _ = get_reportable_status(str(row['t18_res']), effective_qc_status, qc_override)
-        t13_reportable, _ = get_reportable_status(str(row['t13_res']), effective_qc_status, qc_override)
+        t21_res = fold_result(row['t21_res'])
+        t18_res = fold_result(row['t18_res'])
+        t13_res = fold_result(row['t13_res'])
+        t21_reportable, _ = get_reportable_status(t21_res, effective_qc_status, qc_override)
+        t18_reportable, _ = get_reportable_status(t18_res, effective_qc_status, qc_override)
+        t13_reportable, _ = get_reportable_status(t13_res, effective_qc_status, qc_override)
 
         results_header = [[t('condition'), t('result'), t('z_score'), t('reportable')]]
         results_rows = [
-            [t('trisomy_21'), str(row['t21_res']), fmt_z(z21), t21_reportable],
-            [t('trisomy_18'), str(row['t18_res']), fmt_z(z18), t18_reportable],
-            [t('trisomy_13'), str(row['t13_res']), fmt_z(z13), t13_reportable],
+            [t('trisomy_21'), t21_res.text, fmt_z(z21), t21_reportable],
+            [t('trisomy_18'), t18_res.text, fmt_z(z18), t18_reportable],
+            [t('trisomy_13'), t13_res.text, fmt_z(z13), t13_reportable],
             [t('sca'), str(row['sca_res']), '-', '-'],
         ]
 
@@ -216,14 +218,14 @@ def generate_pdf_report(report_id: int, lang: str = None) -> Optional[bytes]:
 
         # Final interpretation
         story.append(Paragraph(t('final_interpretation'), section_style))
-        final_summary = row['final_summary']
-        final_color = colors.HexColor('#27ae60') if 'NEGATIVE' in str(final_summary).upper() else (
-            colors.HexColor('#e74c3c') if 'POSITIVE' in str(final_summary).upper() else colors.HexColor('#f39c12'))
+        final_summary = fold_result(row['final_summary'])
+        final_color = colors.HexColor('#27ae60') if 'NEGATIVE' in final_summary.upper else (
+            colors.HexColor('#e74c3c') if 'POSITIVE' in final_summary.upper else colors.HexColor('#f39c12'))
 
         final_cell_style = ParagraphStyle('FinalCell', parent=styles['Normal'], fontSize=12,
                                           leading=14, alignment=TA_CENTER, textColor=colors.whitesmoke,
                                           fontName='Helvetica-Bold')
-        final_box = Table([[Paragraph(str(final_summary), final_cell_style)]], colWidths=[6.5*inch])
+        final_box = Table([[Paragraph(final_summary.text, final_cell_style)]], colWidths=[6.5*inch])
         final_box.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (0, 0), final_color),
             ('BOTTOMPADDING', (0, 0), (0, 0), 10),
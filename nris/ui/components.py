@@ -26,6 +26,7 @@ except ImportError:
     st = None  # type: ignore
 
 from ..analysis.qc import get_reportable_status
+from ..database import decode_json_column
 
 
 def escape_html(val: Any) -> str:
@@ -48,11 +49,12 @@ def escape_html(val: Any) -> str:
     return html_module.escape(str(val))
 
 
-def parse_z_scores(full_z: Union[str, Dict, None]) -> Dict[str, Any]:
+def parse_z_scores(full_z: Union[str, bytes, Dict, None]) -> Dict[str, Any]:
     """Parse Z-score data from various formats.
 
     Args:
-        full_z: Z-score data as JSON string, dict, or None.
+        full_z: Z-score data as JSON string, compressed column value
+            (see nris.database.COMPRESS_RESULT_JSON), dict, or None.
 
     Returns:
         Dictionary with Z-scores, empty dict if parsing fails.
@@ -77,6 +79,13 @@ def parse_z_scores(full_z: Union[str, Dict, None]) -> Dict[str, Any]:
         except (json.JSONDecodeError, ValueError, TypeError):
             return {}
 
+    if isinstance(full_z, bytes):
+        try:
+            decoded: Dict[str, Any] = decode_json_column(full_z, {})
+            return decoded
+        except Exception:
+            return {}
+
     return {}
 
 
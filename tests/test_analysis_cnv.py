@@ -85,3 +85,9 @@ class TestAnalyzeCNV:
         """Result should include ratio value when positive."""
         result, threshold, risk = analyze_cnv(size=12.0, ratio=7.5, test_number=2, config=config)
         assert "7.5%" in result or "7.5" in result
+
+    def test_bands_close_on_documented_sides(self):
+        """Should put 10 in the top band but 7 and 3.5 in the lower ones."""
+        expected = {10.0: 6.0, 9.99: 8.0, 7.01: 8.0, 7.0: 10.0, 3.51: 10.0, 3.5: 12.0}
+        for size, threshold in expected.items():
+            assert analyze_cnv(size=size, ratio=1.0, config=None)[1] == threshold
@@ -3,7 +3,9 @@ Unit tests for QC (Quality Control) analysis functions.
 """
 
 import pytest
-from nris.analysis.qc import validate_inputs, check_qc_metrics, get_reportable_status
+from nris.analysis.qc import (
+    validate_inputs, validate_inputs_batch, min_reads_batch, check_qc_metrics, get_reportable_status, fold_result
+)
 from nris.config import DEFAULT_CONFIG
 
 
@@ -65,6 +67,47 @@ class TestValidateInputs:
         assert len(errors) == 4
 
 
+class TestValidateInputsBatch:
+    """Test cases for validate_inputs_batch function."""
+
+    def test_matches_scalar_validation(self):
+        """Each row should flag the same checks as validate_inputs."""
+        import pandas as pd
+        df = pd.DataFrame({
+            'reads': [10.0, -1.0, 150.0, 10.0],
+            'cff': [8.0, -1.0, 8.0, 55.0],
+            'gc': [40.0, -1.0, 40.0, 40.0],
+            'age': [30, 10, 30, 65],
+        })
+        issues = validate_inputs_batch(df)
+
+        assert issues.shape == (4, 4)
+        for i, row in df.iterrows():
+            errors = validate_inputs(row['reads'], row['cff'], row['gc'], row['age'])
+            assert int(issues[i].sum()) == len(errors)
+
+    def test_all_valid(self):
+        """Valid rows should have no flagged issues."""
+        issues = validate_inputs_batch({
+            'reads': [10.0, 20.0], 'cff': [8.0, 9.0], 'gc': [40.0, 41.0], 'age': [30, 40]
+        })
+        assert not issues.any()
+
+
+class TestMinReadsBatch:
+    """Test cases for min_reads_batch function."""
+
+    def test_matches_panel_limits(self):
+        """Each entry should get its panel's limit, unknown panels the default."""
+        panels = ["NIPT Pro", "NIPT Basic", "Unknown", "NIPT Pro", "NIPT Plus"]
+        limits = min_reads_batch(DEFAULT_CONFIG, panels)
+        assert limits.tolist() == [20.0, 5.0, 5.0, 20.0, 12.0]
+
+    def test_empty(self):
+        """No panels should give an empty array."""
+        assert min_reads_batch(DEFAULT_CONFIG, []).shape == (0,)
+
+
 class TestCheckQCMetrics:
     """Test cases for check_qc_metrics function."""
 
@@ -225,3 +268,14 @@ class TestGetReportableStatus:
         """INVALID with override should be reportable."""
         status, reason = get_reportable_status("INVALID (Cff < 3.5%)", "PASS", True)
         assert status == "Yes"
+
+    def test_folded_result_matches_raw_text(self):
+        """A pre-folded ResultText should classify the same as the raw string."""
+        for text in ["POSITIVE", "Low Risk", "High Risk -> Re-library", "Ambiguous -> Resample"]:
+            assert get_reportable_status(fold_result(text)) == get_reportable_status(text)
+
+    def test_fold_result_is_idempotent(self):
+        """Folding an already folded result should return it unchanged."""
+        folded = fold_result("Low Risk")
+        assert folded.upper == "LOW RISK"
+        assert fold_result(folded) is folded
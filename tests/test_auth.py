@@ -2,13 +2,19 @@
 Unit tests for authentication functions.
 """
 
+import hashlib
+import sqlite3
 import pytest
 from datetime import datetime, timedelta
 from nris.auth import (
     hash_password,
+    verify_legacy_password,
     verify_password,
+    verify_stored_password,
     validate_password_strength,
+    authenticate_user,
     check_session_timeout,
+    MAX_LOGIN_ATTEMPTS,
     SESSION_TIMEOUT_MINUTES
 )
 
@@ -17,20 +23,19 @@ class TestHashPassword:
     """Test cases for password hashing."""
 
     def test_hash_creates_salt_and_hash(self):
-        """Hash should contain salt and hash separated by $."""
-        hashed = hash_password("test123")
-        parts = hashed.split('$')
-        assert len(parts) == 2
-        assert len(parts[0]) == 32  # Salt is 16 bytes = 32 hex chars
-        assert len(parts[1]) == 64  # SHA256 is 64 hex chars
+        """Hash should return raw salt and digest bytes."""
+        salt, digest = hash_password("test123")
+        assert isinstance(salt, bytes) and isinstance(digest, bytes)
+        assert len(salt) == 16
+        assert len(digest) == 32  # SHA256 digest is 32 bytes
 
     def test_hash_is_deterministic_with_same_salt(self):
         """Same password with same salt should produce same hash."""
         # We can't directly test this since salt is random,
         # but we can verify through verify_password
         password = "mypassword123"
-        hashed = hash_password(password)
-        assert verify_password(password, hashed)
+        salt, digest = hash_password(password)
+        assert verify_password(password, salt, digest)
 
     def test_different_passwords_different_hashes(self):
         """Different passwords should produce different hashes."""
@@ -53,33 +58,52 @@ class TestVerifyPassword:
     def test_correct_password_verifies(self):
         """Correct password should verify successfully."""
         password = "correctpassword"
-        hashed = hash_password(password)
-        assert verify_password(password, hashed) is True
+        salt, digest = hash_password(password)
+        assert verify_password(password, salt, digest) is True
 
     def test_wrong_password_fails(self):
         """Wrong password should fail verification."""
         password = "correctpassword"
-        hashed = hash_password(password)
-        assert verify_password("wrongpassword", hashed) is False
+        salt, digest = hash_password(password)
+        assert verify_password("wrongpassword", salt, digest) is False
 
     def test_empty_password_fails(self):
         """Empty password should fail verification."""
-        hashed = hash_password("somepassword")
-        assert verify_password("", hashed) is False
+        salt, digest = hash_password("somepassword")
+        assert verify_password("", salt, digest) is False
 
     def test_invalid_hash_format(self):
         """Invalid hash format should fail gracefully."""
-        assert verify_password("password", "invalid_hash") is False
-        assert verify_password("password", "") is False
-        assert verify_password("password", "no_dollar_sign") is False
+        assert verify_legacy_password("password", "invalid_hash") is False
+        assert verify_legacy_password("password", "") is False
+        assert verify_legacy_password("password", "no_dollar_sign") is False
+        assert verify_password("password", None, b"digest") is False  # type: ignore[arg-type]
+
+    def test_legacy_hex_hash_verifies(self):
+        """Legacy hex "salt$hash" strings should still verify."""
+        salt = "ab" * 16
+        legacy = f"{salt}${hashlib.sha256(('oldpass' + salt).encode()).hexdigest()}"
+        assert verify_legacy_password("oldpass", legacy) is True
+        assert verify_legacy_password("newpass", legacy) is False
+
+    def test_stored_password_picks_format(self):
+        """Should check a users row in whichever format it was stored."""
+        salt = "ab" * 16
+        legacy = f"{salt}${hashlib.sha256(('oldpass' + salt).encode()).hexdigest()}"
+        assert verify_stored_password("oldpass", None, legacy) is True
+        assert verify_stored_password("oldpass", None, b"not a legacy hash") is False
+
+        salt_bytes, digest = hash_password("newpass")
+        assert verify_stored_password("newpass", salt_bytes, digest) is True
+        assert verify_stored_password("newpass", salt_bytes, legacy) is False
 
     def test_case_sensitive(self):
         """Password verification should be case-sensitive."""
         password = "CaseSensitive"
-        hashed = hash_password(password)
-        assert verify_password(password, hashed) is True
-        assert verify_password("casesensitive", hashed) is False
-        assert verify_password("CASESENSITIVE", hashed) is False
+        salt, digest = hash_password(password)
+        assert verify_password(password, salt, digest) is True
+        assert verify_password("casesensitive", salt, digest) is False
+        assert verify_password("CASESENSITIVE", salt, digest) is False
 
 
 class TestValidatePasswordStrength:
@@ -131,6 +155,101 @@ class TestValidatePasswordStrength:
         assert is_valid is True
 
 
+class TestAuthenticateUser:
+    """Test cases for user authentication and lockout."""
+
+    @pytest.fixture
+    def user_db(self, tmp_path):
+        """Create a users table with a single test user."""
+        db_file = str(tmp_path / "auth.db")
+        conn = sqlite3.connect(db_file)
+        conn.execute("""
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY, username TEXT, password_hash BLOB,
+                password_salt BLOB, full_name TEXT, role TEXT, last_login TEXT,
+                must_change_password INTEGER DEFAULT 0,
+                failed_login_attempts INTEGER DEFAULT 0, locked_until TEXT
+            )
+        """)
+        salt, digest = hash_password("Secret123")
+        conn.execute(
+            "INSERT INTO users (username, password_salt, password_hash, full_name, role) VALUES (?, ?, ?, ?, ?)",
+            ("alice", salt, digest, "Alice", "admin")
+        )
+        conn.commit()
+        conn.close()
+        return db_file
+
+    def _login(self, db_file, password):
+        return authenticate_user("alice", password, lambda: sqlite3.connect(db_file),
+                                 lambda *args: None)
+
+    def _user_row(self, db_file):
+        conn = sqlite3.connect(db_file)
+        row = conn.execute(
+            "SELECT failed_login_attempts, locked_until, last_login FROM users WHERE username = 'alice'"
+        ).fetchone()
+        conn.close()
+        return row
+
+    def test_successful_login(self, user_db):
+        """Correct password should return the user and record last_login."""
+        user = self._login(user_db, "Secret123")
+        assert user['username'] == "alice"
+        attempts, locked_until, last_login = self._user_row(user_db)
+        assert attempts == 0
+        assert locked_until is None
+        assert last_login is not None
+
+    def test_failed_login_increments_attempts(self, user_db):
+        """Wrong password should count the attempt and keep last_login."""
+        assert self._login(user_db, "wrong") is None
+        attempts, locked_until, last_login = self._user_row(user_db)
+        assert attempts == 1
+        assert locked_until is None
+        assert last_login is None
+
+    def test_lockout_after_max_attempts(self, user_db):
+        """Account should lock after MAX_LOGIN_ATTEMPTS failures."""
+        for _ in range(MAX_LOGIN_ATTEMPTS):
+            self._login(user_db, "wrong")
+        assert self._user_row(user_db)[1] is not None
+        result = self._login(user_db, "Secret123")
+        assert 'error' in result
+
+    def test_expired_lock_resets_on_success(self, user_db):
+        """An expired lock should be cleared by a successful login."""
+        conn = sqlite3.connect(user_db)
+        conn.execute("UPDATE users SET failed_login_attempts = ?, locked_until = ?",
+                     (MAX_LOGIN_ATTEMPTS, (datetime.now() - timedelta(minutes=1)).isoformat()))
+        conn.commit()
+        conn.close()
+
+        user = self._login(user_db, "Secret123")
+        assert user['username'] == "alice"
+        attempts, locked_until, _ = self._user_row(user_db)
+        assert attempts == 0
+        assert locked_until is None
+
+    def test_legacy_hash_upgraded_on_login(self, user_db):
+        """A legacy hex hash should be rewritten as raw bytes after login."""
+        salt = "cd" * 16
+        legacy = f"{salt}${hashlib.sha256(('Secret123' + salt).encode()).hexdigest()}"
+        conn = sqlite3.connect(user_db)
+        conn.execute("UPDATE users SET password_salt = NULL, password_hash = ?", (legacy,))
+        conn.commit()
+        conn.close()
+
+        assert self._login(user_db, "Secret123")['username'] == "alice"
+        conn = sqlite3.connect(user_db)
+        new_salt, new_digest = conn.execute(
+            "SELECT password_salt, password_hash FROM users WHERE username = 'alice'"
+        ).fetchone()
+        conn.close()
+        assert verify_password("Secret123", new_salt, new_digest)
+        assert self._login(user_db, "Secret123")['username'] == "alice"
+
+
 class TestCheckSessionTimeout:
     """Test cases for session timeout checking."""
 
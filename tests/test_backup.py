@@ -3,6 +3,8 @@ Unit tests for backup module.
 """
 
 import os
+import hashlib
+import logging
 import sqlite3
 import tempfile
 import pytest
@@ -12,6 +14,9 @@ from unittest.mock import patch, MagicMock
 from nris.backup import (
     ensure_backup_dir,
     create_backup,
+    create_backup_async,
+    wait_for_backup,
+    get_backup_status,
     rotate_backups,
     list_backups,
     restore_backup,
@@ -20,7 +25,16 @@ from nris.backup import (
     get_backup_stats,
     BackupError,
     RestoreError,
+    BACKUP_CHECKSUM_SUFFIX,
 )
+from nris.backup import _clone_file, _snapshot_for_restore
+
+
+@pytest.fixture(autouse=True)
+def uncompressed_backups():
+    """Write plain .db backups unless a test opts into compression."""
+    with patch('nris.backup.zstandard', None):
+        yield
 
 
 @pytest.fixture
@@ -49,6 +63,11 @@ def test_database(temp_db_dir):
     return db_file
 
 
+def _windows_fsync(fd):
+    """fsync that, like Windows' FlushFileBuffers, needs a writable handle."""
+    os.write(fd, b"")
+
+
 class TestEnsureBackupDir:
     """Test cases for ensure_backup_dir function."""
 
@@ -82,6 +101,16 @@ class TestCreateBackup:
             assert "nris_backup_" in result
             assert "_test.db" in result
 
+    def test_fsync_uses_writable_handle(self, temp_db_dir, test_database):
+        """Should not fail where fsync needs write access."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']), \
+             patch('nris.backup.os.fsync', side_effect=_windows_fsync) as fsync:
+            result = create_backup("test")
+
+        assert result is not None
+        fsync.assert_called()
+
     def test_returns_none_if_no_database(self, temp_db_dir):
         """Should return None if database doesn't exist."""
         nonexistent = temp_db_dir['tmp_path'] / "nonexistent.db"
@@ -106,6 +135,99 @@ class TestCreateBackup:
             assert result is not None
             assert result[0] == "test_value"
 
+    def test_writes_checksum_sidecar(self, temp_db_dir, test_database):
+        """Should record the backup's blake2b digest next to it."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']):
+            backup_path = create_backup("test")
+            listed = list_backups()
+
+        expected = hashlib.blake2b(Path(backup_path).read_bytes()).hexdigest()
+        assert Path(backup_path + BACKUP_CHECKSUM_SUFFIX).read_text() == expected
+        assert listed[0]['checksum'] == expected
+
+    @pytest.mark.skipif(not hasattr(os, 'posix_fadvise'), reason="posix_fadvise unavailable")
+    def test_drops_backup_from_page_cache(self, temp_db_dir, test_database):
+        """Should advise the kernel to drop the finished backup's pages."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']), \
+             patch('os.posix_fadvise') as fadvise:
+            create_backup("test")
+
+        fadvise.assert_called_once()
+        assert fadvise.call_args[0][1:] == (0, 0, os.POSIX_FADV_DONTNEED)
+
+    def test_failed_backup_leaves_no_file(self, temp_db_dir, test_database):
+        """A backup that fails mid-write should leave neither file behind."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']), \
+             patch('nris.backup.os.replace', side_effect=OSError("disk full")):
+            assert create_backup("test") is None
+
+        assert list(Path(temp_db_dir['backup_dir']).iterdir()) == []
+
+    def test_unchanged_database_clones_previous_backup(self, temp_db_dir, test_database):
+        """An unchanged database should reuse the previous backup's bytes."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']):
+            first = create_backup("first")
+            with patch('nris.backup._pooled_connection') as export:
+                second = create_backup("second")
+            export.assert_not_called()
+            assert second != first
+            assert not os.path.samefile(first, second)
+            assert Path(first).read_bytes() == Path(second).read_bytes()
+            assert list_backups()[0]['checksum'] == list_backups()[1]['checksum']
+
+            conn = sqlite3.connect(test_database)
+            conn.execute("INSERT INTO test (name) VALUES ('new')")
+            conn.commit()
+            conn.close()
+
+            third = create_backup("third")
+            assert not os.path.samefile(second, third)
+            conn = sqlite3.connect(third)
+            assert conn.execute("SELECT COUNT(*) FROM test").fetchone()[0] == 2
+            conn.close()
+
+    def test_rotation_keeps_newest_unchanged_backups(self, temp_db_dir, test_database):
+        """Reused backups should still rotate out oldest first."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']), \
+             patch('nris.backup.MAX_BACKUPS', 2):
+            paths = [create_backup(f"r{i}") for i in range(3)]
+            listed = [b['path'] for b in list_backups()]
+
+        assert os.path.exists(paths[2])
+        assert not os.path.exists(paths[0])
+        assert listed == [paths[2], paths[1]]
+
+    def test_backup_api_fallback(self, temp_db_dir, test_database):
+        """Should fall back to the backup API without VACUUM INTO."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']), \
+             patch('nris.backup._HAS_VACUUM_INTO', False):
+            backup_path = create_backup("test")
+
+        conn = sqlite3.connect(backup_path)
+        assert conn.execute("SELECT name FROM test WHERE id = 1").fetchone()[0] == "test_value"
+        conn.close()
+
+    def test_same_name_overwritten(self, temp_db_dir, test_database):
+        """A backup created twice within one second should overwrite."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']):
+            first = create_backup("test")
+            Path(first).write_bytes(b"stale")
+            with patch('nris.backup.datetime') as mock_dt:
+                mock_dt.now.return_value.strftime.return_value = Path(first).name[12:27]
+                second = create_backup("test")
+
+        assert second == first
+        conn = sqlite3.connect(second)
+        assert conn.execute("SELECT name FROM test WHERE id = 1").fetchone()[0] == "test_value"
+        conn.close()
+
     def test_different_reasons(self, temp_db_dir, test_database):
         """Should include reason in filename."""
         with patch('nris.backup.DB_FILE', test_database), \
@@ -115,6 +237,29 @@ class TestCreateBackup:
                 assert f"_{reason}.db" in result
 
 
+class TestCreateBackupAsync:
+    """Test cases for queued backups."""
+
+    def test_async_backup_completes(self, temp_db_dir, test_database):
+        """Queued backup should resolve to the backup path."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']):
+            future = create_backup_async("test")
+            path = wait_for_backup(future, timeout=30)
+
+            assert path is not None and os.path.exists(path)
+            assert get_backup_status(future) == {'state': 'completed', 'path': path}
+
+    def test_async_backup_failure(self, temp_db_dir):
+        """Missing database should report a failed backup."""
+        nonexistent = temp_db_dir['tmp_path'] / "nonexistent.db"
+        with patch('nris.backup.DB_FILE', str(nonexistent)), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']):
+            future = create_backup_async("test")
+            assert wait_for_backup(future, timeout=30) is None
+            assert get_backup_status(future)['state'] == 'failed'
+
+
 class TestRotateBackups:
     """Test cases for rotate_backups function."""
 
@@ -134,6 +279,52 @@ class TestRotateBackups:
             assert len(remaining) == 10
             assert deleted == 5
 
+    def test_removes_checksum_sidecars(self, temp_db_dir):
+        """Deleting an old backup should also delete its checksum file."""
+        backup_dir = Path(temp_db_dir['backup_dir'])
+        for i in range(3):
+            name = f"nris_backup_2024010{i}_000000_test.db"
+            (backup_dir / name).touch()
+            (backup_dir / (name + BACKUP_CHECKSUM_SUFFIX)).write_text("x")
+            os.utime(backup_dir / name, (i, i))
+
+        with patch('nris.backup.BACKUP_DIR', str(backup_dir)), \
+             patch('nris.backup.MAX_BACKUPS', 2):
+            assert rotate_backups() == 1
+
+        assert not (backup_dir / f"nris_backup_20240100_000000_test.db{BACKUP_CHECKSUM_SUFFIX}").exists()
+        assert len(list(backup_dir.glob(f"*{BACKUP_CHECKSUM_SUFFIX}"))) == 2
+
+    def test_single_log_record(self, temp_db_dir, caplog):
+        """Rotation should emit one debug record for all deleted files."""
+        backup_dir = Path(temp_db_dir['backup_dir'])
+        for i in range(13):
+            (backup_dir / f"nris_backup_2024010{i:02d}_000000_test.db").touch()
+
+        with patch('nris.backup.BACKUP_DIR', str(backup_dir)), \
+             patch('nris.backup.MAX_BACKUPS', 10), \
+             caplog.at_level(logging.DEBUG, logger='nris.backup'):
+            rotate_backups()
+
+        records = [r for r in caplog.records if r.name == 'nris.backup']
+        assert len(records) == 1
+        assert records[0].getMessage().startswith("Rotated 3 backups")
+
+    def test_few_deletions_serial(self, temp_db_dir):
+        """A couple of old backups should be deleted without a thread pool."""
+        backup_dir = Path(temp_db_dir['backup_dir'])
+        for i in range(12):
+            (backup_dir / f"nris_backup_2024010{i:02d}_000000_test.db").touch()
+
+        with patch('nris.backup.BACKUP_DIR', str(backup_dir)), \
+             patch('nris.backup.MAX_BACKUPS', 10), \
+             patch('nris.backup.ThreadPoolExecutor') as executor:
+            deleted = rotate_backups()
+            executor.assert_not_called()
+
+        assert deleted == 2
+        assert len(list(backup_dir.glob("nris_backup_*.db"))) == 10
+
     def test_does_nothing_under_limit(self, temp_db_dir):
         """Should not delete anything if under limit."""
         backup_dir = Path(temp_db_dir['backup_dir'])
@@ -179,6 +370,31 @@ class TestListBackups:
             backups = list_backups()
             assert backups == []
 
+    def test_listing_cached_until_dir_changes(self, temp_db_dir):
+        """Unchanged directory should reuse the cached listing."""
+        backup_dir = Path(temp_db_dir['backup_dir'])
+        (backup_dir / "nris_backup_20240101_000000_test.db").touch()
+
+        with patch('nris.backup.BACKUP_DIR', str(backup_dir)):
+            assert len(list_backups()) == 1
+            with patch('nris.backup._scan_backups') as scan:
+                assert len(list_backups()) == 1
+                scan.assert_not_called()
+
+            (backup_dir / "nris_backup_20240102_000000_test.db").touch()
+            assert len(list_backups()) == 2
+
+    def test_ignores_non_backup_files(self, temp_db_dir):
+        """Only nris_backup_*.db files should be listed."""
+        backup_dir = Path(temp_db_dir['backup_dir'])
+        (backup_dir / "nris_backup_20240101_000000_test.db").touch()
+        (backup_dir / "other.db").touch()
+        (backup_dir / "nris_backup_20240101_000000_test.txt").touch()
+
+        with patch('nris.backup.BACKUP_DIR', str(backup_dir)):
+            backups = list_backups()
+            assert [b['filename'] for b in backups] == ["nris_backup_20240101_000000_test.db"]
+
     def test_sorted_by_date(self, temp_db_dir):
         """Backups should be sorted newest first."""
         backup_dir = Path(temp_db_dir['backup_dir'])
@@ -231,6 +447,85 @@ class TestRestoreBackup:
 
             assert result[0] == "test_value"
 
+    def test_pre_restore_backup(self, temp_db_dir, test_database):
+        """Should snapshot the current database unless skip_pre_backup is set."""
+        backup_dir = temp_db_dir['backup_dir']
+
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', backup_dir):
+            backup_path = create_backup("test")
+
+            restore_backup(backup_path, skip_pre_backup=True)
+            assert not list(Path(backup_dir).glob("*_pre_restore.db"))
+
+            restore_backup(backup_path)
+            assert len(list(Path(backup_dir).glob("*_pre_restore.db"))) == 1
+
+    def test_compressed_round_trip(self, temp_db_dir, test_database):
+        """With zstandard installed, backups are compressed and restorable."""
+        zstandard = pytest.importorskip("zstandard")
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']), \
+             patch('nris.backup.zstandard', zstandard):
+            backup_path = create_backup("test")
+            assert backup_path.endswith(".db.zst")
+            assert list_backups()[0]['filename'].endswith(".db.zst")
+
+            conn = sqlite3.connect(test_database)
+            conn.execute("UPDATE test SET name = 'modified' WHERE id = 1")
+            conn.commit()
+            conn.close()
+
+            success, _ = restore_backup(backup_path, skip_pre_backup=True)
+
+        assert success is True
+        conn = sqlite3.connect(test_database)
+        assert conn.execute("SELECT name FROM test WHERE id = 1").fetchone()[0] == "test_value"
+        conn.close()
+
+    def test_compressed_backup_without_zstandard(self, temp_db_dir):
+        """A .db.zst backup should fail cleanly when zstandard is missing."""
+        zst_file = temp_db_dir['tmp_path'] / "nris_backup_20240101_000000_test.db.zst"
+        zst_file.write_bytes(b"\x28\xb5\x2f\xfd")
+
+        success, msg = restore_backup(str(zst_file))
+        assert success is False
+        assert "zstandard" in msg
+
+    def test_pre_restore_snapshot_includes_wal(self, temp_db_dir, test_database):
+        """Snapshot should include commits still held in the WAL file."""
+        conn = sqlite3.connect(test_database)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("INSERT INTO test (name) VALUES ('in_wal')")
+        conn.commit()
+
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']):
+            snapshot = _snapshot_for_restore()
+        conn.close()
+
+        assert snapshot.endswith("_pre_restore.db")
+        snap = sqlite3.connect(snapshot)
+        assert snap.execute("SELECT COUNT(*) FROM test WHERE name = 'in_wal'").fetchone()[0] == 1
+        snap.close()
+
+    def test_pre_restore_snapshot_fsync_uses_writable_handle(self, temp_db_dir, test_database):
+        """Snapshot should not fail where fsync needs write access."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']), \
+             patch('nris.backup.os.fsync', side_effect=_windows_fsync):
+            snapshot = _snapshot_for_restore()
+
+        assert snapshot is not None and snapshot.endswith("_pre_restore.db")
+
+    def test_clone_file_fallback(self, temp_db_dir, test_database):
+        """Without reflink or copy_file_range the clone should still be exact."""
+        dest = temp_db_dir['tmp_path'] / "clone.db"
+        with patch('nris.backup.fcntl', None), \
+             patch('os.copy_file_range', side_effect=OSError("unsupported"), create=True):
+            _clone_file(test_database, dest)
+        assert dest.read_bytes() == Path(test_database).read_bytes()
+
     def test_nonexistent_backup(self, temp_db_dir):
         """Should fail for nonexistent backup file."""
         success, msg = restore_backup("/nonexistent/backup.db")
@@ -257,6 +552,21 @@ class TestVerifyDatabaseIntegrity:
             assert is_ok is True
             assert "verified" in msg.lower()
 
+    def test_reuses_pooled_connection(self, temp_db_dir, test_database):
+        """Repeated checks should reuse one pooled connection."""
+        with patch('nris.backup.DB_FILE', test_database), \
+             patch('nris.backup.sqlite3.connect', wraps=sqlite3.connect) as connect:
+            assert verify_database_integrity()[0] is True
+            assert verify_database_integrity()[0] is True
+            assert connect.call_count == 1
+
+    def test_deep_check(self, temp_db_dir, test_database):
+        """deep=True should run the full integrity check."""
+        with patch('nris.backup.DB_FILE', test_database):
+            is_ok, msg = verify_database_integrity(deep=True)
+            assert is_ok is True
+            assert "verified" in msg.lower()
+
     def test_nonexistent_database(self, temp_db_dir):
         """Should return True for nonexistent database."""
         nonexistent = temp_db_dir['tmp_path'] / "nonexistent.db"
@@ -290,6 +600,10 @@ class TestStartupDataProtection:
             assert status['backup_path'] is not None
             assert len(status['warnings']) == 0
 
+            conn = sqlite3.connect(test_database)
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            conn.close()
+
     def test_without_database(self, temp_db_dir):
         """Should handle missing database gracefully."""
         nonexistent = temp_db_dir['tmp_path'] / "nonexistent.db"
@@ -324,6 +638,18 @@ class TestGetBackupStats:
             assert stats['oldest'] is not None
             assert stats['newest'] is not None
 
+    def test_total_from_exact_sizes(self, temp_db_dir):
+        """Total should be summed from byte sizes, not rounded per-file MB."""
+        backup_dir = Path(temp_db_dir['backup_dir'])
+        for i in range(4):
+            (backup_dir / f"nris_backup_2024010{i}_000000_test.db").write_bytes(b"x" * 4000)
+
+        with patch('nris.backup.BACKUP_DIR', str(backup_dir)):
+            stats = get_backup_stats()
+
+        # Each file rounds to 0.0 MB on its own
+        assert stats['total_size_mb'] == 0.02
+
     def test_empty_backup_dir(self, temp_db_dir):
         """Should return zeros for empty backup dir."""
         with patch('nris.backup.BACKUP_DIR', temp_db_dir['backup_dir']):
@@ -2,7 +2,10 @@
 Unit tests for cache module.
 """
 
+import sqlite3
+import threading
 import time
+from datetime import datetime
 import pytest
 from unittest.mock import patch
 
@@ -13,6 +16,7 @@ from nris.cache import (
     get_cache,
     cached,
     memoize,
+    CACHE_MMAP_SIZE,
 )
 
 
@@ -104,6 +108,110 @@ class TestLRUCache:
         assert cache.get('expired') is None
         assert cache.get('valid') == 'value'
 
+    def test_get_many_and_set_many(self):
+        """Should read and write several keys in one call."""
+        cache = LRUCache[int](maxsize=10)
+        cache.set_many({'a': 1, 'b': 2, 'none': None})
+
+        assert cache.get_many(['a', 'b', 'none', 'missing']) == {
+            'a': 1, 'b': 2, 'none': None
+        }
+
+    def test_delete_prefix(self):
+        """Should delete only keys in the prefix range."""
+        cache = LRUCache[int](maxsize=10)
+        for key in ['a:1', 'a:2', 'a', 'ab:1', 'b:1']:
+            cache.set(key, 1)
+
+        assert cache.delete_prefix('a:') == 2
+        assert list(cache._cache) == ['a', 'ab:1', 'b:1']  # LRU order kept
+        assert cache.get('a') == 1
+        assert cache.get('ab:1') == 1
+        assert cache.get('a:1') is None
+
+    def test_delete_prefix_after_evictions(self):
+        """Should only count keys still cached after evictions and deletes."""
+        cache = LRUCache[int](maxsize=2)
+        cache.set('p:1', 1)
+        cache.set('p:2', 2)
+        cache.set('q:1', 3)  # evicts p:1
+        cache.delete('p:2')
+
+        assert list(cache._cache) == ['q:1']
+        assert cache.delete_prefix('p:') == 0
+        assert cache.delete_prefix('q:') == 1
+
+    def test_overwrite_at_capacity_keeps_others(self):
+        """Should not evict another key when overwriting an existing one."""
+        cache = LRUCache[int](maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('b', 3)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') == 3
+
+    def test_cleanup_skips_overwritten_entries(self):
+        """Should not remove a key re-set with a longer TTL."""
+        cache = LRUCache[str]()
+        cache.set('key', 'old', ttl=1)
+        cache.set('key', 'new', ttl=60)
+
+        time.sleep(1.1)
+        assert cache.cleanup_expired() == 0
+        assert cache.get('key') == 'new'
+
+    def test_expiry_heap_stays_bounded(self):
+        """Should compact stale heap pairs from repeated overwrites."""
+        cache = LRUCache[int](maxsize=10, ttl=60)
+        for i in range(1000):
+            cache.set(f'k{i % 5}', i)
+
+        assert len(cache._expiry_heap) <= 2 * cache.maxsize + 1
+        assert cache.get('k4') == 999
+
+    def test_cleanup_preserves_lru_order(self):
+        """Should keep recency order of surviving entries after cleanup."""
+        cache = LRUCache[int](maxsize=3)
+        cache.set('a', 1)
+        cache.set('gone', 0, ttl=1)
+        cache.set('b', 2)
+        cache.get('a')  # b is now least recently used
+
+        time.sleep(1.1)
+        assert cache.cleanup_expired() == 1
+
+        cache.set('c', 3)
+        cache.set('d', 4)  # evicts b
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+
+    def test_concurrent_access(self):
+        """Lock-free reads should be safe alongside writers and cleanup."""
+        cache = LRUCache[int](maxsize=50)
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(2000):
+                    key = f"k{(i * n) % 80}"
+                    cache.set(key, i, ttl=1 if i % 3 == 0 else 0)
+                    cache.get(key)
+                    cache.get(f"k{i % 80}")
+                    if i % 100 == 0:
+                        cache.cleanup_expired()
+            except Exception as e:  # pragma: no cover - failure path
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(1, 5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        assert cache.stats()['size'] <= 50
+
     def test_stats(self):
         """Should return cache statistics."""
         cache = LRUCache[str](maxsize=100, ttl=300)
@@ -182,6 +290,227 @@ class TestDatabaseCache:
         retrieved = db_cache.get('complex')
         assert retrieved == data
 
+    def test_connection_reused_per_thread(self, db_cache):
+        """Should keep one connection per thread across operations."""
+        conn = db_cache._get_connection()
+        db_cache.set('key', 'value')
+        db_cache.get('key')
+        assert db_cache._get_connection() is conn
+
+        other = []
+        t = threading.Thread(target=lambda: other.append(db_cache._get_connection()))
+        t.start()
+        t.join()
+        assert other[0] is not conn
+
+    def test_exited_threads_connections_closed(self, db_cache):
+        """Should close each worker thread's connection when it exits."""
+        db_cache.set('key', 'value')
+        opened = []
+
+        def worker():
+            db_cache.get('key')
+            opened.append(db_cache._get_connection())
+
+        threads = [threading.Thread(target=worker) for _ in range(50)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(opened) == 50
+        assert len(db_cache._connections) == 1  # this thread's
+        with pytest.raises(sqlite3.ProgrammingError):
+            opened[0].execute("SELECT 1")
+
+    def test_visible_across_threads(self, db_cache):
+        """Writes in one thread should be visible from another thread."""
+        t = threading.Thread(target=lambda: db_cache.set('shared', 42))
+        t.start()
+        t.join()
+        assert db_cache.get('shared') == 42
+
+    def test_wal_and_connection_pragmas(self, db_cache):
+        """Should use WAL journaling and relaxed syncs on each connection."""
+        conn = db_cache._get_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA page_size").fetchone()[0] == 8192
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] == CACHE_MMAP_SIZE
+
+        other = []
+        t = threading.Thread(target=lambda: other.append(
+            db_cache._get_connection().execute("PRAGMA synchronous").fetchone()[0]
+        ))
+        t.start()
+        t.join()
+        assert other == [1]
+
+    def _rows_on_disk(self, db_cache):
+        with sqlite3.connect(db_cache.db_path) as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM {db_cache.table_name}"
+            ).fetchone()[0]
+
+    def test_flush_commits_buffered_writes(self, db_cache):
+        """Should batch buffered sets into one commit on flush."""
+        for i in range(10):
+            db_cache.set(f'k{i}', i)
+
+        assert db_cache.flush() == 10
+        assert self._rows_on_disk(db_cache) == 10
+        assert db_cache.flush() == 0
+
+    def test_write_behind_commits_in_background(self, db_cache):
+        """Should persist writes without an explicit flush."""
+        db_cache.set('key', 'value')
+        deadline = time.time() + 5
+        while self._rows_on_disk(db_cache) == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert self._rows_on_disk(db_cache) == 1
+
+    def test_delete_buffered_key(self, db_cache):
+        """Should delete keys that are still buffered."""
+        db_cache.set('key', 'value')
+        assert db_cache.delete('key') is True
+        assert db_cache.get('key') is None
+        assert self._rows_on_disk(db_cache) == 0
+
+    def test_set_non_serializable(self, db_cache):
+        """Should reject values that are not JSON serializable."""
+        assert db_cache.set('key', object()) is False
+        assert db_cache.get('key') is None
+
+    def test_reads_legacy_json_text_rows(self, db_cache):
+        """Should still read untagged JSON TEXT values from older rows."""
+        db_cache._get_connection().execute(
+            f"INSERT INTO {db_cache.table_name} VALUES (?, ?, ?, ?)",
+            ('legacy', '{"a": [1, 2]}', None, None)
+        )
+        assert db_cache.get('legacy') == {'a': [1, 2]}
+
+    def test_json_fallback_is_tagged(self, tmp_path):
+        """Should store a format-tagged JSON blob without msgpack."""
+        with patch('nris.cache.msgpack', None):
+            db_cache = DatabaseCache(str(tmp_path / "json_cache.db"))
+            assert db_cache.serializer == 'json'
+            db_cache.set('key', {'x': 1})
+            db_cache.flush()
+            assert db_cache.get('key') == {'x': 1}
+
+        stored = db_cache._get_connection().execute(
+            f"SELECT cache_value FROM {db_cache.table_name}"
+        ).fetchone()[0]
+        assert stored == b'\x00{"x": 1}'
+
+    def test_pickle_serializer(self, tmp_path):
+        """Should round-trip arbitrary objects with the pickle serializer."""
+        db_file = str(tmp_path / "pickle_cache.db")
+        db_cache = DatabaseCache(db_file, serializer='pickle')
+        value = {'when': datetime(2024, 1, 2), 'ids': {1, 2}, 'raw': b'\x00\xff'}
+        db_cache.set('key', value)
+        db_cache.flush()
+
+        assert DatabaseCache(db_file, serializer='pickle').get('key') == value
+
+    def test_pickle_values_ignored_without_opt_in(self, tmp_path):
+        """Should not unpickle values from a cache not using pickle."""
+        db_file = str(tmp_path / "pickle_cache.db")
+        writer = DatabaseCache(db_file, serializer='pickle')
+        writer.set('key', [1, 2])
+        writer.flush()
+
+        assert DatabaseCache(db_file, serializer='json').get('key') is None
+
+    def test_unknown_serializer(self, tmp_path):
+        """Should reject unknown serializer names."""
+        with pytest.raises(ValueError):
+            DatabaseCache(str(tmp_path / "c.db"), serializer='yaml')
+
+    def test_msgpack_round_trip(self, db_cache):
+        """Should store msgpack-tagged blobs when msgpack is installed."""
+        pytest.importorskip('msgpack')
+        db_cache.set('key', {'x': [1, 'two']})
+        db_cache.flush()
+
+        stored = db_cache._get_connection().execute(
+            f"SELECT cache_value FROM {db_cache.table_name}"
+        ).fetchone()[0]
+        assert stored[:1] == b'\x01'
+        assert db_cache.get('key') == {'x': [1, 'two']}
+
+    def test_msgpack_int_keys_round_trip(self, db_cache):
+        """Should read back dicts keyed by ints, like per-chromosome maps."""
+        pytest.importorskip('msgpack')
+        value = {'z_scores': {13: 0.4, 18: -1.2, 21: 2.5}}
+        db_cache.set('key', value)
+        db_cache.flush()
+
+        assert db_cache.get('key') == value
+
+    def test_upgrades_legacy_iso_timestamps(self, tmp_path):
+        """Should convert an old TEXT-timestamp table on startup."""
+        db_file = str(tmp_path / "legacy_cache.db")
+        conn = sqlite3.connect(db_file)
+        conn.execute("""
+            CREATE TABLE _analytics_cache (
+                cache_key TEXT PRIMARY KEY,
+                cache_value TEXT,
+                created_at TEXT,
+                expires_at TEXT
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO _analytics_cache VALUES (?, ?, ?, ?)",
+            [
+                ('live', '[1]', '2024-01-01T00:00:00', '2999-01-01T00:00:00'),
+                ('stale', '[2]', '2024-01-01T00:00:00', '2024-01-01T01:00:00'),
+            ]
+        )
+        conn.commit()
+        conn.close()
+
+        db_cache = DatabaseCache(db_file)
+        assert db_cache.get('live') == [1]
+        assert db_cache.get('stale') is None
+
+        types = {
+            row[1]: row[2] for row in db_cache._get_connection().execute(
+                "PRAGMA table_info(_analytics_cache)"
+            )
+        }
+        assert types['expires_at'] == 'REAL'
+
+    def test_get_many_and_set_many(self, db_cache):
+        """Should batch reads and writes across buffered and stored rows."""
+        assert db_cache.set_many({'a': 1, 'b': [2], 'bad': object()}) == 2
+        db_cache.flush()
+        db_cache.set('c', 3)  # still buffered
+        db_cache.set('old', 0, ttl=-1)
+
+        assert db_cache.get_many(['a', 'b', 'c', 'old', 'missing']) == {
+            'a': 1, 'b': [2], 'c': 3
+        }
+
+    def test_get_many_large_batch(self, db_cache):
+        """Should split lookups beyond SQLite's parameter limit."""
+        items = {f'k{i}': i for i in range(1200)}
+        db_cache.set_many(items)
+        db_cache.flush()
+
+        assert db_cache.get_many(items) == items
+
+    def test_close_reopens_on_next_use(self, db_cache):
+        """Should close all connections and reconnect lazily afterwards."""
+        db_cache.set('key', 'value')
+        conn = db_cache._get_connection()
+        db_cache.close()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        assert db_cache.get('key') == 'value'
+
 
 class TestCache:
     """Test cases for unified Cache class."""
@@ -223,6 +552,42 @@ class TestCache:
         # Should now be in memory
         assert cache.memory.get('db_only') == 'value'
 
+    def test_repeat_miss_skips_database(self, cache):
+        """Should not query the database again for a key that just missed."""
+        with patch.object(cache.db_cache, 'get', wraps=cache.db_cache.get) as db_get:
+            assert cache.get('absent') is None
+            assert cache.get('absent', default='d') == 'd'
+        assert db_get.call_count == 1
+
+    def test_set_clears_recorded_miss(self, cache):
+        """Should find a persisted value set after a recorded miss."""
+        assert cache.get('later') is None
+        cache.set('later', 'value', persist=True)
+        cache.memory.clear()
+
+        assert cache.get('later') == 'value'
+
+    def test_get_many_across_tiers(self, cache):
+        """Should combine L1 hits with one batched L2 lookup."""
+        cache.set('mem', 1)
+        cache.db_cache.set_many({'db': 2})
+
+        with patch.object(cache.db_cache, 'get_many',
+                          wraps=cache.db_cache.get_many) as db_get_many:
+            assert cache.get_many(['mem', 'db', 'absent']) == {'mem': 1, 'db': 2}
+            assert cache.get_many(['mem', 'db', 'absent']) == {'mem': 1, 'db': 2}
+
+        # Second call is served from L1 plus the recorded miss
+        assert db_get_many.call_count == 1
+        assert cache.memory.get('db') == 2
+
+    def test_set_many_persist(self, cache):
+        """Should store batches in both tiers when persisted."""
+        cache.set_many({'x': 1, 'y': 2}, persist=True)
+        cache.memory.clear()
+
+        assert cache.get_many(['x', 'y']) == {'x': 1, 'y': 2}
+
     def test_delete_from_all_tiers(self, cache):
         """Should delete from both tiers."""
         cache.set('key', 'value', persist=True)
@@ -243,6 +608,19 @@ class TestCache:
         assert cache.get('stats_2024_01') is None
         assert cache.get('other_key') == 'data3'
 
+    def test_invalidate_pattern_is_literal_prefix(self, cache):
+        """Should not treat '_' or case differences as matches in L2."""
+        cache.set('stats_1', 1, persist=True)
+        cache.set('statsX1', 2, persist=True)
+        cache.set('STATS_2', 3, persist=True)
+
+        assert cache.invalidate_pattern('stats_') == 2  # one per tier
+        cache.memory.clear()
+
+        assert cache.get('stats_1') is None
+        assert cache.get('statsX1') == 2
+        assert cache.get('STATS_2') == 3
+
     def test_clear_all_tiers(self, cache):
         """Should clear both memory and database cache."""
         cache.set('mem', 'value')
@@ -275,6 +653,14 @@ class TestCache:
 class TestCachedDecorator:
     """Test cases for @cached decorator."""
 
+    @pytest.fixture(autouse=True)
+    def shared_cache(self, tmp_path):
+        """Point the shared cache at a temp database, not the registry file."""
+        cache = Cache(db_path=str(tmp_path / "shared_cache.db"))
+        with patch('nris.cache._cache', cache):
+            yield cache
+        cache.db_cache.close()
+
     def test_caches_result(self):
         """Should cache function results."""
         call_count = 0
@@ -316,6 +702,36 @@ class TestCachedDecorator:
         # Next call should re-execute
         # (Would need to track call count to verify)
 
+    def test_invalidate_forces_recompute(self):
+        """Should re-execute the function after invalidate()."""
+        call_count = 0
+
+        @cached(ttl=60, key_prefix='test_invalidate_recompute')
+        def func(x):
+            nonlocal call_count
+            call_count += 1
+            return x
+
+        func(1)
+        func(1)
+        assert call_count == 1
+
+        func.invalidate()
+        func(1)
+        assert call_count == 2
+
+    def test_numerically_equal_args_cached_separately(self):
+        """Should not share entries between args like 1, 1.0 and True."""
+        @cached(ttl=60, key_prefix='test_equal_args')
+        def func(x):
+            return repr(x)
+
+        assert func(1) == '1'
+        assert func(1.0) == '1.0'
+        assert func(True) == 'True'
+        assert func(-1) == '-1'
+        assert func(-2) == '-2'
+
     def test_key_prefix(self):
         """Should use key prefix for cache key."""
         @cached(ttl=60, key_prefix='custom_prefix')
@@ -324,6 +740,76 @@ class TestCachedDecorator:
 
         func()  # This should work without error
 
+    def test_specialized_signature_shapes(self):
+        """Should honour defaults, keyword-only and positional-only params."""
+        calls = []
+        marker = []
+
+        @cached(ttl=60, key_prefix='test_signature_shapes')
+        def func(a, /, b=2, *, c=marker):
+            calls.append((a, b, c))
+            return (a, b, c is marker)
+
+        assert func(1) == (1, 2, True)
+        assert func(1, b=2) == (1, 2, True)  # same key as func(1)
+        assert func(1, 3, c=None) == (1, 3, False)
+        assert len(calls) == 2
+        assert func.__name__ == 'func'
+        assert func.__wrapped__ is not None
+
+        with pytest.raises(TypeError):
+            func(a=1)
+
+    def test_parameters_named_like_module_globals(self):
+        """Should not let parameters shadow names the wrapper relies on."""
+        @cached(ttl=60, key_prefix='test_shadowing')
+        def report(logger, get_cache, _key_digest=0, _invalidation_epoch=None):
+            return (logger, get_cache, _key_digest, _invalidation_epoch)
+
+        assert report('L', 1) == ('L', 1, 0, None)
+        assert report('L', 1) == ('L', 1, 0, None)
+        assert report(logger=object, get_cache=2, _key_digest=3) == (object, 2, 3, None)
+
+    def test_varargs_use_generic_wrapper(self):
+        """Should still cache functions taking *args and **kwargs."""
+        call_count = 0
+
+        @cached(ttl=60, key_prefix='test_varargs')
+        def func(*args, **kwargs):
+            nonlocal call_count
+            call_count += 1
+            return sum(args) + sum(kwargs.values())
+
+        assert func(1, 2, x=3) == 6
+        assert func(1, 2, x=3) == 6
+        assert call_count == 1
+
+    def test_repeat_call_served_locally(self):
+        """Should answer repeat calls without consulting the shared cache."""
+        @cached(ttl=60, key_prefix='test_l0_hit')
+        def func(x):
+            return x * 2
+
+        assert func(4) == 8
+        with patch('nris.cache.get_cache') as shared:
+            assert func(4) == 8
+        shared.assert_not_called()
+
+    def test_global_clear_bypasses_local_tier(self):
+        """Should recompute after the shared cache is cleared elsewhere."""
+        call_count = 0
+
+        @cached(ttl=60, key_prefix='test_l0_clear')
+        def func():
+            nonlocal call_count
+            call_count += 1
+            return call_count
+
+        assert func() == 1
+        assert func() == 1
+        get_cache().clear()
+        assert func() == 2
+
 
 class TestMemoize:
     """Test cases for @memoize decorator."""
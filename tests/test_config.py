@@ -0,0 +1,218 @@
+"""
+Unit tests for config module.
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+
+from nris import config as config_module
+from nris.config import (
+    DEFAULT_CONFIG,
+    NRISConfig,
+    TRANSLATIONS_DIR,
+    default_config,
+    get_translation,
+    get_translator,
+    load_config,
+    save_config,
+    invalidate_config_cache,
+    reload_config,
+)
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    """Point CONFIG_FILE at a temp path and start with an empty cache."""
+    path = tmp_path / "nris_config.json"
+    monkeypatch.setattr(config_module, 'CONFIG_FILE', str(path))
+    invalidate_config_cache()
+    yield path
+    invalidate_config_cache()
+
+
+class TestLoadConfig:
+    """Test cases for config loading and caching."""
+
+    def test_missing_file_returns_defaults(self, config_file):
+        """Should fall back to defaults when no config file exists."""
+        assert load_config() == default_config()
+
+    def test_reuses_parsed_config(self, config_file):
+        """Should not re-parse an unchanged file."""
+        config_file.write_text(json.dumps({'REPORT_LANGUAGE': 'fr'}))
+        first = load_config()
+
+        with patch('nris.config._loads') as parse:
+            assert load_config() is first
+        parse.assert_not_called()
+
+    def test_reloads_after_file_changes(self, config_file):
+        """Should pick up edits made to the file."""
+        config_file.write_text(json.dumps({'REPORT_LANGUAGE': 'fr'}))
+        assert load_config()['REPORT_LANGUAGE'] == 'fr'
+
+        config_file.write_text(json.dumps({'REPORT_LANGUAGE': 'en', 'X': 1}))
+        assert load_config()['REPORT_LANGUAGE'] == 'en'
+
+    def test_reload_forces_parse(self, config_file):
+        """Should re-read the file even when it looks unchanged."""
+        config_file.write_text(json.dumps({'REPORT_LANGUAGE': 'fr'}))
+        first = load_config()
+
+        reloaded = reload_config()
+        assert reloaded is not first
+        assert reloaded == first
+
+    def test_partial_file_merged_over_defaults(self, config_file):
+        """Should fill keys missing from the file with their defaults."""
+        config_file.write_text(json.dumps({
+            'REPORT_LANGUAGE': 'fr',
+            'QC_THRESHOLDS': {'MIN_CFF': 4.0, 'GC_RANGE': [36.0, 45.0]},
+        }))
+        config = load_config()
+
+        expected = default_config()
+        expected['REPORT_LANGUAGE'] = 'fr'
+        expected['QC_THRESHOLDS']['MIN_CFF'] = 4.0
+        expected['QC_THRESHOLDS']['GC_RANGE'] = [36.0, 45.0]
+        assert config == expected
+
+    def test_string_test_numbers_override_defaults(self, config_file):
+        """Should apply '1' from JSON to the default int key 1."""
+        config_file.write_text(json.dumps({
+            'TEST_SPECIFIC_THRESHOLDS': {'RAT': {'1': {'low': 5.0}}},
+        }))
+        rat = load_config()['TEST_SPECIFIC_THRESHOLDS']['RAT']
+
+        assert set(rat) == {1, 2, 3}
+        assert rat[1] == {'low': 5.0, 'positive': 8.0}
+        assert rat[2] == {'low': 4.5, 'positive': 8.0}
+
+    def test_save_updates_cache(self, config_file):
+        """Should serve the saved config without re-reading the file."""
+        assert save_config({'DEFAULT_SORT': 'name', 'T': {1: 2}}) is True
+
+        with patch('nris.config._loads') as parse:
+            loaded = load_config()
+        parse.assert_not_called()
+        # Matches what a fresh load of the file would give
+        invalidate_config_cache()
+        assert loaded == load_config()
+        assert loaded['DEFAULT_SORT'] == 'name'
+        assert loaded['T'] == {'1': 2}
+        assert loaded['QC_THRESHOLDS'] == default_config()['QC_THRESHOLDS']
+
+    def test_saved_file_is_indented_json(self, config_file):
+        """Should write JSON a fresh json.load can read back."""
+        assert save_config({'DEFAULT_SORT': 'name', 'T': {1: 2}}) is True
+        text = config_file.read_text()
+
+        assert json.loads(text) == {'DEFAULT_SORT': 'name', 'T': {'1': 2}}
+        assert text.startswith('{\n  "DEFAULT_SORT"')
+
+    def test_failed_save_keeps_previous_file(self, config_file):
+        """Should leave the old config in place when writing fails."""
+        assert save_config({'REPORT_LANGUAGE': 'fr'}) is True
+
+        with patch('nris.config.os.replace', side_effect=OSError):
+            assert save_config({'REPORT_LANGUAGE': 'en'}) is False
+
+        assert json.loads(config_file.read_text()) == {'REPORT_LANGUAGE': 'fr'}
+        assert not (config_file.parent / (config_file.name + '.tmp')).exists()
+        assert load_config()['REPORT_LANGUAGE'] == 'fr'
+
+    def test_invalid_file_returns_defaults(self, config_file):
+        """Should fall back to defaults when the file is not valid JSON."""
+        config_file.write_text("{not json")
+        assert load_config() == default_config()
+
+
+class TestDefaultConfig:
+    """Test cases for the frozen default configuration."""
+
+    def test_defaults_are_read_only(self):
+        """Should reject writes at any nesting level."""
+        with pytest.raises(TypeError):
+            DEFAULT_CONFIG['REPORT_LANGUAGE'] = 'fr'
+        with pytest.raises(TypeError):
+            DEFAULT_CONFIG['QC_THRESHOLDS']['MIN_CFF'] = 0
+        with pytest.raises(TypeError):
+            DEFAULT_CONFIG['TEST_SPECIFIC_THRESHOLDS']['RAT'][1]['low'] = 0
+
+    def test_default_config_is_independent_copy(self):
+        """Should hand out plain mutable dicts that don't share state."""
+        first = default_config()
+        first['QC_THRESHOLDS']['GC_RANGE'].append(99.0)
+
+        second = default_config()
+        assert second['QC_THRESHOLDS']['GC_RANGE'] == [37.0, 44.0]
+        json.dumps(second)  # plain dicts and lists serialize
+
+    def test_typed_dict_matches_defaults(self):
+        """Should declare exactly the top-level keys the defaults have."""
+        assert set(NRISConfig.__annotations__) == set(DEFAULT_CONFIG)
+
+    def test_load_fallback_is_mutable(self, config_file):
+        """Should return defaults that can be edited and saved."""
+        config = load_config()
+        config['REPORT_LANGUAGE'] = 'fr'
+        assert save_config(config) is True
+
+
+def _table(lang):
+    with open(TRANSLATIONS_DIR / f"{lang}.json", encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TestGetTranslation:
+    """Test cases for translation lookup."""
+
+    def test_translates_known_key(self):
+        """Should return the text for the requested language."""
+        assert get_translation('report_title', 'en') == _table('en')['report_title']
+        assert get_translation('report_title', 'fr') == _table('fr')['report_title']
+
+    def test_unknown_language_falls_back_to_english(self):
+        """Should use English for languages without a table."""
+        assert get_translation('report_title', 'de') == _table('en')['report_title']
+
+    def test_unknown_language_shares_english_table(self):
+        """Should not copy the English table for languages without one."""
+        assert config_module._load_lang('de') is config_module._load_lang('en')
+        assert config_module._load_lang('fr') is not config_module._load_lang('en')
+
+    def test_unknown_key_returns_key(self):
+        """Should return the key itself when no language has it."""
+        assert get_translation('no_such_key', 'fr') == 'no_such_key'
+
+    def test_languages_share_keys(self):
+        """Should ship the same keys for every language."""
+        assert _table('fr').keys() == _table('en').keys()
+
+    def test_language_code_cannot_escape_directory(self):
+        """Should treat path-like language codes as unknown."""
+        assert get_translation('report_title', '../en') == _table('en')['report_title']
+
+    def test_repeated_lookup_is_memoized(self):
+        """Should answer a repeated (key, lang) pair from the cache."""
+        get_translation('report_title', 'fr')
+        hits = get_translation.cache_info().hits
+        get_translation('report_title', 'fr')
+        assert get_translation.cache_info().hits == hits + 1
+
+    def test_translator_matches_get_translation(self):
+        """Should give the same results as get_translation for a language."""
+        keys = set(_table('en')) | {'no_such_key'}
+        for lang in ('en', 'fr', 'de'):
+            t = get_translator(lang)
+            for key in keys:
+                assert t(key) == get_translation(key, lang)
+
+    def test_identical_text_shared_across_languages(self):
+        """Should intern text so languages share identical strings."""
+        en, fr = _table('en'), _table('fr')
+        shared = [k for k in en if en[k] == fr[k]]
+        assert shared
+        for key in shared:
+            assert get_translation(key, 'en') is get_translation(key, 'fr')
@@ -2,17 +2,23 @@
 Integration tests for database module.
 """
 
+import json
+import math
 import os
 import sqlite3
 import tempfile
+import threading
+import time
 import pytest
 from datetime import datetime
 from unittest.mock import patch
 
+from nris import database
 from nris.database import (
     get_db_connection,
     init_database,
     log_audit,
+    flush_audit,
     get_patient_details,
     get_result_details,
     check_duplicate_patient,
@@ -135,6 +141,79 @@ class TestInitDatabase:
 
             conn.close()
 
+    def test_missing_column_skips_only_its_index(self, tmp_path):
+        """Should still create the other indexes on a legacy table."""
+        db_file = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(db_file)
+        conn.execute("CREATE TABLE patients (id INTEGER PRIMARY KEY, mrn_id TEXT UNIQUE)")
+        conn.close()
+
+        with patch('nris.database.DB_FILE', db_file):
+            init_database()
+
+        conn = sqlite3.connect(db_file)
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        conn.close()
+
+        assert 'idx_patients_deleted' not in indexes
+        assert {'idx_patients_mrn', 'idx_results_qc_status', 'idx_users_username'} <= indexes
+
+
+class TestGetDbConnection:
+    """Test cases for pooled connections."""
+
+    def test_reuses_reader_connection(self, temp_db):
+        """Should hand the same reader back out after it is returned."""
+        with patch('nris.database.DB_FILE', temp_db):
+            with get_db_connection(readonly=True) as first:
+                pass
+            with get_db_connection(readonly=True) as second:
+                pass
+        assert first is second
+
+    def test_reader_rejects_writes(self, temp_db):
+        """Should not let read-only connections modify the database."""
+        with patch('nris.database.DB_FILE', temp_db):
+            with pytest.raises(sqlite3.OperationalError):
+                with get_db_connection(readonly=True) as conn:
+                    conn.execute("DELETE FROM users")
+
+    def test_writer_commits_on_exit(self, temp_db):
+        """Should commit a pending transaction when the block ends."""
+        with patch('nris.database.DB_FILE', temp_db):
+            with get_db_connection() as conn:
+                conn.execute("INSERT INTO audit_log (action) VALUES ('X')")
+                assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+                assert conn.execute("PRAGMA cache_size").fetchone()[0] == -database.CACHE_SIZE_KIB
+                assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
+        conn = sqlite3.connect(temp_db)
+        assert conn.execute("SELECT COUNT(*) FROM audit_log WHERE action = 'X'").fetchone()[0] == 1
+        conn.close()
+
+    def test_writer_rolls_back_on_error(self, temp_db):
+        """Should discard a pending transaction when the block raises."""
+        with patch('nris.database.DB_FILE', temp_db):
+            with pytest.raises(RuntimeError):
+                with get_db_connection() as conn:
+                    conn.execute("INSERT INTO audit_log (action) VALUES ('X')")
+                    raise RuntimeError
+
+        conn = sqlite3.connect(temp_db)
+        assert conn.execute("SELECT COUNT(*) FROM audit_log WHERE action = 'X'").fetchone()[0] == 0
+        conn.close()
+
+    def test_follows_db_file_changes(self, tmp_path):
+        """Should open new connections when DB_FILE points elsewhere."""
+        paths = []
+        for name in ("a.db", "b.db"):
+            db_file = str(tmp_path / name)
+            with patch('nris.database.DB_FILE', db_file):
+                init_database()
+                with get_db_connection(readonly=True) as conn:
+                    paths.append(conn.execute("PRAGMA database_list").fetchone()[2])
+        assert paths == [str(tmp_path / "a.db"), str(tmp_path / "b.db")]
+
 
 class TestLogAudit:
     """Test cases for audit logging."""
@@ -145,6 +224,7 @@ class TestLogAudit:
              patch('nris.config.DB_FILE', temp_db):
 
             log_audit("TEST_ACTION", "Test details", user_id=1)
+            flush_audit()
 
             conn = sqlite3.connect(temp_db)
             cursor = conn.cursor()
@@ -162,6 +242,7 @@ class TestLogAudit:
              patch('nris.config.DB_FILE', temp_db):
 
             log_audit("TEST_ACTION", "Test details", user_id=None)
+            flush_audit()
 
             conn = sqlite3.connect(temp_db)
             cursor = conn.cursor()
@@ -178,6 +259,7 @@ class TestLogAudit:
 
             long_details = "x" * 2000
             log_audit("TEST_ACTION", long_details, user_id=1)
+            flush_audit()
 
             conn = sqlite3.connect(temp_db)
             cursor = conn.cursor()
@@ -187,6 +269,76 @@ class TestLogAudit:
 
             assert len(row[0]) <= 1000
 
+    def test_non_string_details_stored_as_text(self, temp_db):
+        """Should store the truncated str() of non-string details."""
+        with patch('nris.database.DB_FILE', temp_db):
+            log_audit("TEST_ACTION", {'ids': list(range(500))}, user_id=1)
+            flush_audit()
+
+        conn = sqlite3.connect(temp_db)
+        row = conn.execute("SELECT details FROM audit_log ORDER BY id DESC LIMIT 1").fetchone()
+        conn.close()
+
+        assert row[0] == str({'ids': list(range(500))})[:1000]
+
+    def test_timestamp_is_time_of_logging(self, temp_db):
+        """Should stamp entries with when they were logged, not flushed."""
+        with patch('nris.database.DB_FILE', temp_db):
+            before = datetime.now()
+            log_audit("STAMPED", "")
+            after = datetime.now()
+            time.sleep(0.05)
+            flush_audit()
+
+        conn = sqlite3.connect(temp_db)
+        row = conn.execute("SELECT timestamp, ip_address FROM audit_log WHERE action = 'STAMPED'").fetchone()
+        conn.close()
+
+        assert before <= datetime.fromisoformat(row[0]) <= after
+        assert row[1] == "local"
+
+    def test_flush_writes_batch(self, temp_db):
+        """Should write every buffered entry in one flush."""
+        with patch('nris.database.DB_FILE', temp_db):
+            for i in range(5):
+                log_audit("BULK", f"entry {i}")
+            assert flush_audit() == 5
+            assert flush_audit() == 0
+
+        conn = sqlite3.connect(temp_db)
+        assert conn.execute("SELECT COUNT(*) FROM audit_log WHERE action = 'BULK'").fetchone()[0] == 5
+        conn.close()
+
+    def test_background_writer_commits(self, temp_db):
+        """Should write entries without an explicit flush."""
+        with patch('nris.database.DB_FILE', temp_db), \
+             patch('nris.database.AUDIT_FLUSH_DELAY', 0.01):
+            log_audit("LATER", "details")
+            conn = sqlite3.connect(temp_db)
+            for _ in range(200):
+                if conn.execute("SELECT COUNT(*) FROM audit_log WHERE action = 'LATER'").fetchone()[0]:
+                    break
+                time.sleep(0.01)
+            else:
+                pytest.fail("audit entry was never written")
+            conn.close()
+
+    def test_entries_stay_with_their_database(self, tmp_path):
+        """Should write entries to the database active when they were logged."""
+        first, second = str(tmp_path / "a.db"), str(tmp_path / "b.db")
+        for db_file in (first, second):
+            with patch('nris.database.DB_FILE', db_file):
+                init_database()
+        with patch('nris.database.DB_FILE', first):
+            log_audit("FIRST", "")
+        with patch('nris.database.DB_FILE', second):
+            flush_audit()
+
+        for db_file, expected in ((first, 1), (second, 0)):
+            conn = sqlite3.connect(db_file)
+            assert conn.execute("SELECT COUNT(*) FROM audit_log WHERE action = 'FIRST'").fetchone()[0] == expected
+            conn.close()
+
 
 class TestGetPatientDetails:
     """Test cases for retrieving patient details."""
@@ -203,6 +355,15 @@ class TestGetPatientDetails:
             assert patient['mrn'] == "12345"
             assert patient['age'] == 35
 
+    def test_returns_plain_dict_with_expected_keys(self, db_with_data):
+        """Should return a plain dict keyed the way callers expect."""
+        with patch('nris.database.DB_FILE', db_with_data['db_file']):
+            patient = get_patient_details(db_with_data['patient_id'])
+
+        assert type(patient) is dict
+        assert list(patient) == ['id', 'mrn', 'name', 'age', 'weight', 'height',
+                                 'bmi', 'weeks', 'notes', 'created_at']
+
     def test_returns_none_for_invalid_id(self, db_with_data):
         """Should return None for nonexistent patient."""
         with patch('nris.database.DB_FILE', db_with_data['db_file']), \
@@ -227,6 +388,29 @@ class TestGetResultDetails:
             assert result['qc_status'] == "PASS"
             assert result['final_summary'] == "NEGATIVE"
 
+    def test_returns_plain_dict_with_expected_keys(self, db_with_data):
+        """Should return a plain dict keyed the way callers expect."""
+        with patch('nris.database.DB_FILE', db_with_data['db_file']):
+            result = get_result_details(db_with_data['result_id'])
+
+        assert type(result) is dict
+        assert list(result) == [
+            'id', 'patient_id', 'panel_type', 'qc_status', 'qc_details', 'qc_advice',
+            'qc_metrics', 't21_res', 't18_res', 't13_res', 'sca_res',
+            'cnv_list', 'rat_list', 'full_z', 'final_summary', 'created_at', 'test_number'
+        ]
+
+    def test_missing_test_number_defaults_to_one(self, db_with_data):
+        """Should report test 1 for rows stored without a test number."""
+        conn = sqlite3.connect(db_with_data['db_file'])
+        conn.execute("UPDATE results SET test_number = NULL WHERE id = ?",
+                     (db_with_data['result_id'],))
+        conn.commit()
+        conn.close()
+
+        with patch('nris.database.DB_FILE', db_with_data['db_file']):
+            assert get_result_details(db_with_data['result_id'])['test_number'] == 1
+
     def test_parses_json_fields(self, db_with_data):
         """Should parse JSON fields correctly."""
         with patch('nris.database.DB_FILE', db_with_data['db_file']), \
@@ -237,6 +421,20 @@ class TestGetResultDetails:
             assert isinstance(result['full_z'], dict)
             assert result['full_z'].get('21') == 1.0
 
+    def test_reads_nan_written_by_json_module(self, db_with_data):
+        """Should still parse rows whose JSON holds NaN from json.dumps."""
+        conn = sqlite3.connect(db_with_data['db_file'])
+        conn.execute("UPDATE results SET full_z_json = ? WHERE id = ?",
+                     ('{"21": NaN, "18": 0.5}', db_with_data['result_id']))
+        conn.commit()
+        conn.close()
+
+        with patch('nris.database.DB_FILE', db_with_data['db_file']):
+            result = get_result_details(db_with_data['result_id'])
+
+        assert math.isnan(result['full_z']['21'])
+        assert result['full_z']['18'] == 0.5
+
     def test_returns_none_for_invalid_id(self, db_with_data):
         """Should return None for nonexistent result."""
         with patch('nris.database.DB_FILE', db_with_data['db_file']), \
@@ -270,6 +468,18 @@ class TestCheckDuplicatePatient:
             assert exists is False
             assert patient is None
 
+    def test_counts_results(self, db_with_data):
+        """Should report how many results the patient has, including none."""
+        conn = sqlite3.connect(db_with_data['db_file'])
+        conn.execute("INSERT INTO results (patient_id) VALUES (?)", (db_with_data['patient_id'],))
+        conn.execute("INSERT INTO patients (mrn_id, full_name) VALUES ('77777', 'No Results')")
+        conn.commit()
+        conn.close()
+
+        with patch('nris.database.DB_FILE', db_with_data['db_file']):
+            assert check_duplicate_patient("12345")[1]['result_count'] == 2
+            assert check_duplicate_patient("77777")[1]['result_count'] == 0
+
 
 class TestDeletePatient:
     """Test cases for patient deletion."""
@@ -282,6 +492,7 @@ class TestDeletePatient:
             success, msg = delete_patient(db_with_data['patient_id'], user_id=1)
 
             assert success is True
+            assert "and 1 associated results" in msg
 
             # Verify patient is deleted
             patient = get_patient_details(db_with_data['patient_id'])
@@ -332,6 +543,22 @@ class TestDeleteRecord:
             assert success is False
             assert "not found" in msg.lower()
 
+    def test_waits_for_other_writer(self, db_with_data):
+        """Should wait for another connection's write lock instead of failing."""
+        other = sqlite3.connect(db_with_data['db_file'], isolation_level=None,
+                                check_same_thread=False)
+        other.execute("BEGIN IMMEDIATE")
+        release = threading.Timer(0.2, other.execute, ("COMMIT",))
+        release.start()
+        try:
+            with patch('nris.database.DB_FILE', db_with_data['db_file']):
+                success, msg = delete_record(db_with_data['result_id'], user_id=1)
+        finally:
+            release.join()
+            other.close()
+
+        assert success is True, msg
+
 
 class TestSaveResult:
     """Test cases for saving results."""
@@ -378,6 +605,15 @@ class TestSaveResult:
             assert result_id > 0
             assert msg == "Success"
 
+            conn = sqlite3.connect(temp_db)
+            created = conn.execute("""
+                SELECT p.created_at, r.created_at FROM results r
+                JOIN patients p ON p.id = r.patient_id WHERE r.id = ?
+            """, (result_id,)).fetchone()
+            conn.close()
+            assert created[0] == created[1]
+            datetime.fromisoformat(created[1])
+
     def test_adds_result_to_existing_patient(self, db_with_data):
         """Should add new result to existing patient."""
         with patch('nris.database.DB_FILE', db_with_data['db_file']), \
@@ -426,6 +662,81 @@ class TestSaveResult:
 
             assert count == 1
 
+    @staticmethod
+    def _sample(mrn):
+        patient = {'name': 'Jane Roe', 'id': mrn, 'age': 31, 'weight': 60.0,
+                   'height': 160, 'bmi': 23.4, 'weeks': 13, 'notes': ''}
+        results = {'panel': 'NIPT Basic', 'qc_status': 'PASS', 'qc_msgs': [], 'qc_advice': 'None'}
+        clinical = {'t21': 'Low Risk', 't18': 'Low Risk', 't13': 'Low Risk', 'sca': 'XX (Female)',
+                    'cnv_list': [], 'rat_list': [], 'final': 'NEGATIVE'}
+        return patient, results, clinical
+
+    def test_rejects_existing_mrn_without_duplicates(self, db_with_data):
+        """Should refuse an existing MRN and write nothing when duplicates are off."""
+        with patch('nris.database.DB_FILE', db_with_data['db_file']):
+            result_id, msg = save_result(*self._sample('12345'), allow_duplicate=False)
+
+        assert result_id == 0
+        assert "John Doe" in msg
+        conn = sqlite3.connect(db_with_data['db_file'])
+        assert conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 1
+        conn.close()
+
+    @pytest.mark.parametrize("has_returning", [True, False])
+    def test_new_patient_gets_its_own_id(self, db_with_data, has_returning):
+        """Should link the result to the new patient with or without RETURNING."""
+        with patch('nris.database.DB_FILE', db_with_data['db_file']), \
+             patch('nris.database._HAS_RETURNING', has_returning):
+            result_id, msg = save_result(*self._sample('55555'), allow_duplicate=False)
+
+        assert msg == "Success"
+        conn = sqlite3.connect(db_with_data['db_file'])
+        patient_id = conn.execute("SELECT patient_id FROM results WHERE id = ?", (result_id,)).fetchone()[0]
+        mrn = conn.execute("SELECT mrn_id FROM patients WHERE id = ?", (patient_id,)).fetchone()[0]
+        conn.close()
+        assert mrn == '55555'
+
+
+class TestResultJsonColumns:
+    """Test cases for encoding of the results JSON columns."""
+
+    def test_text_by_default(self):
+        """Should store plain JSON text unless compression is switched on."""
+        assert isinstance(database._pack_json({'21': 1.5}), str)
+
+    def test_compressed_round_trip(self):
+        """Should store BLOBs when enabled and read them back."""
+        zstandard = pytest.importorskip("zstandard")
+        with patch('nris.database.zstandard', zstandard), \
+             patch('nris.database.COMPRESS_RESULT_JSON', True):
+            packed = database._pack_json({'21': 1.5})
+            assert isinstance(packed, bytes)
+            assert database.decode_json_column(packed, {}) == {'21': 1.5}
+
+    def test_enabled_without_zstandard_stores_text(self):
+        """Should keep writing text when zstandard isn't installed."""
+        with patch('nris.database.zstandard', None), \
+             patch('nris.database.COMPRESS_RESULT_JSON', True):
+            assert isinstance(database._pack_json([1, 2]), str)
+            with pytest.raises(RuntimeError):
+                database.decode_json_column(b"\x28\xb5\x2f\xfd", {})
+
+    @pytest.mark.parametrize("value", [
+        {'21': float('nan'), '18': None},
+        [float('inf'), -float('inf'), 1.5],
+    ])
+    def test_non_finite_floats_match_json_module(self, value):
+        """Should store NaN and Infinity the same with or without orjson."""
+        with patch('nris.database.orjson', None):
+            expected = database._json_dumps(value)
+        assert database._json_dumps(value) == expected
+        assert json.dumps(database.decode_json_column(database._pack_json(value), None)) == json.dumps(value)
+
+    def test_empty_values_use_default(self):
+        """Should return the default for NULL and empty columns."""
+        assert database.decode_json_column(None, []) == []
+        assert database.decode_json_column("", {}) == {}
+
 
 class TestQCOverride:
     """Test cases for QC override functionality."""
@@ -469,6 +780,27 @@ class TestQCOverride:
             assert success is False
             assert "not found" in msg.lower()
 
+    @pytest.mark.parametrize("t21, sca, expected", [
+        ("Low Risk", "XX (Female)", "NEGATIVE"),
+        ("POSITIVE (T21)", "XX (Female)", "POSITIVE DETECTED"),
+        ("High Risk", "XX (Female)", "HIGH RISK (SEE ADVICE)"),
+        ("Low Risk", "Re-library advised", "HIGH RISK (SEE ADVICE)"),
+        ("Low Risk", "resample", "HIGH RISK (SEE ADVICE)"),
+    ])
+    def test_recomputes_summary(self, db_with_data, t21, sca, expected):
+        """Should classify the overridden result from its stored result text."""
+        conn = sqlite3.connect(db_with_data['db_file'])
+        conn.execute("UPDATE results SET t21_res = ?, sca_res = ? WHERE id = ?",
+                     (t21, sca, db_with_data['result_id']))
+        conn.commit()
+        conn.close()
+
+        with patch('nris.database.DB_FILE', db_with_data['db_file']):
+            success, msg = override_qc_status(db_with_data['result_id'], "ok", user_id=1)
+
+        assert success is True
+        assert f"'{expected}'" in msg
+
 
 class TestGetQCOverrideInfo:
     """Test cases for retrieving QC override info."""
@@ -2,6 +2,9 @@
 Unit tests for encryption module.
 """
 
+import base64
+import hashlib
+
 import pytest
 from nris.encryption import (
     NoEncryption,
@@ -12,6 +15,7 @@ from nris.encryption import (
     register_backend,
     EncryptionError,
     KeyDerivationError,
+    _derive_fernet_key,
 )
 
 
@@ -125,6 +129,32 @@ class TestFernetEncryption:
         assert decrypted == "shared secret"
 
 
+    def test_fallback_matches_bytewise_xor(self):
+        """Fallback ciphertext should be unchanged from the per-byte XOR format."""
+        enc = FernetEncryption(key=generate_key())
+        enc._use_fallback = True
+        plaintext = "x" * 100 + " notes 🧬"
+
+        key_bytes = hashlib.sha256(enc.key.encode()).digest()
+        data = plaintext.encode('utf-8')
+        expected = bytes(b ^ key_bytes[i % 32] for i, b in enumerate(data))
+
+        raw = base64.urlsafe_b64decode(enc._fallback_encrypt(plaintext))
+        assert raw[16:] == expected
+        assert enc._fallback_decrypt(enc._fallback_encrypt(plaintext)) == plaintext
+
+
+    def test_derived_key_cached(self):
+        """Should derive a password's key once and match a fresh PBKDF2 run."""
+        _derive_fernet_key.cache_clear()
+        first = _derive_fernet_key("short password")
+        assert _derive_fernet_key("short password") is first
+        assert _derive_fernet_key.cache_info().hits == 1
+
+        raw = hashlib.pbkdf2_hmac('sha256', b"short password", b'nris_salt_v1', 100000, dklen=32)
+        assert first == base64.urlsafe_b64encode(raw)
+
+
 class TestFieldEncryptor:
     """Test cases for FieldEncryptor."""
 
@@ -152,6 +182,47 @@ class TestFieldEncryptor:
         assert decrypted['name'] == 'Jane Doe'
         assert decrypted['age'] == 30
 
+    def test_encrypts_fields_in_one_batch(self):
+        """Should hand all sensitive fields of a dict to encrypt_many at once."""
+        backend = FernetEncryption()
+        calls = []
+        encrypt_many = backend.encrypt_many
+        backend.encrypt_many = lambda values: calls.append(values) or encrypt_many(values)
+        encryptor = FieldEncryptor(backend, encrypted_fields={'name', 'ssn'})
+
+        encrypted = encryptor.encrypt_dict({'name': 'A', 'age': 3, 'ssn': 'B'})
+
+        assert calls == [['A', 'B']]
+        assert list(encrypted) == ['name', 'age', 'ssn']
+        assert encryptor.decrypt_dict(encrypted) == {'name': 'A', 'age': 3, 'ssn': 'B'}
+
+    def test_backend_without_encrypt_many(self):
+        """Should fall back to encrypt() for backends lacking encrypt_many."""
+        class Upper:
+            def encrypt(self, plaintext):
+                return plaintext.upper()
+
+            def decrypt(self, ciphertext):
+                return ciphertext.lower()
+
+            def is_encrypted(self, data):
+                return data.isupper()
+
+        encryptor = FieldEncryptor(Upper(), encrypted_fields={'name'})
+        assert encryptor.encrypt_dict({'name': 'abc', 'id': 1}) == {'name': 'ABC', 'id': 1}
+
+    def test_no_encryption_copies_without_backend_calls(self):
+        """Should return fresh dicts without calling a NoEncryption backend."""
+        backend = NoEncryption()
+        backend.encrypt = backend.decrypt = None  # Fail loudly if called
+        encryptor = FieldEncryptor(backend)
+        data = {'full_name': 'A', 'nested': {'mrn': '1'}, 'age': 3}
+
+        for result in (encryptor.encrypt_dict(data), encryptor.decrypt_dict(data)):
+            assert result == data
+            assert result is not data
+            assert result['nested'] is not data['nested']
+
     def test_handles_nested_dicts(self):
         """Should handle nested dictionaries."""
         backend = FernetEncryption()
@@ -3,6 +3,7 @@ Unit tests for migrations module.
 """
 
 import sqlite3
+import threading
 import pytest
 from unittest.mock import patch
 
@@ -20,6 +21,15 @@ def temp_db(tmp_path):
     db_file = tmp_path / "test_migrations.db"
     # Create tables with full schema matching production
     conn = sqlite3.connect(str(db_file))
+    conn.execute("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY,
+            username TEXT,
+            password_hash TEXT,
+            full_name TEXT,
+            role TEXT
+        )
+    """)
     conn.execute("""
         CREATE TABLE patients (
             id INTEGER PRIMARY KEY,
@@ -95,6 +105,21 @@ class TestMigration:
         assert migration.up_callable is None
         assert migration.down_callable is None
 
+    def test_checksum_computed_at_construction(self):
+        """Should tag each migration with a short checksum of its content."""
+        migration = Migration(version="001", description="Test", up=["SELECT 1"])
+        assert len(migration.checksum) == 8
+        assert migration.checksum == Migration("001", "Test", up=["SELECT 1"]).checksum
+        assert migration.checksum != Migration("001", "Test", up=["SELECT 2"]).checksum
+        assert migration.checksum != Migration("002", "Test", up=["SELECT 1"]).checksum
+
+
+    @pytest.mark.parametrize("version", ["v1", "1.2", "", "-3", "²"])
+    def test_non_numeric_version_rejected(self, version):
+        """Should reject versions that can't be stored in user_version."""
+        with pytest.raises(ValueError, match="string of digits"):
+            Migration(version=version, description="Test")
+
 
 class TestMigrationManager:
     """Test cases for MigrationManager."""
@@ -111,6 +136,60 @@ class TestMigrationManager:
         assert cursor.fetchone() is not None
         conn.close()
 
+    def test_connection_pragmas(self, temp_db):
+        """Should open WAL connections tuned for bulk schema changes."""
+        with MigrationManager(temp_db) as manager:
+            conn = manager._get_connection()
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+    def test_connection_reused_per_thread(self, temp_db):
+        """Should keep one connection per thread across calls."""
+        manager = MigrationManager(temp_db)
+        conn = manager._get_connection()
+        manager.migrate()
+        manager.get_history()
+        assert manager._get_connection() is conn
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(manager._get_connection()))
+        thread.start()
+        thread.join()
+        assert other[0] is not conn
+        manager.close()
+
+    def test_close_closes_connections(self, temp_db):
+        """Should close every thread's connection and reopen on next use."""
+        with MigrationManager(temp_db) as manager:
+            conn = manager._get_connection()
+            manager.migrate()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        assert manager.get_pending() == []
+        manager.close()
+
+    def test_exited_thread_connection_closed(self, temp_db):
+        """Should close a thread's connection once that thread exits."""
+        manager = MigrationManager(temp_db)
+        manager._get_connection()
+        opened = []
+        threads = [
+            threading.Thread(target=lambda: opened.append(manager._get_connection()))
+            for _ in range(20)
+        ]
+        for t in threads:
+            t.start()
+            t.join()
+
+        assert len(manager._connections) == 1
+        with pytest.raises(sqlite3.ProgrammingError):
+            opened[0].execute("SELECT 1")
+        manager.close()
+
     def test_migrate_applies_migrations(self, temp_db):
         """Should apply pending migrations."""
         manager = MigrationManager(temp_db)
@@ -168,6 +247,7 @@ class TestMigrationManager:
         assert 'description' in history[0]
         assert 'applied_at' in history[0]
         assert 'checksum' in history[0]
+        assert history[0]['checksum'] == manager._migrations[0].checksum
 
     def test_rollback_single(self, temp_db):
         """Should rollback single migration."""
@@ -219,6 +299,17 @@ class TestMigrationManager:
         assert cursor.fetchone() is not None
         conn.close()
 
+    def test_register_keeps_version_order(self, temp_db):
+        """Should insert registered migrations by version number."""
+        manager = MigrationManager(temp_db)
+        for version in ("300", "050", "200", "010", "200"):
+            manager.register(Migration(version=version, description=version))
+
+        versions = [m.version for m in manager._migrations]
+        assert versions == sorted(versions, key=int)
+        assert versions[-4:] == ["050", "200", "200", "300"]
+        assert manager._version_numbers == [int(v) for v in versions]
+
     def test_migrate_to_target_version(self, temp_db):
         """Should stop at target version."""
         manager = MigrationManager(temp_db)
@@ -248,6 +339,292 @@ class TestMigrationManager:
         applied = manager.migrate()
         assert "998" in applied
 
+    def test_existing_column_skipped_rest_applied(self, temp_db):
+        """Should skip only the ADD COLUMN statements that are already done."""
+        manager = MigrationManager(temp_db)
+        manager.migrate()
+        manager.register(Migration(
+            version="100",
+            description="Mixed",
+            up=[
+                'ALTER TABLE "patients" ADD COLUMN full_name TEXT',
+                "ALTER TABLE patients ADD COLUMN nickname TEXT",
+                "CREATE INDEX IF NOT EXISTS idx_patients_nickname ON patients(nickname)",
+            ]
+        ))
+
+        assert manager.migrate() == ["100"]
+        conn = sqlite3.connect(temp_db)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(patients)")]
+        conn.close()
+        assert columns.count('full_name') == 1
+        assert 'nickname' in columns
+
+    @pytest.mark.parametrize("sql", [
+        "-- already added by hand\nALTER TABLE patients ADD COLUMN full_name TEXT",
+        '/* note */ ALTER TABLE patients ADD "full_name" TEXT',
+        'ALTER TABLE "patients" ADD COLUMN "full name" TEXT',
+        'ALTER TABLE patients ADD COLUMN "full name" TEXT -- added by hand',
+    ])
+    def test_unrecognised_existing_column_tolerated(self, temp_db, sql):
+        """Should still skip existing columns the up-front check can't parse."""
+        conn = sqlite3.connect(temp_db)
+        conn.execute('ALTER TABLE patients ADD COLUMN "full name" TEXT')
+        conn.commit()
+        conn.close()
+
+        manager = MigrationManager(temp_db)
+        manager.migrate()
+        manager.register(Migration(
+            version="100",
+            description="Unrecognised duplicate",
+            up=[
+                "CREATE TABLE added_before (id INTEGER PRIMARY KEY)",
+                sql,
+                "ALTER TABLE patients ADD COLUMN nickname TEXT",
+            ]
+        ))
+
+        assert manager.migrate() == ["100"]
+        conn = sqlite3.connect(temp_db)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(patients)")]
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        conn.close()
+        assert 'nickname' in columns
+        assert 'added_before' in tables
+
+    @pytest.mark.parametrize("up", [
+        ["CREATE TABLE t8(a) -- scratch table", "CREATE INDEX i8 ON t8(a)"],
+        ["CREATE TABLE t8(a);", "CREATE INDEX i8 ON t8(a) -- lookups by a"],
+        ["-- scratch\nCREATE TABLE t8(a)", "/* index */ CREATE INDEX i8 ON t8(a)"],
+    ])
+    def test_statements_with_comments_applied(self, temp_db, up):
+        """Should apply statements with comments or semicolons as written."""
+        manager = MigrationManager(temp_db)
+        manager.migrate()
+        manager.register(Migration(version="100", description="Comments", up=up))
+
+        assert manager.migrate() == ["100"]
+        conn = sqlite3.connect(temp_db)
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        conn.close()
+        assert {'t8', 'i8'} <= names
+
+    def test_failed_statement_rolls_back_migration(self, temp_db):
+        """Should undo a migration's earlier statements when a later one fails."""
+        manager = MigrationManager(temp_db)
+        manager.migrate()
+        manager.register(Migration(
+            version="100",
+            description="Fails halfway",
+            up=[
+                "CREATE TABLE half_done (id INTEGER PRIMARY KEY)",
+                "INSERT INTO no_such_table VALUES (1)",
+            ]
+        ))
+
+        with pytest.raises(MigrationError):
+            manager.migrate()
+
+        conn = sqlite3.connect(temp_db)
+        table = conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'half_done'"
+        ).fetchone()
+        conn.close()
+        assert table is None
+        assert [m.version for m in manager.get_pending()] == ["100"]
+
+    def test_anomaly_flag_backfilled(self, temp_db):
+        """Should flag positive and high-risk results when adding has_anomaly."""
+        rows = [
+            ("POSITIVE DETECTED", "Low Risk", "Low Risk", "Low Risk", 1),
+            ("high risk (see advice)", None, None, None, 1),
+            ("NEGATIVE", "Positive (T21)", "Low Risk", "Low Risk", 1),
+            ("NEGATIVE", "Low Risk", None, "POSITIVE (T13)", 1),
+            ("NEGATIVE", "High Risk (Z:3.20)", "Low Risk", "Low Risk", 0),
+            (None, None, None, None, 0),
+        ]
+        conn = sqlite3.connect(temp_db)
+        conn.executemany(
+            "INSERT INTO results (final_summary, t21_res, t18_res, t13_res) VALUES (?, ?, ?, ?)",
+            [row[:4] for row in rows]
+        )
+        conn.commit()
+        conn.close()
+
+        MigrationManager(temp_db).migrate(target_version="003")
+
+        conn = sqlite3.connect(temp_db)
+        flags = [r[0] for r in conn.execute("SELECT has_anomaly FROM results ORDER BY id")]
+        conn.close()
+        assert flags == [row[4] for row in rows]
+
+    def test_cache_timestamps_converted(self, temp_db):
+        """Should rewrite legacy ISO cache timestamps as unix seconds."""
+        manager = MigrationManager(temp_db)
+        manager.migrate(target_version="006")
+
+        conn = sqlite3.connect(temp_db)
+        conn.execute(
+            "INSERT INTO _analytics_cache VALUES (?, ?, ?, ?)",
+            ('k', '"v"', '2024-01-01T00:00:00', '2024-01-01T01:00:00')
+        )
+        conn.commit()
+        conn.close()
+
+        assert manager.migrate() == ["007"]
+
+        conn = sqlite3.connect(temp_db)
+        created_at, expires_at = conn.execute(
+            "SELECT created_at, expires_at FROM _analytics_cache"
+        ).fetchone()
+        conn.close()
+        assert expires_at - created_at == 3600.0
+
+
+class TestUserVersion:
+    """Test cases for schema version tracking in PRAGMA user_version."""
+
+    @staticmethod
+    def _user_version(db_file):
+        conn = sqlite3.connect(db_file)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_migrate_sets_user_version(self, temp_db):
+        """Should store the last applied version in the file header."""
+        manager = MigrationManager(temp_db)
+        manager.migrate(target_version="003")
+        assert self._user_version(temp_db) == 3
+
+        manager.migrate()
+        assert self._user_version(temp_db) == int(manager._migrations[-1].version)
+
+    def test_pending_check_skips_history_table(self, temp_db):
+        """Should answer from the header alone once up to date."""
+        manager = MigrationManager(temp_db)
+        manager.migrate()
+
+        conn = sqlite3.connect(temp_db)
+        conn.execute("DROP TABLE _schema_migrations")
+        conn.commit()
+        conn.close()
+
+        assert manager.get_pending() == []
+        assert manager.migrate() == []
+
+    def test_without_history_table(self, temp_db):
+        """Should migrate without creating the history table."""
+        manager = MigrationManager(temp_db, record_history=False)
+        applied = manager.migrate()
+
+        conn = sqlite3.connect(temp_db)
+        table = conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = '_schema_migrations'"
+        ).fetchone()
+        conn.close()
+
+        assert table is None
+        status = manager.get_status()
+        assert status['applied_count'] == len(applied)
+        assert status['current_version'] == applied[-1]
+        assert status['applied'][0]['applied_at'] is None
+
+    def test_version_taken_from_legacy_history(self, temp_db):
+        """Should read the version of databases tracked only in the table."""
+        manager = MigrationManager(temp_db)
+        manager.migrate(target_version="005")
+
+        conn = sqlite3.connect(temp_db)
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+        conn.close()
+
+        assert [m.version for m in manager.get_pending()] == ["006", "007"]
+        assert manager.migrate() == ["006", "007"]
+        assert self._user_version(temp_db) == 7
+
+    def test_rollback_lowers_user_version(self, temp_db):
+        """Should move the header back to the previous applied version."""
+        manager = MigrationManager(temp_db)
+        manager.migrate(target_version="004")
+
+        assert manager.rollback(steps=2) == ["004", "003"]
+        assert self._user_version(temp_db) == 2
+        assert manager.rollback_to("000") == ["002", "001"]
+        assert self._user_version(temp_db) == 0
+        assert manager.get_status()['current_version'] is None
+
+    def test_failed_migration_keeps_user_version(self, temp_db):
+        """Should leave the header unchanged when a migration fails."""
+        manager = MigrationManager(temp_db)
+        manager.migrate()
+        manager.register(Migration(
+            version="100",
+            description="Broken",
+            up=["CREATE TABLE broken ("]
+        ))
+
+        with pytest.raises(MigrationError):
+            manager.migrate()
+        assert self._user_version(temp_db) == 7
+
+
+class TestStatusCache:
+    """Test cases for reuse of get_pending()/get_status() results."""
+
+    def test_repeated_calls_reuse_result(self, temp_db):
+        """Should not reconnect while the cached answer is fresh."""
+        manager = MigrationManager(temp_db)
+        manager.migrate()
+        status = manager.get_status()
+        manager.get_pending()
+
+        with patch.object(manager, '_get_connection') as connect:
+            assert manager.get_status() == status
+            assert manager.get_pending() == []
+        connect.assert_not_called()
+
+    def test_migrate_invalidates(self, temp_db):
+        """Should see migrations applied through the same manager."""
+        manager = MigrationManager(temp_db)
+        assert manager.get_status()['pending_count'] > 0
+        assert manager.get_pending()
+
+        manager.migrate()
+        assert manager.get_status()['pending_count'] == 0
+        assert manager.get_pending() == []
+
+        manager.rollback(steps=1)
+        assert manager.get_status()['pending_count'] == 1
+        assert len(manager.get_pending()) == 1
+
+    def test_register_invalidates(self, temp_db):
+        """Should list a newly registered migration as pending."""
+        manager = MigrationManager(temp_db)
+        manager.migrate()
+        manager.get_status()
+
+        manager.register(Migration(version="900", description="Later"))
+        assert manager.get_status()['pending'] == [{'version': "900", 'description': "Later"}]
+
+    def test_expired_result_is_reread(self, temp_db):
+        """Should pick up changes from other connections after the TTL."""
+        manager = MigrationManager(temp_db)
+        manager.STATUS_CACHE_TTL = 0
+        manager.get_pending()
+
+        MigrationManager(temp_db).migrate()
+        assert manager.get_pending() == []
+
+    def test_returned_status_is_a_copy(self, temp_db):
+        """Should not let callers alter the cached status."""
+        manager = MigrationManager(temp_db)
+        manager.get_status()['pending'].clear()
+        assert manager.get_status()['pending']
+
 
 class TestRunMigrations:
     """Test cases for run_migrations convenience function."""
@@ -0,0 +1,368 @@
+"""
+Unit tests for PDF extraction helpers.
+
+Note: These tests exercise the text-level parsing, which doesn't need a PDF library.
+"""
+
+import io
+import multiprocessing
+import re
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from nris.pdf import extraction
+from nris.pdf.extraction import (
+    _WS_RE,
+    _extract_fields,
+    _new_record,
+    extract_data_from_pdf,
+    extract_with_fallback,
+    parse_pdf_batch,
+    validate_pdf_file,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_extract_cache():
+    """Start every test without cached extraction results."""
+    extraction._extract_cache.clear()
+    yield
+    extraction._extract_cache.clear()
+
+
+REPORT_TEXT = (
+    "NIPT Screening Report Patient Name: Jane Doe MRN: 12345 "
+    "Maternal Age: 32 years Weight: 65.5 kg Height: 165 cm "
+    "Gestational Age: 12+3 weeks Total Reads: 8.5 M Fetal Fraction: 10.2% "
+    "GC Content: 41.3% Trisomy 21 Low Risk (Z: 0.52) Trisomy 18 Low Risk (Z: -0.31) "
+    "Trisomy 13 Low Risk (Z: 1.10) Z-XX: 0.4 Z-XY: -1.2 Fetal Sex: Female"
+)
+
+
+def _fields(text):
+    data = _new_record("report.pdf")
+    _extract_fields(text, data)
+    return data
+
+
+class TestExtractFields:
+    """Test cases for field extraction from report text."""
+
+    def test_extracts_report_fields(self):
+        """Should pull every field out of a typical report."""
+        data = _fields(REPORT_TEXT)
+
+        assert data['patient_name'] == "Jane Doe"
+        assert data['mrn'] == "12345"
+        assert data['age'] == 32
+        assert data['weight'] == 65.5
+        assert data['height'] == 165
+        assert data['bmi'] == 24.1
+        assert data['weeks'] == 12
+        assert data['reads'] == 8.5
+        assert data['cff'] == 10.2
+        assert data['gc'] == 41.3
+        assert data['z_scores'] == {13: 1.1, 18: -0.31, 21: 0.52, 'XX': 0.4, 'XY': -1.2}
+        assert data['sca_type'] == 'XX'
+
+    def test_out_of_range_values_ignored(self):
+        """Should leave implausible values at their defaults."""
+        data = _fields("Age: 99 Weight: 500 kg Height: 50 cm GA: 50 weeks FF: 0.1%")
+
+        assert (data['age'], data['weight'], data['height'], data['weeks'], data['cff']) == (0, 0.0, 0, 0, 0.0)
+
+    def test_read_count_converted_to_millions(self):
+        """Should express raw read counts in millions."""
+        assert _fields("Reads: 8500000 million")['reads'] == 8.5
+
+    def test_numeric_field_types(self):
+        """Should keep whole-number fields as ints and round the rest."""
+        data = _fields("Age: 31 Weight: 70.26 kg Height: 170 cm GA: 11 weeks Reads: 12.345 M GC: 40.456%")
+
+        assert [type(data[k]) for k in ('age', 'height', 'weeks')] == [int, int, int]
+        assert (data['weight'], data['reads'], data['gc']) == (70.3, 12.35, 40.46)
+
+    def test_last_z_score_wins(self):
+        """Should keep the Z-score that appears last in the text."""
+        data = _fields("Z-21: 0.8 ... Trisomy 21 (Z: 4.20)")
+        assert data['z_scores'][21] == 4.2
+
+    def test_sca_priority_follows_pattern_order(self):
+        """Should report the highest-priority SCA pattern, not the first in the text."""
+        assert _fields("Fetal Sex: Male, Klinefelter 47,XXY")['sca_type'] == 'XXY'
+
+    def test_adjacent_fields_both_found(self):
+        """Should find a field whose keyword ends the previous field's match."""
+        data = _fields("Patient Name: Jane Doe MRN: 12345 Age: 30")
+        assert (data['patient_name'], data['mrn'], data['age']) == ("Jane Doe", "12345", 30)
+
+    def test_mrn_falls_back_to_sample_id(self):
+        """Should try later MRN patterns when earlier ones don't match."""
+        assert _fields("Sample ID: AB-12")['mrn'] == "AB-12"
+
+
+class TestWhitespaceNormalization:
+    """Test cases for the page whitespace collapse."""
+
+    def test_collapses_runs_to_single_space(self):
+        """Should turn every whitespace run into one space."""
+        assert _WS_RE.sub(' ', "a  b\n\tc \r\nd e") == "a b c d e"
+
+    def test_clean_text_has_nothing_to_replace(self):
+        """Should leave single-spaced text untouched."""
+        assert _WS_RE.search(REPORT_TEXT) is None
+
+
+class TestExtractWithFallback:
+    """Test cases for extract_with_fallback."""
+
+    def test_accepts_string_and_compiled_patterns(self):
+        """Should search with both pattern strings and compiled patterns."""
+        text = "MRN: 12345"
+        assert extract_with_fallback(text, [r'mrn:\s*(\d+)']) == "12345"
+        assert extract_with_fallback(text, [re.compile(r'MRN:\s*(\d+)')]) == "12345"
+
+    def test_returns_none_without_match(self):
+        """Should return None when no pattern matches."""
+        assert extract_with_fallback("nothing here", [re.compile(r'MRN:\s*(\d+)')]) is None
+
+
+class TestValidatePdfFile:
+    """Test cases for upload validation."""
+
+    def test_accepts_pdf(self):
+        """Should accept a file with a PDF header."""
+        assert validate_pdf_file(io.BytesIO(b"%PDF-1.4 rest"), "report.pdf") == (True, "")
+
+    def test_rejects_oversized_file(self):
+        """Should reject files over the size limit."""
+        with patch('nris.pdf.extraction.MAX_PDF_SIZE_MB', 0.001):
+            is_valid, error = validate_pdf_file(io.BytesIO(b"%PDF-1.4" + b"x" * 2048), "report.pdf")
+        assert not is_valid
+        assert error.startswith("File too large")
+
+    def test_leaves_file_rewound(self):
+        """Should leave the file at its start for the parser."""
+        pdf = io.BytesIO(b"%PDF-1.4 rest")
+        pdf.seek(5)
+        validate_pdf_file(pdf, "report.pdf")
+        assert pdf.tell() == 0
+
+    @pytest.mark.parametrize("data, filename", [
+        (b"%PDF-1.4", "report.txt"),
+        (b"not a pdf", "report.pdf"),
+    ])
+    def test_rejects_invalid(self, data, filename):
+        """Should reject wrong extensions and missing headers."""
+        is_valid, error = validate_pdf_file(io.BytesIO(data), filename)
+        assert not is_valid
+        assert error
+
+
+def _fake_reader(pdf_file):
+    """Stand-in PdfReader: form feeds after the header separate page texts."""
+    pages = pdf_file.read()[8:].decode().split('\f')
+    return SimpleNamespace(pages=[SimpleNamespace(extract_text=lambda t=t: t) for t in pages])
+
+
+class TestExtractPdf:
+    """Test cases for reading report text out of PDF pages."""
+
+    @pytest.fixture(autouse=True)
+    def fake_pypdf2(self):
+        with patch('nris.pdf.extraction.pdfium', None), \
+             patch('nris.pdf.extraction.pypdf', None), \
+             patch('nris.pdf.extraction.PyPDF2', SimpleNamespace(PdfReader=_fake_reader)):
+            yield
+
+    def test_pages_joined_with_single_space(self):
+        """Should read fields across page breaks and skip blank pages."""
+        pdf = io.BytesIO(b"%PDF-1.4" + "\f".join([
+            "Patient Name: Jane Doe\n", "  \n", "\nMRN: 12345 Age: 30",
+        ]).encode())
+        data = extract_data_from_pdf(pdf, "report.pdf")
+
+        assert (data['patient_name'], data['mrn'], data['age']) == ("Jane Doe", "12345", 30)
+        assert data['_extraction_warnings'] == ["Low text content - possible scanned PDF"]
+
+    @pytest.mark.parametrize("data, filename", [
+        (b"%PDF-1.4" + REPORT_TEXT.encode(), "report.txt"),
+        (REPORT_TEXT.encode(), "report.pdf"),
+    ])
+    def test_invalid_file_not_parsed(self, data, filename):
+        """Should give up on files that fail validation without parsing them."""
+        with patch('nris.pdf.extraction._iter_page_texts') as pages:
+            assert extract_data_from_pdf(io.BytesIO(data), filename) is None
+        pages.assert_not_called()
+
+    def test_unreadable_page_warned(self):
+        """Should note pages whose text can't be extracted and keep the rest."""
+        with patch('nris.pdf.extraction._iter_page_texts', return_value=iter([None, REPORT_TEXT])):
+            data = extract_data_from_pdf(io.BytesIO(b"%PDF-1.4"), "report.pdf")
+
+        assert data['mrn'] == "12345"
+        assert data['_extraction_warnings'] == ["Could not extract text from page 1"]
+
+    def test_no_pages_fails(self):
+        """Should fail on a document without pages."""
+        with patch('nris.pdf.extraction._iter_page_texts', return_value=iter([])):
+            assert extract_data_from_pdf(io.BytesIO(b"%PDF-1.4"), "report.pdf") is None
+
+    def test_full_report_has_no_warnings(self):
+        """Should not flag a report with enough text."""
+        data = extract_data_from_pdf(io.BytesIO(b"%PDF-1.4" + REPORT_TEXT.encode()), "report.pdf")
+
+        assert data['_extraction_warnings'] == []
+        assert data['extraction_confidence'] == 'HIGH'
+
+
+def _fake_extract(raw, filename=""):
+    """Stand-in extractor: the file body is the MRN, or empty for a failure."""
+    body = raw.decode()
+    if body == "fail":
+        return None
+    return {'mrn': body, 'source_file': filename}
+
+
+def _named(body, name):
+    f = io.BytesIO(body.encode())
+    f.name = name
+    return f
+
+
+class TestParsePdfBatch:
+    """Test cases for batch parsing."""
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_groups_by_mrn_in_input_order(self, parallel):
+        """Should group results by MRN in upload order, serial or parallel."""
+        if parallel and multiprocessing.get_start_method() != 'fork':
+            pytest.skip("workers only see the patched extractor when forked")
+        files = [_named(body, f"{i}.pdf") for i, body in enumerate(
+            ["A1", "B2", "fail", "A1", "", "B2"])]
+
+        with patch('nris.pdf.extraction._extract_pdf', _fake_extract), \
+             patch('nris.pdf.extraction.PyPDF2', object()), \
+             patch('nris.pdf.extraction.PARALLEL_PARSE_THRESHOLD', 2 if parallel else 100):
+            result = parse_pdf_batch(files)
+
+        assert {mrn: [d['source_file'] for d in rows] for mrn, rows in result['patients'].items()} == {
+            'A1': ['0.pdf', '3.pdf'],
+            'B2': ['1.pdf', '5.pdf'],
+        }
+        assert result['errors'] == ["Failed to extract data from 2.pdf", "No MRN found in 4.pdf"]
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_unreadable_file_reported(self, parallel):
+        """Should report a file that can't be read and import the rest."""
+        files = [_named("A1", "0.pdf"), _named("B2", "1.pdf"), _named("C3", "2.pdf")]
+        files[1].close()
+
+        with patch('nris.pdf.extraction._extract_pdf', _fake_extract), \
+             patch('nris.pdf.extraction.PyPDF2', object()), \
+             patch('nris.pdf.extraction.PARALLEL_PARSE_THRESHOLD', 2 if parallel else 100):
+            result = parse_pdf_batch(files)
+
+        assert list(result['patients']) == ['A1', 'C3']
+        assert result['errors'] == ["Failed to extract data from 1.pdf"]
+
+
+class TestExtractCache:
+    """Test cases for reuse of extraction results."""
+
+    @pytest.fixture(autouse=True)
+    def fake_backend(self):
+        with patch('nris.pdf.extraction._extract_pdf', wraps=_fake_extract) as parse, \
+             patch('nris.pdf.extraction.PyPDF2', object()):
+            yield parse
+
+    def test_same_upload_parsed_once(self, fake_backend):
+        """Should return the cached result for identical content and name."""
+        first = extract_data_from_pdf(io.BytesIO(b"A1"), "a.pdf")
+        second = extract_data_from_pdf(io.BytesIO(b"A1"), "a.pdf")
+
+        assert first == second == {'mrn': 'A1', 'source_file': 'a.pdf'}
+        assert fake_backend.call_count == 1
+
+    def test_name_or_content_change_reparses(self, fake_backend):
+        """Should key the cache on both the bytes and the filename."""
+        extract_data_from_pdf(io.BytesIO(b"A1"), "a.pdf")
+        assert extract_data_from_pdf(io.BytesIO(b"A1"), "b.pdf")['source_file'] == "b.pdf"
+        assert extract_data_from_pdf(io.BytesIO(b"B2"), "a.pdf")['mrn'] == "B2"
+        assert fake_backend.call_count == 3
+
+    def test_returned_results_are_copies(self, fake_backend):
+        """Should not let callers change what later lookups return."""
+        extract_data_from_pdf(io.BytesIO(b"A1"), "a.pdf")['mrn'] = "changed"
+        assert extract_data_from_pdf(io.BytesIO(b"A1"), "a.pdf")['mrn'] == "A1"
+
+    def test_failures_not_cached(self, fake_backend):
+        """Should try again on files that failed to parse."""
+        extract_data_from_pdf(io.BytesIO(b"fail"), "a.pdf")
+        extract_data_from_pdf(io.BytesIO(b"fail"), "a.pdf")
+        assert fake_backend.call_count == 2
+
+    def test_least_recently_used_evicted(self, fake_backend):
+        """Should drop the oldest entry beyond the size limit."""
+        with patch('nris.pdf.extraction.EXTRACT_CACHE_SIZE', 2):
+            for body in (b"A1", b"B2", b"A1", b"C3"):
+                extract_data_from_pdf(io.BytesIO(body), "x.pdf")
+        assert len(extraction._extract_cache) == 2
+
+        extract_data_from_pdf(io.BytesIO(b"A1"), "x.pdf")
+        assert fake_backend.call_count == 3  # A1 survived as most recently used
+
+    def test_batch_uses_cache(self, fake_backend):
+        """Should skip parsing batch files already extracted."""
+        extract_data_from_pdf(io.BytesIO(b"A1"), "0.pdf")
+        with patch('nris.pdf.extraction.PARALLEL_PARSE_THRESHOLD', 100):
+            parse_pdf_batch([_named("A1", "0.pdf"), _named("B2", "1.pdf")])
+        assert fake_backend.call_count == 2
+
+
+class _FakePdfiumDocument:
+    def __init__(self, pdf_bytes):
+        self.pages = pdf_bytes[8:].decode().split('\f')
+        self.closed = False
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __getitem__(self, i):
+        if self.pages[i] == "broken":
+            raise RuntimeError("bad page")
+        textpage = SimpleNamespace(get_text_range=lambda: self.pages[i], close=lambda: None)
+        return SimpleNamespace(get_textpage=lambda: textpage, close=lambda: None)
+
+    def close(self):
+        self.closed = True
+
+
+class TestIterPageTexts:
+    """Test cases for the PDF library adapter."""
+
+    def test_prefers_pdfium(self):
+        """Should read pages with pypdfium2 when it's installed."""
+        docs = []
+
+        def open_document(pdf_bytes):
+            docs.append(_FakePdfiumDocument(pdf_bytes))
+            return docs[-1]
+
+        with patch('nris.pdf.extraction.pdfium', SimpleNamespace(PdfDocument=open_document)), \
+             patch('nris.pdf.extraction.PyPDF2') as pypdf2:
+            texts = list(extraction._iter_page_texts(b"%PDF-1.4one\fbroken\fthree"))
+
+        assert texts == ["one", None, "three"]
+        assert docs[0].closed
+        pypdf2.PdfReader.assert_not_called()
+
+    @pytest.mark.parametrize("installed", ['pypdf', 'PyPDF2'])
+    def test_reader_fallbacks(self, installed):
+        """Should fall back to pypdf, then PyPDF2."""
+        modules = {'pdfium': None, 'pypdf': None, 'PyPDF2': None}
+        modules[installed] = SimpleNamespace(PdfReader=_fake_reader)
+        with patch.multiple('nris.pdf.extraction', **modules):
+            assert list(extraction._iter_page_texts(b"%PDF-1.4one\ftwo")) == ["one", "two"]